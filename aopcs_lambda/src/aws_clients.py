@@ -0,0 +1,19 @@
+"""boto3 clients created from any thread.
+
+Creating a client from the default boto3 session is not thread-safe (the session loads its data and credentials on
+first use), and the tenants, the replicas and the init prefetch create theirs from worker threads: every client of the
+function is created here, under one lock. A created client is safe to share between threads.
+"""
+
+import threading
+from typing import Any
+
+_lock = threading.Lock()
+
+
+def create_client(service_name: str, **kwargs: Any) -> Any:
+    """`boto3.client(service_name, **kwargs)`, serialized with the other client creations."""
+    import boto3
+
+    with _lock:
+        return boto3.client(service_name, **kwargs)
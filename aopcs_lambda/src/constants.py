@@ -0,0 +1,3 @@
+"""Names shared by the ingestion and the query handlers, kept free of dependencies so both can import them cheaply."""
+
+BULLETIN_STATE_FILE = "bulletin.json"  # Rows of the last published bulletin, relative to aopcs_path
@@ -1,6 +1,7 @@
 from enum import Enum, unique
-from typing import Annotated, Literal
-from pydantic import StringConstraints
+from functools import lru_cache
+from typing import Annotated, Any, List, Literal, Optional
+from pydantic import BaseModel, StringConstraints
 from pydantic_settings import BaseSettings
 
 
@@ -10,6 +11,28 @@ class DataSourceEnum(Enum):
     LOCAL_FILE = "LOCAL_FILE"
 
 
+class TenantConfig(BaseModel):
+    """Kinéis account ingested by the handler, and where its AOP is published."""
+
+    name: str
+    secret_manager_arn: str
+    aopcs_path: str
+    kineis_api_url: Optional[str] = None  # Defaults to kineis_api_url
+    kineis_api_mirror_urls: Optional[List[str]] = None  # Defaults to kineis_api_mirror_urls with kineis_api_url, none otherwise
+    satellite_whitelist: str = ""  # Comma-separated satellite names, all satellites when empty
+
+
+class DestinationConfig(BaseModel):
+    """Replica of the published artefacts (see `replication.py`)."""
+
+    bucket: str
+    prefix: str  # Replaces aopcs_path, may use {tenant}
+    region: Optional[str] = None  # Defaults to the region of the function
+    artefacts: List[str] = []  # Names relative to aopcs_path (e.g. "aop", "metadata.json"), all when empty
+    compression: Optional[Literal["gzip", "zstd"]] = None  # Store `aop` and the JSON artefacts compressed, with their Content-Encoding
+    compression_level: int = 6
+
+
 class GlobalConfig(BaseSettings):
     """Global configuration settings for AOPCS Lambda."""
 
@@ -22,8 +45,74 @@ class GlobalConfig(BaseSettings):
     kineis_auth_url: str = "your_auth_url"
     kineis_api_url: str = "your_api_url"
     kineis_timeout: int = 10
+    kineis_api_mirror_urls: List[str] = []  # JSON list of endpoints equivalent to kineis_api_url, tried after it
+    kineis_hedging_enabled: bool = False
+    kineis_hedge_delay_seconds: float = 2.0  # Until the p95 latency of the endpoint is known
     previpass_v1_satellite_whitelist: str = "1A,1B,1E,3A,3B,3D,5A,5C,5E"  # With more than 9 satellites embedded previpass will crash
+    metrics_namespace: str = "AOPCS"
+    metrics_report_path: Optional[str] = None  # Local runs: write the per-stage metrics as a JSON report
+    tracing_enabled: bool = False
+    profile_mode: Literal["off", "cprofile", "tracemalloc", "sample"] = "off"
+    profile_sample_rate: float = 1.0  # Share of the invocations profiled when profile_mode is not off
+    profile_top_n: int = 20
+    profile_sampling_interval_ms: float = 5.0
+    profile_output_dir: Optional[str] = None  # Local directory for the profiles, S3 otherwise
+    profile_s3_prefix: Optional[str] = None  # Defaults to "{aopcs_path}/profiles"
+    binary_output_enabled: bool = False
+    binary_output_crc: bool = True
+    packed_output_enabled: bool = False
+    delta_output_enabled: bool = False
+    columnar_export_enabled: bool = False
+    columnar_archive_prefix: Optional[str] = None  # Defaults to "{aopcs_path}/archive"
+    query_revalidate_seconds: float = 30.0
+    query_cache_size: int = 128
+    satellite_registry_uri: Optional[str] = None  # s3://bucket/key or local path of a JSON/TOML registry
+    satellite_registry_revalidate_seconds: float = 300.0
+    frame_validation: Literal["off", "reject", "salvage"] = "off"
+    frame_cache_enabled: bool = False
+    frame_cache_size: int = 4096
+    frame_cache_s3_key: Optional[str] = None
+    log_full_payloads: bool = False
+    run_lease_enabled: bool = False
+    run_lease_ttl_seconds: float = 300.0
+    reepoch_cadence_minutes: Optional[float] = None
+    reepoch_count: int = 4
+    reepoch_j2: bool = False
+    coverage_enabled: bool = False
+    coverage_grid_step_deg: float = 10.0
+    coverage_horizon_hours: float = 24.0
+    compressed_variants: List[Literal["gzip", "zstd"]] = []  # JSON list; encodings of the variants of `aop` and the JSON artefacts
+    compression_gzip_level: int = 6
+    compression_zstd_level: int = 3
+    replication_destinations: List[DestinationConfig] = []  # JSON list
+    replication_max_workers: int = 4
+    replication_max_attempts: int = 3
+    notifier: Literal["off", "sns", "eventbridge", "memory"] = "off"
+    notification_target: Optional[str] = None  # SNS topic ARN or EventBridge bus name
+    init_prefetch_enabled: bool = False  # Read from the environment by the handler module, see prefetch.py
+    init_prefetch_token_max_age_seconds: float = 240.0
+    tenants: List[TenantConfig] = []  # JSON list; when empty, the account of secret_manager_arn is published to aopcs_path
+    tenants_max_workers: int = 4
+
+    def default_tenant(self) -> TenantConfig:
+        """Tenant of the single-account settings (secret_manager_arn, aopcs_path, previpass_v1_satellite_whitelist)."""
+        return TenantConfig(
+            name="default", secret_manager_arn=self.secret_manager_arn, aopcs_path=self.aopcs_path, satellite_whitelist=self.previpass_v1_satellite_whitelist
+        )
+
+
+@lru_cache(maxsize=1)
+def get_global_config() -> GlobalConfig:
+    """Create platform configuration based on environment variables, on first access only.
+
+    Returns:
+        GlobalConfig: Cached configuration of the running Lambda.
+    """
+    return GlobalConfig()  # type: ignore[call-arg]
 
 
-# Create platform configuration based on environment variables.
-global_config = GlobalConfig()  # type: ignore[call-arg]
+def __getattr__(name: str) -> Any:
+    """Keep `global_config` importable as a module attribute while deferring its construction."""
+    if name == "global_config":
+        return get_global_config()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,155 @@
+"""Hedged GET over equivalent endpoints, for the Allcast download.
+
+The first endpoint is requested; if it has not answered after the hedge delay, the next endpoint is requested too, and
+so on. An endpoint that fails hands over to the next one at once. The first good response wins, the other requests
+stop reading their response. The whole download stays within one timeout.
+
+The hedge delay is the p95 of the recent latencies of the first endpoint (the configured delay until enough samples
+are collected): only the slowest 5% of the downloads are duplicated. The latencies and the failures of every endpoint
+are kept in the memory of the container, across warm invocations; the endpoints failing in a row are tried last.
+"""
+
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Deque, Dict, List, Mapping, Optional, Set
+
+import numpy as np
+from aws_lambda_powertools import Logger
+
+logger = Logger()
+
+LATENCY_WINDOW = 50
+MIN_LATENCY_SAMPLES = 5
+CHUNK_SIZE = 64 * 1024
+
+
+class EndpointStats:
+    """Latencies of the recent successes of an endpoint, and its failures."""
+
+    def __init__(self) -> None:
+        self.latencies: Deque[float] = deque(maxlen=LATENCY_WINDOW)
+        self.successes = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+
+    def record_success(self, latency: float) -> None:
+        self.latencies.append(latency)
+        self.successes += 1
+        self.consecutive_failures = 0
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        self.consecutive_failures += 1
+
+    def p95(self) -> Optional[float]:
+        """p95 latency in seconds, None with less than `MIN_LATENCY_SAMPLES` samples."""
+        if len(self.latencies) < MIN_LATENCY_SAMPLES:
+            return None
+        return float(np.percentile(self.latencies, 95))
+
+    def to_dict(self) -> Dict[str, Optional[float]]:
+        return {"successes": self.successes, "failures": self.failures, "consecutive_failures": self.consecutive_failures, "p95_seconds": self.p95()}
+
+
+_stats: Dict[str, EndpointStats] = {}
+_stats_lock = threading.Lock()
+
+
+def get_endpoint_stats(url: str) -> EndpointStats:
+    """Stats of an endpoint, kept across warm invocations."""
+    with _stats_lock:
+        return _stats.setdefault(url, EndpointStats())
+
+
+def reset_endpoint_stats() -> None:
+    with _stats_lock:
+        _stats.clear()
+
+
+def order_endpoints(urls: List[str]) -> List[str]:
+    """Endpoints by consecutive failures, in their configured order otherwise."""
+    return sorted(urls, key=lambda url: get_endpoint_stats(url).consecutive_failures)
+
+
+def hedge_delay(url: str, default_delay: float) -> float:
+    p95 = get_endpoint_stats(url).p95()
+    return default_delay if p95 is None else p95
+
+
+def fetch(url: str, headers: Mapping[str, str], timeout: float, cancelled: threading.Event) -> Optional[bytes]:
+    """Body of a GET, None if cancelled while reading it. Records the latency or the failure of the endpoint."""
+    import requests
+
+    start = time.perf_counter()
+    try:
+        with requests.get(url, headers=headers, timeout=timeout, stream=True) as response:
+            response.raise_for_status()
+            chunks = []
+            for chunk in response.iter_content(CHUNK_SIZE):
+                if cancelled.is_set():
+                    return None
+                chunks.append(chunk)
+    except requests.exceptions.RequestException as e:
+        if not cancelled.is_set():
+            get_endpoint_stats(url).record_failure()
+            logger.warning(f"Allcast endpoint failed: {e}", extra={"url": url})
+        raise e
+    get_endpoint_stats(url).record_success(time.perf_counter() - start)
+    return b"".join(chunks)
+
+
+def hedged_get(urls: List[str], headers: Mapping[str, str], timeout: float, default_hedge_delay: float) -> bytes:
+    """Body of the first good response of equivalent endpoints, within `timeout` seconds overall.
+
+    Raises:
+        requests.exceptions.RequestException: Every endpoint failed (the last error), or none answered in time.
+    """
+    import requests
+
+    endpoints = order_endpoints(urls)
+    delay = hedge_delay(endpoints[0], default_hedge_delay)
+    deadline = time.monotonic() + timeout
+    cancelled = threading.Event()
+    executor = ThreadPoolExecutor(max_workers=len(endpoints))
+    pending: Dict[Future, str] = {}
+    launched: List[str] = []
+    last_error: Optional[Exception] = None
+
+    def launch() -> None:
+        url = endpoints[len(launched)]
+        launched.append(url)
+        pending[executor.submit(fetch, url, headers, max(deadline - time.monotonic(), 0.001), cancelled)] = url
+
+    try:
+        launch()
+        while pending:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            can_hedge = len(launched) < len(endpoints)
+            done, _ = wait(set(pending), timeout=min(delay, remaining) if can_hedge else remaining, return_when=FIRST_COMPLETED)
+            failed: Set[Future] = set()
+            for future in done:
+                url = pending.pop(future)
+                try:
+                    body = future.result()
+                except Exception as e:
+                    last_error = e
+                    failed.add(future)
+                    continue
+                if body is not None:
+                    if len(launched) > 1:
+                        logger.info("Allcast download hedged", extra={"url": url, "requested": launched})
+                    return body
+            # Nothing answered within the hedge delay, or an endpoint failed: request the next one
+            if can_hedge and (failed or not done) and time.monotonic() < deadline:
+                launch()
+    finally:
+        cancelled.set()
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    if last_error is not None and not pending:
+        raise last_error
+    raise requests.exceptions.Timeout(f"No Allcast endpoint answered within {timeout} s: {launched}")
@@ -0,0 +1,153 @@
+import contextvars
+import json
+import resource
+import time
+from contextlib import contextmanager, nullcontext
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from typing import Any, ContextManager, Dict, Iterator, List, Optional
+
+from aws_lambda_powertools import Logger
+
+logger = Logger()
+
+# Instrumentation of the invocation being processed, reachable from any stage without threading it through calls.
+current_instrumentation: contextvars.ContextVar[Optional["PipelineInstrumentation"]] = contextvars.ContextVar("current_instrumentation", default=None)
+
+
+@dataclass
+class StageMetrics:
+    """Measurements of one stage of the handler pipeline."""
+
+    name: str
+    duration_ms: float = 0.0
+    bytes_in: int = 0
+    bytes_out: int = 0
+    frame_count: Optional[int] = None
+    satellite_count: Optional[int] = None
+    cache_hit_rate: Optional[float] = None
+    failure_count: Optional[int] = None
+    peak_memory_mb: float = 0.0
+    succeeded: bool = True
+
+
+@dataclass
+class PipelineMetrics:
+    """Measurements of a whole handler invocation."""
+
+    started_at: str
+    total_duration_ms: float = 0.0
+    stages: List[StageMetrics] = field(default_factory=list)
+
+
+def get_peak_memory_mb() -> float:
+    """Peak resident memory of the process, in MB (`ru_maxrss` is reported in KB on Linux)."""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+class PipelineInstrumentation:
+    """Record wall time, bytes, counts and peak memory of each stage of an invocation.
+
+    Args:
+        namespace (str): CloudWatch namespace of the emitted metrics.
+        service (str): Service name attached to the metrics and traces.
+        tracing_enabled (bool): Open an X-Ray subsegment per stage when the tracing SDK is available.
+        dimensions (Optional[Dict[str, str]]): Extra dimensions of the emitted metrics (e.g. the tenant).
+    """
+
+    def __init__(self, namespace: str, service: str = "aopcs-lambda", tracing_enabled: bool = False, dimensions: Optional[Dict[str, str]] = None) -> None:
+        self.namespace = namespace
+        self.service = service
+        self.tracing_enabled = tracing_enabled
+        self.dimensions = dimensions or {}
+        self.report = PipelineMetrics(started_at=datetime.now(tz=timezone.utc).isoformat())
+        self._start = time.perf_counter()
+        self._tracer: Any = None
+
+    @contextmanager
+    def activate(self) -> Iterator["PipelineInstrumentation"]:
+        """Make this instrumentation the target of `stage()` for the current context."""
+        token = current_instrumentation.set(self)
+        try:
+            yield self
+        finally:
+            self.report.total_duration_ms = (time.perf_counter() - self._start) * 1000
+            current_instrumentation.reset(token)
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[StageMetrics]:
+        """Measure a stage; the caller fills bytes and counts on the yielded record."""
+        record = StageMetrics(name=name)
+        self.report.stages.append(record)
+        start = time.perf_counter()
+        try:
+            with self._open_span(name):
+                yield record
+        except Exception:
+            record.succeeded = False
+            raise
+        finally:
+            record.duration_ms = (time.perf_counter() - start) * 1000
+            record.peak_memory_mb = get_peak_memory_mb()
+            logger.debug("Stage completed", extra=asdict(record))
+
+    def _open_span(self, name: str) -> ContextManager[Any]:
+        if not self.tracing_enabled:
+            return nullcontext()
+        if self._tracer is None:
+            try:
+                from aws_lambda_powertools import Tracer
+
+                self._tracer = Tracer(service=self.service)
+            except Exception as e:
+                logger.warning(f"Tracing disabled, X-Ray SDK unavailable: {e}")
+                self.tracing_enabled = False
+                return nullcontext()
+        return self._tracer.provider.in_subsegment(name=f"## {name}")
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self.report)
+
+    def publish_metrics(self) -> None:
+        """Emit the stage measurements as CloudWatch Embedded Metric Format through powertools."""
+        from aws_lambda_powertools.metrics import EphemeralMetrics, MetricUnit
+
+        # EphemeralMetrics does not share its metric set between instances, so concurrent pipelines do not mix.
+        metrics = EphemeralMetrics(namespace=self.namespace, service=self.service)
+        for name, value in self.dimensions.items():
+            metrics.add_dimension(name=name, value=value)
+        metrics.add_metric(name="TotalDuration", unit=MetricUnit.Milliseconds, value=self.report.total_duration_ms)
+        for record in self.report.stages:
+            prefix = record.name.capitalize()
+            metrics.add_metric(name=f"{prefix}Duration", unit=MetricUnit.Milliseconds, value=record.duration_ms)
+            metrics.add_metric(name=f"{prefix}PeakMemory", unit=MetricUnit.Megabytes, value=record.peak_memory_mb)
+            if record.bytes_in:
+                metrics.add_metric(name=f"{prefix}BytesIn", unit=MetricUnit.Bytes, value=record.bytes_in)
+            if record.bytes_out:
+                metrics.add_metric(name=f"{prefix}BytesOut", unit=MetricUnit.Bytes, value=record.bytes_out)
+            if record.frame_count is not None:
+                metrics.add_metric(name=f"{prefix}FrameCount", unit=MetricUnit.Count, value=record.frame_count)
+            if record.satellite_count is not None:
+                metrics.add_metric(name=f"{prefix}SatelliteCount", unit=MetricUnit.Count, value=record.satellite_count)
+            if record.cache_hit_rate is not None:
+                metrics.add_metric(name=f"{prefix}CacheHitRate", unit=MetricUnit.Percent, value=record.cache_hit_rate * 100)
+            if record.failure_count is not None:
+                metrics.add_metric(name=f"{prefix}FailureCount", unit=MetricUnit.Count, value=record.failure_count)
+        metrics.flush_metrics()
+
+    def write_report(self, path: str) -> None:
+        """Write the measurements as a JSON report, for local runs."""
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump(self.to_dict(), file, indent=2)
+        logger.info("Pipeline metrics report written", extra={"path": path})
+
+
+@contextmanager
+def stage(name: str) -> Iterator[StageMetrics]:
+    """Measure a stage with the active instrumentation, or do nothing if there is none."""
+    instrumentation = current_instrumentation.get()
+    if instrumentation is None:
+        yield StageMetrics(name=name)
+        return
+    with instrumentation.stage(name) as record:
+        yield record
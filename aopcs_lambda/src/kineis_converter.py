@@ -1,29 +1,39 @@
 from io import StringIO
 import os
-from typing import Any, List, Tuple
-import requests
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
 
 from aws_lambda_powertools import Logger
-from aopcs_lambda.src.global_config import global_config
-from aopcs_lambda.src.tools.convert_binary_to_aop_configuration_file_for_previpass import (
-    convert_to_csv,
-    parse_binary_data,
-    FormatReference,
-)
-from aopcs_lambda.src.models.metadata_model import AOPCSMetadataModel
+from aopcs_lambda.src.instrumentation import stage
+from aopcs_lambda.src.profiling import profiled
+
+if TYPE_CHECKING:
+    from aopcs_lambda.src.models.metadata_model import AOPCSMetadataModel
+
+# `requests`, the settings and the decoder are imported on first use to keep the Lambda cold start short.
 
 logger = Logger()
 
-DEFAULT_TIMEOUT = global_config.kineis_timeout
+
+def __getattr__(name: str) -> Any:
+    """Resolve `requests` lazily so `kineis_converter.requests` stays addressable (e.g. by mocks)."""
+    if name == "requests":
+        import requests
+
+        return requests
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 def get_kineis_jwt(client_id: str, client_secret: str) -> Any:
+    import requests
+    from aopcs_lambda.src.global_config import get_global_config
+
+    global_config = get_global_config()
     try:
         response = requests.post(
             global_config.kineis_auth_url,
             headers={"content-type": "application/x-www-form-urlencoded"},
             data={"client_id": client_id, "client_secret": client_secret, "grant_type": "client_credentials"},
-            timeout=DEFAULT_TIMEOUT,
+            timeout=global_config.kineis_timeout,
         )
         response.raise_for_status()
         logger.info("Successfully obtained Kinéis JWT token")
@@ -33,10 +43,27 @@ def get_kineis_jwt(client_id: str, client_secret: str) -> Any:
         raise e
 
 
-def get_allcast_response(jwt_token: str) -> bytes:
+def get_allcast_response(jwt_token: str, api_url: Optional[str] = None, mirror_urls: Optional[List[str]] = None) -> bytes:
+    import requests
+    from aopcs_lambda.src.global_config import get_global_config
+
+    global_config = get_global_config()
     try:
         headers = {"Authorization": f"Bearer {jwt_token}"}
-        response = requests.get(global_config.kineis_api_url, headers=headers, timeout=DEFAULT_TIMEOUT)
+        url = api_url or global_config.kineis_api_url
+        if mirror_urls is None:
+            # The mirrors of the settings stand in for kineis_api_url only: the token of another endpoint must not reach them
+            mirror_urls = global_config.kineis_api_mirror_urls if url == global_config.kineis_api_url else []
+        if global_config.kineis_hedging_enabled or mirror_urls:
+            from aopcs_lambda.src.hedged_requests import hedged_get
+
+            urls = [url] + [mirror for mirror in mirror_urls if mirror != url]
+            # Without hedging, the next endpoint is only requested when the previous one fails
+            delay = global_config.kineis_hedge_delay_seconds if global_config.kineis_hedging_enabled else float("inf")
+            content = hedged_get(urls, headers, global_config.kineis_timeout, delay)
+            logger.info("Successfully fetched Allcast data")
+            return content
+        response = requests.get(url, headers=headers, timeout=global_config.kineis_timeout)
         response.raise_for_status()
         logger.info("Successfully fetched Allcast data")
         return response.content
@@ -46,10 +73,13 @@ def get_allcast_response(jwt_token: str) -> bytes:
 
 
 def process_allcast_binary(binary_data: bytes, output_csv_path: str) -> None:
+    from aopcs_lambda.src.logger import LazyPayload
+    from aopcs_lambda.src.tools.convert_binary_to_aop_configuration_file_for_previpass import convert_to_csv, parse_binary_data, FormatReference
+
     try:
         parsed_data = parse_binary_data(binary_data)
 
-        logger.debug(f"Parsed binary frame: {parsed_data}")
+        logger.debug("Parsed binary frame: %s", LazyPayload(parsed_data))
 
         # Output csv
         convert_to_csv(parsed_data, output_csv_path)
@@ -63,22 +93,92 @@ def process_allcast_binary(binary_data: bytes, output_csv_path: str) -> None:
             elif frame.get("formatReference") in [FormatReference.CS_2_SAT.name, FormatReference.CS_10_SAT.name, FormatReference.CS_17_SAT.name]:
                 constellation_status.append(frame)
             else:
-                logger.warning(f"Unknown format: {frame.get('formatReference')}")
+                logger.warning("Unknown format: %s", frame.get("formatReference"))
 
-        logger.info(f"Extracted Configurations: {configs}")
-        logger.info(f"Constellation status: {constellation_status}")
+        logger.info("Extracted Configurations: %s", LazyPayload(configs))
+        logger.info("Constellation status: %s", LazyPayload(constellation_status))
 
     except Exception as e:
         logger.error(f"Error processing Allcast binary: {e}")
         raise e
 
 
-def fetch_and_convert_kineis_data(client_id: str, client_secret: str, satellite_whitelist: List[str]) -> Tuple[StringIO, AOPCSMetadataModel]:
-    token = get_kineis_jwt(client_id, client_secret)
-    binary_data = get_allcast_response(token)
-    parsed_data = parse_binary_data(binary_data)
-    csv_buffer, metadata = convert_to_csv(parsed_data=parsed_data, satellite_whitelist=satellite_whitelist)
-    return csv_buffer, metadata
+def validate_allcast_binary(binary_data: bytes) -> bytes:
+    """Check the frames before decoding them (`frame_validation` setting): reject the payload, or keep its valid frames."""
+    from aopcs_lambda.src.global_config import get_global_config
+
+    mode = get_global_config().frame_validation
+    if mode == "off":
+        return binary_data
+
+    from aopcs_lambda.src.tools.frame_validation import FrameValidationError, salvage_frames, validate_frames
+
+    report = validate_frames(binary_data)
+    if report.ok:
+        return binary_data
+    if mode == "reject" or not report.valid_frames:
+        logger.error("Invalid Allcast payload", extra={"validation": report.to_dict()})
+        raise FrameValidationError(report)
+    logger.warning("Invalid Allcast frames quarantined", extra={"validation": report.to_dict()})
+    return salvage_frames(binary_data, report)
+
+
+@profiled("fetch_and_convert_kineis_data")
+def fetch_and_convert_kineis_data(
+    client_id: str, client_secret: str, satellite_whitelist: List[str], api_url: Optional[str] = None, mirror_urls: Optional[List[str]] = None
+) -> Tuple[StringIO, "AOPCSMetadataModel", List[Dict[str, Any]]]:
+    """Download the Allcast bulletin (from `api_url`, `kineis_api_url` by default) and convert it to the `aop` file.
+
+    `mirror_urls` are the endpoints equivalent to `api_url`; by default `kineis_api_mirror_urls` when `api_url` is
+    `kineis_api_url`, none otherwise.
+
+    Returns:
+        Tuple[StringIO, AOPCSMetadataModel, List[Dict[str, Any]]]: The `aop` file, its metadata and its satellite rows
+            (see `build_satellite_rows`), from which the other output formats are rendered.
+    """
+    from aopcs_lambda.src.tools.convert_binary_to_aop_configuration_file_for_previpass import (
+        build_metadata_from_csv_rows,
+        build_satellite_rows,
+        get_registry,
+        parse_binary_data,
+        render_aop_text,
+    )
+    from aopcs_lambda.src.global_config import get_global_config
+
+    global_config = get_global_config()
+    with stage("auth"):
+        from aopcs_lambda.src.prefetch import prefetched_token
+
+        token = prefetched_token(client_id, global_config.init_prefetch_token_max_age_seconds, timeout=global_config.kineis_timeout)
+        token = token or get_kineis_jwt(client_id, client_secret)
+    with stage("download") as download_stage:
+        binary_data = get_allcast_response(token, api_url, mirror_urls)
+        download_stage.bytes_out = len(binary_data)
+    with stage("parse") as parse_stage:
+        parse_stage.bytes_in = len(binary_data)
+        binary_data = validate_allcast_binary(binary_data)
+        if satellite_whitelist:
+            from aopcs_lambda.src.tools.frame_selection import select_frames
+
+            binary_data = select_frames(binary_data, get_registry().resolve_addresses(satellite_whitelist))
+        if global_config.frame_cache_enabled:
+            from aopcs_lambda.src.tools.frame_cache import CacheLookups, get_frame_cache, parse_binary_data_cached, persist_frame_cache
+
+            frame_cache = get_frame_cache()
+            lookups = CacheLookups()
+            parsed_data = parse_binary_data_cached(binary_data, frame_cache, lookups)
+            parse_stage.cache_hit_rate = lookups.hit_rate
+            persist_frame_cache(frame_cache)
+        else:
+            parsed_data = parse_binary_data(binary_data)
+        parse_stage.frame_count = len(parsed_data)
+    with stage("convert") as convert_stage:
+        convert_stage.frame_count = len(parsed_data)
+        rows = build_satellite_rows(parsed_data, satellite_whitelist)
+        csv_buffer = render_aop_text(rows)
+        metadata = build_metadata_from_csv_rows(rows)
+        convert_stage.satellite_count = len(rows)
+    return csv_buffer, metadata, rows
 
 
 if __name__ == "__main__":
@@ -104,7 +204,7 @@ if __name__ == "__main__":
 
     # Example usage without a destination CSV file path
     try:
-        csv_buffer, metadata = fetch_and_convert_kineis_data(CLIENT_ID, CLIENT_SECRET, SATELLITE_WHITELIST)
+        csv_buffer, metadata, _ = fetch_and_convert_kineis_data(CLIENT_ID, CLIENT_SECRET, SATELLITE_WHITELIST)
         logger.info(csv_buffer.getvalue())
         logger.info(metadata)
     except Exception as e:
@@ -1,9 +1,13 @@
+import atexit
 import contextvars
+import hashlib
 import json
 import logging
+import logging.handlers
+import queue
 import uuid
 from datetime import datetime, timezone
-from typing import Any, Dict
+from typing import Any, Dict, List, Optional
 
 
 request_id_contextvar = contextvars.ContextVar("request_id", default=str(uuid.uuid4()))
@@ -58,7 +62,92 @@ class JSONLogFormatter(logging.Formatter):
         return json.dumps(record_dict, default=serialize_datetime)
 
 
-def setup_logger(logger_name: str, verbosity: str = "INFO") -> logging.Logger:
+class FastJSONLogFormatter(JSONLogFormatter):
+    """`JSONLogFormatter` serializing with `orjson`, which handles timestamps natively (no `default` hook)."""
+
+    def __init__(self) -> None:
+        import orjson
+
+        super().__init__()
+        self._dumps = orjson.dumps
+
+    def format(self, record: logging.LogRecord) -> str:
+        return self._dumps(self.format_record_dict(record)).decode("utf-8")
+
+
+def has_orjson() -> bool:
+    try:
+        import orjson  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+class LazyPayload:
+    """Log argument summarizing a payload (type, item count and digest), formatted only if the record is emitted.
+
+    `logger.info("Parsed frames: %s", LazyPayload(frames))` costs nothing when the level is disabled. The digest, the
+    first 16 hex characters of the SHA-256 of the bytes or of the sorted JSON, correlates the same payload across
+    records. The payload is written in full with `full=True`, or with the `log_full_payloads` setting when `full` is None.
+
+    Args:
+        payload (Any): Payload to log, JSON serializable.
+        full (Optional[bool]): Write the whole payload instead of its summary.
+    """
+
+    def __init__(self, payload: Any, full: Optional[bool] = None) -> None:
+        self.payload = payload
+        self.full = full
+
+    def _full(self) -> bool:
+        if self.full is not None:
+            return self.full
+        try:
+            from aopcs_lambda.src.global_config import get_global_config
+
+            return get_global_config().log_full_payloads
+        except Exception:
+            return False
+
+    def __str__(self) -> str:
+        if self._full():
+            return json.dumps(self.payload, default=str, separators=(",", ":"))
+        count = len(self.payload) if hasattr(self.payload, "__len__") else 1
+        return f"<{type(self.payload).__name__}, {count} items, {self.digest()}>"
+
+    def digest(self) -> str:
+        """Short SHA-256 of the payload, the same for equal payloads."""
+        if isinstance(self.payload, (bytes, bytearray)):
+            data = bytes(self.payload)
+        else:
+            data = json.dumps(self.payload, default=str, sort_keys=True, separators=(",", ":")).encode("utf-8")
+        return hashlib.sha256(data).hexdigest()[:16]
+
+
+_listeners: List[logging.handlers.QueueListener] = []
+
+
+def stop_log_listeners() -> None:
+    """Flush the records queued by non-blocking loggers and stop their listener threads."""
+    while _listeners:
+        _listeners.pop().stop()
+
+
+atexit.register(stop_log_listeners)
+
+
+def setup_logger(logger_name: str, verbosity: str = "INFO", fast: bool = False, non_blocking: bool = False) -> logging.Logger:
+    """Logger writing JSON records to stdout.
+
+    Args:
+        logger_name (str): Name of the logger.
+        verbosity (str): Log level.
+        fast (bool): Serialize with `orjson` (`FastJSONLogFormatter`) when it is installed.
+        non_blocking (bool): Only enqueue the records (`QueueHandler`); a listener thread formats and writes them.
+
+    Returns:
+        logging.Logger: Configured logger.
+    """
     if not isinstance(verbosity, str):
         logging.info("The --verbosity type isn't correct : Verbosity set to INFO.")
         verbosity_level = "INFO"
@@ -73,8 +162,15 @@ def setup_logger(logger_name: str, verbosity: str = "INFO") -> logging.Logger:
             logging.getLogger().removeHandler(logging.getLogger().handlers[0])
 
         handler_stdout = logging.StreamHandler()
-        handler_stdout.setFormatter(JSONLogFormatter())
-        logger.addHandler(handler_stdout)
+        handler_stdout.setFormatter(FastJSONLogFormatter() if fast and has_orjson() else JSONLogFormatter())
+        if non_blocking:
+            record_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+            listener = logging.handlers.QueueListener(record_queue, handler_stdout, respect_handler_level=True)
+            listener.start()
+            _listeners.append(listener)
+            logger.addHandler(logging.handlers.QueueHandler(record_queue))
+        else:
+            logger.addHandler(handler_stdout)
 
     except Exception as ex:
         raise ValueError(f"Exception occured during the logger creation: {ex}") from ex
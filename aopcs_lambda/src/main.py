@@ -1,28 +1,52 @@
-from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+import contextvars
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta
 from io import BytesIO
 import json
-from typing import Any, Dict
-import boto3
-import botocore.exceptions
-import pytz
-from aws_lambda_powertools.utilities.typing import LambdaContext
+import os
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+from zoneinfo import ZoneInfo
 from aws_lambda_powertools import Logger
-from aopcs_lambda.src.global_config import global_config
+from aopcs_lambda.src.constants import BULLETIN_STATE_FILE
+from aopcs_lambda.src.instrumentation import PipelineInstrumentation, stage
 from aopcs_lambda.src.kineis_converter import fetch_and_convert_kineis_data
+from aopcs_lambda.src.profiling import profiled
+
+if TYPE_CHECKING:
+    from aws_lambda_powertools.utilities.typing import LambdaContext
+    from aopcs_lambda.src.global_config import GlobalConfig, TenantConfig
+    from aopcs_lambda.src.run_lease import RunLease
+
+# boto3, botocore and the settings are imported on first use: they dominate the import time of the handler module.
 
 logger = Logger()
 
+PARIS_TIMEZONE = ZoneInfo("Europe/Paris")
+
 
 def get_s3_client() -> Any:
-    return boto3.client("s3")
+    from aopcs_lambda.src.aws_clients import create_client
+
+    return create_client("s3")
+
+
+def get_regional_s3_client(region: Optional[str]) -> Any:
+    from aopcs_lambda.src.aws_clients import create_client
+
+    return create_client("s3", region_name=region)
 
 
 def get_secrets_client() -> Any:
-    return boto3.client("secretsmanager")
+    from aopcs_lambda.src.aws_clients import create_client
+
+    return create_client("secretsmanager")
 
 
 def get_kineis_secrets(secret_arn: str) -> Dict[str, str]:
     """Fetch Kinéis secrets (client_id and client_secret) from AWS Secrets Manager."""
+    import botocore.exceptions
+
     secrets_client = get_secrets_client()
     try:
         response = secrets_client.get_secret_value(SecretId=secret_arn)
@@ -36,55 +60,264 @@ def get_kineis_secrets(secret_arn: str) -> Dict[str, str]:
         raise e
 
 
-def handler(event: Dict[str, Any], context: LambdaContext) -> None:
-    s3_client = get_s3_client()
+def load_previous_bulletin(s3_client: Any, bucket_name: str, s3_key: str) -> Optional[List[Dict[str, Any]]]:
+    """Rows of the previously published bulletin, None on the first run or when they cannot be read."""
+    import botocore.exceptions
+
+    try:
+        response = s3_client.get_object(Bucket=bucket_name, Key=s3_key)
+        rows: List[Dict[str, Any]] = json.loads(response["Body"].read())
+        return rows
+    except botocore.exceptions.ClientError as e:
+        if e.response.get("Error", {}).get("Code") != "NoSuchKey":
+            logger.warning(f"Could not read the previous bulletin, no delta published: {e}")
+        return None
+    except json.JSONDecodeError as e:
+        logger.warning(f"Invalid previous bulletin, no delta published: {e}")
+        return None
+
+
+def report_pipeline_metrics(instrumentation: PipelineInstrumentation, report_path: Optional[str]) -> None:
+    """Emit the per-stage metrics, and write them as a JSON report when a path is configured."""
+    try:
+        instrumentation.publish_metrics()
+        if report_path:
+            instrumentation.write_report(report_path)
+    except Exception as e:
+        logger.warning(f"Could not report pipeline metrics: {e}")
+
+
+def ingest_tenant(s3_client: Any, global_config: "GlobalConfig", tenant: "TenantConfig", instrumentation: PipelineInstrumentation) -> None:
+    """Fetch, convert and publish the bulletin of one Kinéis account, measured by `instrumentation`."""
+    import botocore.exceptions
+    from aopcs_lambda.src.notifier import get_notifier
+    from aopcs_lambda.src.prefetch import prefetched_secrets
+    from aopcs_lambda.src.tools.compression import upload_args
+
+    bucket_name = global_config.bucket_name
+    aopcs_path = tenant.aopcs_path
+    with instrumentation.activate():
+        # Get secrets
+        with stage("secrets"):
+            secrets = prefetched_secrets(tenant.secret_manager_arn, timeout=global_config.kineis_timeout) or get_kineis_secrets(tenant.secret_manager_arn)
+            client_id = secrets["client_id"]
+            client_secret = secrets["client_secret"]
+
+        # satellite whitelist:
+        satellite_whitelist = tenant.satellite_whitelist.split(",") if tenant.satellite_whitelist else []
+
+        # Fetch & convert data to CSV
+        logger.info("Fetching and converting Kinéis data...", extra={"tenant": tenant.name})
+        csv_output, metadata_obj, rows = fetch_and_convert_kineis_data(
+            client_id, client_secret, satellite_whitelist, api_url=tenant.kineis_api_url, mirror_urls=tenant.kineis_api_mirror_urls
+        )
+
+        notifier = get_notifier(global_config)
+
+        # Convert to bytes for S3 upload, metadata.json last: its upload marks the bulletin as complete
+        with stage("render") as render_stage:
+            upload_date = datetime.now(tz=PARIS_TIMEZONE)
+            artefacts: List[Tuple[str, bytes]] = [(f"{aopcs_path}/aop", csv_output.getvalue().encode("utf-8"))]
+
+            if global_config.binary_output_enabled:
+                from aopcs_lambda.src.tools.aop_binary_format import render_aop_binary
+
+                artefacts.append((f"{aopcs_path}/aop.bin", render_aop_binary(rows, with_crc=global_config.binary_output_crc)))
+
+            if global_config.packed_output_enabled:
+                from aopcs_lambda.src.tools.aop_packed import render_aop_packed
+
+                artefacts.append((f"{aopcs_path}/aop.pack", render_aop_packed(rows)))
+
+            # Previous bulletin: base of the delta and of the change event
+            previous_rows = None
+            if global_config.delta_output_enabled or notifier is not None:
+                previous_rows = load_previous_bulletin(s3_client, bucket_name, f"{aopcs_path}/{BULLETIN_STATE_FILE}")
+
+            if global_config.delta_output_enabled:
+                from aopcs_lambda.src.tools.aop_delta import compute_delta, encode_delta
+
+                if previous_rows is not None:
+                    artefacts.append((f"{aopcs_path}/aop.delta", encode_delta(compute_delta(previous_rows, rows))))
+
+            if global_config.columnar_export_enabled:
+                from aopcs_lambda.src.tools.aop_columnar import archive_key, render_columnar
+
+                columnar, extension = render_columnar(rows, upload_date)
+                archive_prefix = f"{aopcs_path}/archive"
+                if global_config.columnar_archive_prefix:
+                    # Shared archive: one partition per tenant
+                    archive_prefix = global_config.columnar_archive_prefix + (f"/tenant={tenant.name}" if global_config.tenants else "")
+                artefacts.append((archive_key(archive_prefix, upload_date, extension), columnar))
+
+            if global_config.reepoch_cadence_minutes:
+                from aopcs_lambda.src.tools.aop_propagation import reepoch_rows
+                from aopcs_lambda.src.tools.convert_binary_to_aop_configuration_file_for_previpass import render_aop_text
+
+                first_target = upload_date.replace(second=0, microsecond=0)
+                targets = [first_target + timedelta(minutes=global_config.reepoch_cadence_minutes * k) for k in range(1, global_config.reepoch_count + 1)]
+                # Fixed slots, overwritten by every run: slot k holds the AOP at the k-th target epoch
+                for k, reepoched in enumerate(reepoch_rows(rows, targets, j2=global_config.reepoch_j2), start=1):
+                    artefacts.append((f"{aopcs_path}/reepoch/aop-{k}", render_aop_text(reepoched).getvalue().encode("utf-8")))
+
+            if global_config.coverage_enabled:
+                from aopcs_lambda.src.tools.aop_coverage import compute_coverage
+
+                coverage = compute_coverage(
+                    rows, upload_date, horizon_hours=global_config.coverage_horizon_hours, grid_step_deg=global_config.coverage_grid_step_deg
+                )
+                artefacts.append((f"{aopcs_path}/coverage.json", json.dumps(coverage, separators=(",", ":")).encode("utf-8")))
+
+            # Decoded bulletin: base of the next delta, and source of the query handler
+            artefacts.append((f"{aopcs_path}/{BULLETIN_STATE_FILE}", json.dumps(rows, separators=(",", ":")).encode("utf-8")))
+
+            metadata_obj.file_name = "aop"
+            metadata_obj.upload_date = upload_date
+            artefacts.append((f"{aopcs_path}/metadata.json", metadata_obj.model_dump_json().encode("utf-8")))
+
+            if global_config.compressed_variants:
+                from aopcs_lambda.src.tools.compression import compressed_variants
+
+                levels = {"gzip": global_config.compression_gzip_level, "zstd": global_config.compression_zstd_level}
+                artefacts[-1:-1] = compressed_variants(artefacts, global_config.compressed_variants, levels)
+            render_stage.bytes_out = sum(len(body) for _, body in artefacts)
+
+        # Upload
+        with stage("upload") as upload_stage:
+            upload_stage.bytes_in = render_stage.bytes_out
+            try:
+                for s3_key, body in artefacts:
+                    s3_client.upload_fileobj(BytesIO(body), bucket_name, s3_key, ExtraArgs=upload_args(s3_key) or None)
+                    logger.info(f"{s3_key.rsplit('/', 1)[-1]} uploaded successfully", extra={"s3_uri": f"s3://{bucket_name}/{s3_key}"})
+            except botocore.exceptions.ClientError as e:
+                logger.error(f"Error uploading DATA to S3: {e}")
+                raise e
+
+        # Replicas, written from the artefacts in memory. The bulletin is already published: an incomplete replica is
+        # reported (error log and ReplicateFailureCount metric) rather than failing the run, whose retry would ingest again.
+        if global_config.replication_destinations:
+            from aopcs_lambda.src.replication import Replicator
+
+            with stage("replicate") as replicate_stage:
+                replicate_stage.bytes_in = render_stage.bytes_out
+                replicator = Replicator(
+                    get_regional_s3_client, max_workers=global_config.replication_max_workers, max_attempts=global_config.replication_max_attempts
+                )
+                report = replicator.replicate(artefacts, aopcs_path, global_config.replication_destinations, tenant=tenant.name)
+                replicate_stage.failure_count = sum(not result["consistent"] for result in report["destinations"])
+                if report["consistent"]:
+                    logger.info("Artefacts replicated", extra={"replication": report})
+                else:
+                    replicate_stage.succeeded = False
+                    logger.error("Replication incomplete", extra={"replication": report})
+
+        # Change event, once the bulletin is published
+        if notifier is not None:
+            from aopcs_lambda.src.notifier import build_change_event, notify
+
+            with stage("notify"):
+                notify(notifier, build_change_event(rows, previous_rows, metadata_obj, bucket_name, [s3_key for s3_key, _ in artefacts], tenant=tenant.name))
+
+
+@dataclass
+class TenantResult:
+    """Outcome of the ingestion of one tenant."""
+
+    tenant: str
+    succeeded: bool
+    duration_ms: float
+    error: Optional[str] = None
+
+
+@profiled("tenant")
+def run_tenant(s3_client: Any, global_config: "GlobalConfig", tenant: "TenantConfig") -> TenantResult:
+    """Ingest one tenant of a multi-tenant run: its failure is reported, not raised, and its metrics and profile are its own."""
+    instrumentation = PipelineInstrumentation(
+        namespace=global_config.metrics_namespace, tracing_enabled=global_config.tracing_enabled, dimensions={"tenant": tenant.name}
+    )
+    report_path = None
+    if global_config.metrics_report_path:
+        root, extension = os.path.splitext(global_config.metrics_report_path)
+        report_path = f"{root}.{tenant.name}{extension}"
+    error = None
+    try:
+        ingest_tenant(s3_client, global_config, tenant, instrumentation)
+    except Exception as e:
+        logger.exception(f"Kinéis ingestion failed for tenant {tenant.name}: {e}")
+        error = f"{type(e).__name__}: {e}"
+    finally:
+        report_pipeline_metrics(instrumentation, report_path)
+    return TenantResult(tenant.name, error is None, instrumentation.report.total_duration_ms, error)
+
+
+def ingest_tenants(s3_client: Any, global_config: "GlobalConfig") -> List[TenantResult]:
+    """Ingest every configured tenant concurrently, at most `tenants_max_workers` at a time.
+
+    The tenants spend most of their time waiting for the Kinéis API and S3, so threads overlap them: the run takes about
+    as long as the slowest tenant. A failing tenant does not stop the others; the run fails once they all ran.
+    """
+    with ThreadPoolExecutor(max_workers=min(len(global_config.tenants), global_config.tenants_max_workers)) as executor:
+        # Each tenant runs in a copy of the context, with its own active instrumentation
+        futures = [executor.submit(contextvars.copy_context().run, run_tenant, s3_client, global_config, tenant) for tenant in global_config.tenants]
+        results = [future.result() for future in futures]
+
+    logger.info("Tenants ingested", extra={"tenants": [asdict(result) for result in results]})
+    failed = [result for result in results if not result.succeeded]
+    if failed:
+        raise Exception(f"Kinéis ingestion failed for tenants {[result.tenant for result in failed]}: {[result.error for result in failed]}")
+    return results
+
+
+@profiled("handler")
+def handler(event: Dict[str, Any], context: "LambdaContext") -> None:
+    import botocore.exceptions
+    from aopcs_lambda.src.global_config import get_global_config
+
+    from aopcs_lambda.src.prefetch import prefetched_s3_client, wait_for_prefetch
+
+    # The prefetch thread creates clients and authenticates: let it finish before this invocation creates its own
+    wait_for_prefetch()
+    s3_client = prefetched_s3_client() or get_s3_client()
+    instrumentation: Optional[PipelineInstrumentation] = None
+    lease: Optional["RunLease"] = None
+    report_path: Optional[str] = None
     try:
         # Load config from environment
+        global_config = get_global_config()
         bucket_name = global_config.bucket_name
         aopcs_path = global_config.aopcs_path
-        secret_arn = global_config.secret_manager_arn
+        report_path = global_config.metrics_report_path
 
         logger.debug(
             "Loaded environment variables",
             extra={
                 "bucket": bucket_name,
                 "path": aopcs_path,
-                "secret_arn": secret_arn,
+                "secret_arn": global_config.secret_manager_arn,
+                "tenants": [tenant.name for tenant in global_config.tenants],
             },
         )
 
-        # Get secrets
-        secrets = get_kineis_secrets(secret_arn)
-        client_id = secrets["client_id"]
-        client_secret = secrets["client_secret"]
+        if global_config.run_lease_enabled:
+            from aopcs_lambda.src.run_lease import LEASE_FILE, RunLease
 
-        # satellite whitelist:
-        satellite_whitelist = global_config.previpass_v1_satellite_whitelist.split(",") if global_config.previpass_v1_satellite_whitelist else []
+            lease = RunLease(
+                s3_client, bucket_name, f"{aopcs_path}/{LEASE_FILE}", global_config.run_lease_ttl_seconds, run_id=getattr(context, "aws_request_id", None)
+            )
+            owner = lease.acquire()
+            if owner is not None:
+                logger.info(
+                    "Run already in progress, skipping this invocation",
+                    extra={"run_id": lease.run_id, "owner_run_id": owner.get("run_id"), "owner_expires_at": owner.get("expires_at")},
+                )
+                lease = None
+                return
 
-        # Fetch & convert data to CSV
-        logger.info("Fetching and converting Kinéis data...")
-        csv_output, metadata_obj = fetch_and_convert_kineis_data(client_id, client_secret, satellite_whitelist)
-
-        # Convert to bytes for S3 upload
-        csv_bytes = BytesIO(csv_output.getvalue().encode("utf-8"))
-        csv_bytes.seek(0)
-
-        metadata_obj.file_name = "aop"
-        metadata_obj.upload_date = pytz.timezone("Europe/Paris").normalize(datetime.now(tz=pytz.utc))
-        metadata_json_bytes = BytesIO(metadata_obj.model_dump_json().encode("utf-8"))
-        metadata_json_bytes.seek(0)
-
-        # Define S3 key and upload
-        csv_s3_key = f"{aopcs_path}/aop"
-        metadata_s3_key = f"{aopcs_path}/metadata.json"
-        try:
-            s3_client.upload_fileobj(csv_bytes, bucket_name, csv_s3_key)
-            logger.info("CSV uploaded successfully", extra={"s3_uri": f"s3://{bucket_name}/{csv_s3_key}"})
-            s3_client.upload_fileobj(metadata_json_bytes, bucket_name, metadata_s3_key)
-            logger.info("Metadata uploaded successfully", extra={"s3_uri": f"s3://{bucket_name}/{metadata_s3_key}"})
-        except botocore.exceptions.ClientError as e:
-            logger.error(f"Error uploading DATA to S3: {e}")
-            raise e
+        if global_config.tenants:
+            ingest_tenants(s3_client, global_config)
+        else:
+            instrumentation = PipelineInstrumentation(namespace=global_config.metrics_namespace, tracing_enabled=global_config.tracing_enabled)
+            ingest_tenant(s3_client, global_config, global_config.default_tenant(), instrumentation)
 
     except botocore.exceptions.ClientError as e:
         logger.error(f"AWS client error: {e}")
@@ -92,3 +325,15 @@ def handler(event: Dict[str, Any], context: LambdaContext) -> None:
     except Exception as e:
         logger.exception(f"Unexpected error during Kinéis processing: {e}")
         raise e
+    finally:
+        if lease is not None:
+            lease.release()
+        if instrumentation is not None:
+            report_pipeline_metrics(instrumentation, report_path)
+
+
+# Read from the environment, not from the settings: they would import pydantic on the cold start path.
+if os.environ.get("init_prefetch_enabled", "").lower() in ("1", "true", "yes", "on"):
+    from aopcs_lambda.src.prefetch import start_prefetch
+
+    start_prefetch(get_s3_client, get_kineis_secrets)
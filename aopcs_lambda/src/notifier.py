@@ -0,0 +1,140 @@
+"""Change events published once a bulletin is uploaded, so the consumers do not poll `metadata.json`.
+
+The event is a compact JSON document (version 1):
+
+- `type`: `aop.published`;
+- `tenant`, `bucket`, `keys`: where the artefacts of the bulletin were uploaded (`metadata.json` last);
+- `bulletin_hash` / `previous_hash`: `bulletin_hash` of the bulletin, and of the previous one (None on the first run);
+- `changed_satellites` / `removed_satellites`: names of the satellites added or changed since the previous bulletin
+  (all of them on the first run), and of the satellites no longer in it;
+- `prevision_min_date` / `prevision_max_date`, `upload_date`: from `metadata.json`.
+
+The notifier is selected by the `notifier` setting: an SNS topic or an EventBridge bus (`notification_target`), or an
+in-memory list for tests and local runs.
+"""
+
+import json
+from abc import ABC, abstractmethod
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
+
+from aws_lambda_powertools import Logger
+
+if TYPE_CHECKING:
+    from aopcs_lambda.src.global_config import GlobalConfig
+    from aopcs_lambda.src.models.metadata_model import AOPCSMetadataModel
+
+logger = Logger()
+
+EVENT_VERSION = 1
+EVENT_TYPE = "aop.published"
+EVENT_SOURCE = "aopcs-lambda"
+
+
+def build_change_event(
+    rows: List[Dict[str, Any]],
+    previous_rows: Optional[List[Dict[str, Any]]],
+    metadata: "AOPCSMetadataModel",
+    bucket_name: str,
+    keys: List[str],
+    tenant: str = "default",
+) -> Dict[str, Any]:
+    """Change event of a bulletin, see the module documentation."""
+    from aopcs_lambda.src.tools.aop_delta import bulletin_hash, compute_delta
+
+    delta = compute_delta(previous_rows or [], rows)
+    changed = set(delta.get("changed", {})) | {values[0] for values in delta.get("added", [])}
+    dates = json.loads(metadata.model_dump_json())
+    return {
+        "v": EVENT_VERSION,
+        "type": EVENT_TYPE,
+        "tenant": tenant,
+        "bulletin_hash": delta["target"],
+        "previous_hash": None if previous_rows is None else bulletin_hash(previous_rows),
+        "changed_satellites": [row["satName"] for row in rows if row["satName"] in changed],
+        "removed_satellites": delta.get("removed", []),
+        "prevision_min_date": dates.get("satellite_prevision_min_date"),
+        "prevision_max_date": dates.get("satellite_prevision_max_date"),
+        "upload_date": dates.get("upload_date"),
+        "bucket": bucket_name,
+        "keys": keys,
+    }
+
+
+class Notifier(ABC):
+    """Publisher of the change events."""
+
+    @abstractmethod
+    def publish(self, event: Dict[str, Any]) -> None: ...
+
+
+class SnsNotifier(Notifier):
+    """Publish to an SNS topic, with `type` and `tenant` message attributes for the subscription filters."""
+
+    def __init__(self, topic_arn: str, client: Any = None) -> None:
+        from aopcs_lambda.src.aws_clients import create_client
+
+        self.topic_arn = topic_arn
+        self.client = client or create_client("sns")
+
+    def publish(self, event: Dict[str, Any]) -> None:
+        self.client.publish(
+            TopicArn=self.topic_arn,
+            Message=json.dumps(event, separators=(",", ":")),
+            MessageAttributes={name: {"DataType": "String", "StringValue": event[name]} for name in ("type", "tenant")},
+        )
+
+
+class EventBridgeNotifier(Notifier):
+    """Put the event on an EventBridge bus, with `aopcs-lambda` as source and the event type as detail type."""
+
+    def __init__(self, event_bus_name: str, client: Any = None) -> None:
+        from aopcs_lambda.src.aws_clients import create_client
+
+        self.event_bus_name = event_bus_name
+        self.client = client or create_client("events")
+
+    def publish(self, event: Dict[str, Any]) -> None:
+        response = self.client.put_events(
+            Entries=[
+                {"Source": EVENT_SOURCE, "DetailType": event["type"], "Detail": json.dumps(event, separators=(",", ":")), "EventBusName": self.event_bus_name}
+            ]
+        )
+        if response.get("FailedEntryCount"):
+            raise RuntimeError(f"EventBridge rejected the event: {response['Entries']}")
+
+
+class InMemoryNotifier(Notifier):
+    """Keep the events, for tests and local runs."""
+
+    def __init__(self) -> None:
+        self.events: List[Dict[str, Any]] = []
+
+    def publish(self, event: Dict[str, Any]) -> None:
+        self.events.append(event)
+
+
+_in_memory_notifier = InMemoryNotifier()
+
+
+def get_notifier(global_config: "GlobalConfig") -> Optional[Notifier]:
+    """Notifier of the `notifier` setting, None when off."""
+    if global_config.notifier == "off":
+        return None
+    if global_config.notifier == "memory":
+        return _in_memory_notifier
+    if not global_config.notification_target:
+        raise ValueError(f"notification_target is required by the {global_config.notifier} notifier")
+    if global_config.notifier == "sns":
+        return SnsNotifier(global_config.notification_target)
+    return EventBridgeNotifier(global_config.notification_target)
+
+
+def notify(notifier: Notifier, event: Dict[str, Any]) -> bool:
+    """Publish an event; a failure is logged, the bulletin being already published. Returns whether it was sent."""
+    try:
+        notifier.publish(event)
+    except Exception as e:
+        logger.error(f"Could not publish the change event: {e}", extra={"bulletin_hash": event["bulletin_hash"]})
+        return False
+    logger.info("Change event published", extra={"bulletin_hash": event["bulletin_hash"], "changed_satellites": event["changed_satellites"]})
+    return True
@@ -0,0 +1,109 @@
+"""Init-phase prefetch of the clients, the Kinéis secret and the Kinéis token.
+
+The init phase of a Lambda runs with a full CPU before the first invocation. With `init_prefetch_enabled`, the handler
+module starts, in a background thread, the creation of the S3 client and the resolution of the secret of
+`secret_manager_arn` followed by the authentication with its credentials. The handler first waits for the whole
+prefetch (`wait_for_prefetch`), so it does not create its own clients while the prefetch thread still creates and uses
+its clients, then takes the results instead of doing the work on the billed path; whatever failed, timed out or aged is
+done again the usual way.
+
+The token is only used by the first invocation, and only if it is younger than `init_prefetch_token_max_age_seconds`
+(a provisioned container can wait a long time for its first invocation).
+"""
+
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from aws_lambda_powertools import Logger
+
+logger = Logger()
+
+_lock = threading.Lock()
+_futures: Dict[str, "Future[Any]"] = {}
+_started = False
+
+
+def _resolve_credentials(secrets_loader: Callable[[str], Dict[str, str]]) -> Tuple[str, Dict[str, str]]:
+    from aopcs_lambda.src.global_config import get_global_config
+
+    secret_arn = get_global_config().secret_manager_arn
+    return secret_arn, secrets_loader(secret_arn)
+
+
+def _authenticate(credentials: "Future[Tuple[str, Dict[str, str]]]") -> Tuple[str, str, float]:
+    from aopcs_lambda.src.kineis_converter import get_kineis_jwt
+
+    _, secrets = credentials.result()
+    token = get_kineis_jwt(secrets["client_id"], secrets["client_secret"])
+    return secrets["client_id"], token, time.monotonic()
+
+
+def start_prefetch(s3_client_factory: Callable[[], Any], secrets_loader: Callable[[str], Dict[str, str]]) -> None:
+    """Start the prefetch in a background thread, once per container."""
+    global _started
+    with _lock:
+        if _started:
+            return
+        _started = True
+        executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="prefetch")
+        _futures["s3_client"] = executor.submit(s3_client_factory)
+        _futures["credentials"] = executor.submit(_resolve_credentials, secrets_loader)
+        _futures["token"] = executor.submit(_authenticate, _futures["credentials"])
+        executor.shutdown(wait=False)
+
+
+def wait_for_prefetch(timeout: float = 10.0) -> None:
+    """Wait until every prefetch future is done, at most `timeout` seconds."""
+    with _lock:
+        futures = list(_futures.values())
+    if futures:
+        wait(futures, timeout=timeout)
+
+
+def _take(name: str, timeout: float) -> Any:
+    """Result of a prefetch future, None when not started, failed or still running after `timeout` seconds."""
+    with _lock:
+        future = _futures.pop(name, None)
+    if future is None:
+        return None
+    start = time.perf_counter()
+    try:
+        result = future.result(timeout=timeout)
+    except Exception as e:
+        logger.warning(f"Prefetch of the {name} failed, done again: {e!r}")
+        return None
+    logger.debug(f"Prefetched {name} used", extra={"wait_ms": (time.perf_counter() - start) * 1000})
+    return result
+
+
+def prefetched_s3_client(timeout: float = 10.0) -> Optional[Any]:
+    return _take("s3_client", timeout)
+
+
+def prefetched_secrets(secret_arn: str, timeout: float = 10.0) -> Optional[Dict[str, str]]:
+    """Secrets prefetched for `secret_arn`, None otherwise."""
+    credentials = _take("credentials", timeout)
+    if credentials is None or credentials[0] != secret_arn:
+        return None
+    secrets: Dict[str, str] = credentials[1]
+    return secrets
+
+
+def prefetched_token(client_id: str, max_age_seconds: float, timeout: float = 10.0) -> Optional[str]:
+    """Token prefetched for `client_id` if it is younger than `max_age_seconds`, None otherwise."""
+    prefetched = _take("token", timeout)
+    if prefetched is None:
+        return None
+    token_client_id, token, fetched_at = prefetched
+    if token_client_id != client_id or time.monotonic() - fetched_at > max_age_seconds:
+        return None
+    return str(token)
+
+
+def reset_prefetch() -> None:
+    global _started
+    with _lock:
+        _futures.clear()
+        _started = False
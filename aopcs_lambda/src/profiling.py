@@ -0,0 +1,293 @@
+import contextvars
+import functools
+import io
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple, TypeVar, cast
+
+from aws_lambda_powertools import Logger
+
+logger = Logger()
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+# Set while a profiler runs, to its name and the thread it covers (None: every thread), so functions called by a
+# profiled function are not profiled a second time. A profiled function called in another thread (e.g. a tenant) gets
+# its own profile when the running profiler only covers its own thread.
+active_profile: contextvars.ContextVar[Optional[Tuple[str, Optional[int]]]] = contextvars.ContextVar("active_profile", default=None)
+
+# Held while a profiler with process-wide state runs (cProfile, tracemalloc): a second one would fail to start, or stop
+# the first one when it stops.
+exclusive_profile = threading.Lock()
+
+Hotspots = List[Dict[str, Any]]
+
+
+@dataclass
+class ProfileSettings:
+    """Profiling settings resolved from `GlobalConfig`."""
+
+    mode: str = "off"
+    sample_rate: float = 1.0
+    top_n: int = 20
+    sampling_interval_ms: float = 5.0
+    output_dir: Optional[str] = None
+    bucket_name: Optional[str] = None
+    s3_prefix: Optional[str] = None
+
+
+def get_profile_settings() -> ProfileSettings:
+    """Read the profiling settings, profiling stays off when the configuration cannot be loaded."""
+    from aopcs_lambda.src.global_config import get_global_config
+
+    try:
+        global_config = get_global_config()
+    except Exception:
+        return ProfileSettings()
+    return ProfileSettings(
+        mode=global_config.profile_mode,
+        sample_rate=global_config.profile_sample_rate,
+        top_n=global_config.profile_top_n,
+        sampling_interval_ms=global_config.profile_sampling_interval_ms,
+        output_dir=global_config.profile_output_dir,
+        bucket_name=global_config.bucket_name,
+        s3_prefix=global_config.profile_s3_prefix or f"{global_config.aopcs_path}/profiles",
+    )
+
+
+class CProfileProfiler:
+    """Deterministic profile of every Python call of the calling thread, dumped in the `pstats` binary format."""
+
+    extension = "prof"
+    all_threads = sys.version_info >= (3, 12)  # Built on sys.monitoring, which reports the calls of every thread
+    exclusive = True
+
+    def __init__(self, settings: ProfileSettings) -> None:
+        import cProfile
+
+        self.profile = cProfile.Profile()
+
+    def start(self) -> None:
+        self.profile.enable()
+
+    def stop(self) -> None:
+        self.profile.disable()
+
+    def dump(self, top_n: int) -> Tuple[bytes, Hotspots]:
+        import marshal
+        import pstats
+
+        stats = pstats.Stats(self.profile, stream=io.StringIO())
+        entries = sorted(stats.stats.items(), key=lambda item: item[1][2], reverse=True)  # type: ignore[attr-defined]
+        hotspots = [
+            {
+                "function": f"{filename}:{lineno}({function})",
+                "calls": calls,
+                "tottime_ms": round(tottime * 1000, 3),
+                "cumtime_ms": round(cumtime * 1000, 3),
+            }
+            for (filename, lineno, function), (_, calls, tottime, cumtime, _) in entries[:top_n]
+        ]
+        # Same content as `pstats.Stats.dump_stats`, loadable with `pstats.Stats(path)`.
+        return marshal.dumps(stats.stats), hotspots  # type: ignore[attr-defined]
+
+
+class TracemallocProfiler:
+    """Allocations of every thread traced by `tracemalloc`, dumped as a snapshot loadable with `tracemalloc.Snapshot.load`."""
+
+    extension = "tracemalloc"
+    all_threads = True
+    exclusive = True
+
+    def __init__(self, settings: ProfileSettings) -> None:
+        self.snapshot: Any = None
+        self.peak_bytes = 0
+
+    def start(self) -> None:
+        import tracemalloc
+
+        tracemalloc.start(25)
+
+    def stop(self) -> None:
+        import tracemalloc
+
+        self.snapshot = tracemalloc.take_snapshot()
+        self.peak_bytes = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    def dump(self, top_n: int) -> Tuple[bytes, Hotspots]:
+        hotspots: Hotspots = [
+            {"location": str(stat.traceback[0]), "size_kb": round(stat.size / 1024, 3), "count": stat.count}
+            for stat in self.snapshot.statistics("lineno")[:top_n]
+        ]
+        hotspots.insert(0, {"location": "peak", "size_kb": round(self.peak_bytes / 1024, 3), "count": None})
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "snapshot")
+            self.snapshot.dump(path)
+            with open(path, "rb") as file:
+                return file.read(), hotspots
+
+
+class SamplingProfiler:
+    """Statistical profile of the calling thread, cheap enough to stay enabled in production.
+
+    A daemon thread records the stack of the profiled thread every `sampling_interval_ms`. The artefact uses the
+    collapsed-stack format (`frame;frame;frame count` per line) read by flamegraph.pl and speedscope.
+    """
+
+    extension = "collapsed"
+    all_threads = False
+    exclusive = False
+
+    def __init__(self, settings: ProfileSettings) -> None:
+        self.interval = settings.sampling_interval_ms / 1000
+        self.samples: Counter[str] = Counter()
+        self._target_thread_id = threading.get_ident()
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="aopcs-sampling-profiler", daemon=True)
+
+    def _run(self) -> None:
+        while not self._stopped.wait(self.interval):
+            frame = sys._current_frames().get(self._target_thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                frame = frame.f_back
+            if stack:
+                self.samples[";".join(reversed(stack))] += 1
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stopped.set()
+        self._thread.join()
+
+    def dump(self, top_n: int) -> Tuple[bytes, Hotspots]:
+        total = sum(self.samples.values())
+        leaves: Counter[str] = Counter()
+        for stack, count in self.samples.items():
+            leaves[stack.rsplit(";", 1)[-1]] += count
+        hotspots = [{"function": function, "samples": count, "share": round(count / total, 4)} for function, count in leaves.most_common(top_n)]
+        collapsed = "\n".join(f"{stack} {count}" for stack, count in self.samples.most_common())
+        return collapsed.encode("utf-8"), hotspots
+
+
+PROFILERS: Dict[str, Any] = {
+    "cprofile": CProfileProfiler,
+    "tracemalloc": TracemallocProfiler,
+    "sample": SamplingProfiler,
+}
+
+
+def store_profile_artefact(name: str, extension: str, data: bytes, settings: ProfileSettings) -> str:
+    """Write a profile to the local output directory, or upload it under the S3 profile prefix.
+
+    Returns:
+        str: Location of the stored profile.
+    """
+    now = datetime.now(tz=timezone.utc)
+    filename = f"{now.strftime('%Y%m%dT%H%M%S%fZ')}-{name}.{extension}"
+    if settings.output_dir:
+        os.makedirs(settings.output_dir, exist_ok=True)
+        path = os.path.join(settings.output_dir, filename)
+        with open(path, "wb") as file:
+            file.write(data)
+        return path
+
+    from aopcs_lambda.src.aws_clients import create_client
+
+    key = f"{settings.s3_prefix}/{now.strftime('%Y-%m-%d')}/{filename}"
+    create_client("s3").put_object(Bucket=settings.bucket_name, Key=key, Body=data)
+    return f"s3://{settings.bucket_name}/{key}"
+
+
+def start_profiler(profiler: Any, name: str) -> bool:
+    """Start a profiler; False when it cannot run now, the call then runs unprofiled."""
+    if profiler.exclusive and not exclusive_profile.acquire(blocking=False):
+        logger.debug(f"{name} not profiled: another {profiler.extension} profile is running")
+        return False
+    try:
+        profiler.start()
+    except Exception as e:
+        if profiler.exclusive:
+            exclusive_profile.release()
+        logger.warning(f"Could not start the profiler of {name}: {e}")
+        return False
+    return True
+
+
+def stop_profiler(profiler: Any, name: str) -> bool:
+    """Stop a started profiler; False when it failed, its profile is then dropped."""
+    try:
+        profiler.stop()
+    except Exception as e:
+        logger.warning(f"Could not stop the profiler of {name}: {e}")
+        return False
+    finally:
+        if profiler.exclusive:
+            exclusive_profile.release()
+    return True
+
+
+def store_profile(profiler: Any, name: str, settings: ProfileSettings, duration_ms: float) -> None:
+    """Store the artefact of a stopped profiler and log its hotspots; a failure is only logged."""
+    try:
+        data, hotspots = profiler.dump(settings.top_n)
+        location = store_profile_artefact(name, profiler.extension, data, settings)
+        logger.info(
+            f"Profile of {name} stored",
+            extra={"profile_mode": settings.mode, "location": location, "duration_ms": round(duration_ms, 3), "hotspots": hotspots},
+        )
+    except Exception as e:
+        logger.warning(f"Could not store the profile of {name}: {e}")
+
+
+def profiled(name: str) -> Callable[[F], F]:
+    """Profile each call of the decorated function according to `profile_mode` (off, cprofile, tracemalloc, sample).
+
+    Only a `profile_sample_rate` share of the calls is profiled. A profile artefact is stored per call and the
+    `profile_top_n` hotspots are logged. Calls nested in an already profiled call are covered by the outer profile,
+    unless they run in a thread it does not cover: they then get their own profile, except with cprofile and
+    tracemalloc, which only run one at a time (the call runs unprofiled). A profiler that cannot start leaves the call
+    unprofiled.
+
+    Args:
+        name (str): Name of the profiled function in the artefact and logs.
+    """
+
+    def decorator(func: F) -> F:
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            active = active_profile.get()
+            if active is not None and active[1] in (None, threading.get_ident()):
+                return func(*args, **kwargs)
+            settings = get_profile_settings()
+            if settings.mode not in PROFILERS or random.random() >= settings.sample_rate:  # nosec B311
+                return func(*args, **kwargs)
+
+            profiler = PROFILERS[settings.mode](settings)
+            if not start_profiler(profiler, name):
+                return func(*args, **kwargs)
+            token = active_profile.set((name, None if profiler.all_threads else threading.get_ident()))
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                duration_ms = (time.perf_counter() - start) * 1000
+                stopped = stop_profiler(profiler, name)
+                active_profile.reset(token)
+                if stopped:
+                    store_profile(profiler, name, settings, duration_ms)
+
+        return cast(F, wrapper)
+
+    return decorator
@@ -0,0 +1,144 @@
+import base64
+from collections import OrderedDict
+import json
+import time
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Sequence, Tuple
+from aws_lambda_powertools import Logger
+from aopcs_lambda.src.constants import BULLETIN_STATE_FILE
+
+if TYPE_CHECKING:
+    from aws_lambda_powertools.utilities.typing import LambdaContext
+
+# Read side of the AOP: serves the current bulletin, or a subset of its satellites, from memory.
+# The decoded bulletin (`bulletin.json`) and the rendered responses survive across warm invocations; they are
+# revalidated against the ETag of `metadata.json`, uploaded last by `main.handler`.
+
+logger = Logger()
+
+RESPONSE_FORMATS = {
+    "text": "text/plain; charset=utf-8",
+    "binary": "application/octet-stream",
+    "json": "application/json",
+}
+
+ResponseKey = Tuple[str, Optional[Tuple[str, ...]]]
+
+
+class BulletinStore:
+    """Current bulletin and an LRU cache of its rendered responses.
+
+    Args:
+        s3_client (Any): S3 client.
+        bucket_name (str): Bucket of the AOP.
+        aopcs_path (str): Prefix of the AOP in the bucket.
+        revalidate_seconds (float): Minimum delay between two checks of the ETag of `metadata.json`.
+        cache_size (int): Number of rendered responses kept.
+    """
+
+    def __init__(self, s3_client: Any, bucket_name: str, aopcs_path: str, revalidate_seconds: float, cache_size: int) -> None:
+        self.s3_client = s3_client
+        self.bucket_name = bucket_name
+        self.aopcs_path = aopcs_path
+        self.revalidate_seconds = revalidate_seconds
+        self.cache_size = cache_size
+        self.etag: Optional[str] = None
+        self.rows: List[Dict[str, Any]] = []
+        self.checked_at = 0.0
+        self.responses: "OrderedDict[ResponseKey, str]" = OrderedDict()
+
+    def refresh(self) -> None:
+        """Reload the bulletin when `metadata.json` changed since the last check."""
+        now = time.monotonic()
+        if self.etag is not None and now - self.checked_at < self.revalidate_seconds:
+            return
+        etag = self.s3_client.head_object(Bucket=self.bucket_name, Key=f"{self.aopcs_path}/metadata.json")["ETag"]
+        if etag != self.etag:
+            response = self.s3_client.get_object(Bucket=self.bucket_name, Key=f"{self.aopcs_path}/{BULLETIN_STATE_FILE}")
+            self.rows = json.loads(response["Body"].read())
+            self.responses.clear()
+            self.etag = etag
+            logger.info("Bulletin loaded", extra={"etag": etag, "satellite_count": len(self.rows)})
+        self.checked_at = now
+
+    def query(self, satellites: Optional[Sequence[str]], response_format: str) -> str:
+        """Body of the response for these satellites (all when None) in this format (base64 for `binary`)."""
+        self.refresh()
+        key: ResponseKey = (response_format, tuple(sorted(set(satellites))) if satellites is not None else None)
+        body = self.responses.get(key)
+        if body is not None:
+            self.responses.move_to_end(key)
+            return body
+
+        rows = self.rows if key[1] is None else [row for row in self.rows if row["satName"].strip() in key[1]]
+        body = render_response(rows, response_format)
+        self.responses[key] = body
+        if len(self.responses) > self.cache_size:
+            self.responses.popitem(last=False)
+        return body
+
+
+def render_response(rows: List[Dict[str, Any]], response_format: str) -> str:
+    if response_format == "text":
+        from aopcs_lambda.src.tools.convert_binary_to_aop_configuration_file_for_previpass import render_aop_text
+
+        return render_aop_text(rows).getvalue()
+    if response_format == "binary":
+        from aopcs_lambda.src.tools.aop_binary_format import render_aop_binary
+
+        return base64.b64encode(render_aop_binary(rows)).decode("ascii")
+    return json.dumps(rows, separators=(",", ":"))
+
+
+_store: Optional[BulletinStore] = None
+
+
+def get_bulletin_store() -> BulletinStore:
+    """Store of the container, created on the first invocation."""
+    global _store
+    if _store is None:
+        from aopcs_lambda.src.aws_clients import create_client
+        from aopcs_lambda.src.global_config import get_global_config
+
+        global_config = get_global_config()
+        _store = BulletinStore(
+            create_client("s3"),
+            global_config.bucket_name,
+            global_config.aopcs_path,
+            global_config.query_revalidate_seconds,
+            global_config.query_cache_size,
+        )
+    return _store
+
+
+def build_response(status_code: int, content_type: str, body: str, etag: Optional[str] = None, is_base64: bool = False) -> Dict[str, Any]:
+    headers = {"Content-Type": content_type}
+    if etag:
+        headers["ETag"] = etag
+    return {"statusCode": status_code, "headers": headers, "body": body, "isBase64Encoded": is_base64}
+
+
+def handler(event: Dict[str, Any], context: "LambdaContext") -> Dict[str, Any]:
+    """Serve the current AOP.
+
+    Parameters, from the query string (function URL, API Gateway) or the event itself (direct invocation):
+    `satellites`, comma-separated satellite names (all by default), and `format`, `text` (default), `binary` or `json`.
+    """
+    import botocore.exceptions
+
+    params = event.get("queryStringParameters") or event
+    response_format = params.get("format") or "text"
+    satellites = params.get("satellites")
+    if isinstance(satellites, str):
+        satellites = [name.strip() for name in satellites.split(",") if name.strip()]
+    if response_format not in RESPONSE_FORMATS:
+        return build_response(400, "text/plain", f"Unknown format: {response_format}")
+
+    store = get_bulletin_store()
+    try:
+        body = store.query(satellites, response_format)
+    except botocore.exceptions.ClientError as e:
+        if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey"):
+            return build_response(503, "text/plain", "No bulletin published yet")
+        logger.error(f"Error reading the bulletin from S3: {e}")
+        raise e
+    return build_response(200, RESPONSE_FORMATS[response_format], body, etag=store.etag, is_base64=response_format == "binary")
@@ -0,0 +1,134 @@
+"""Replication of the published artefacts to other buckets and prefixes.
+
+The artefacts are written from memory to every destination concurrently, right after the primary upload: nothing is
+read back from the primary bucket. Each destination gets the artefacts in the publication order (`metadata.json`
+last), each upload being retried with an exponential backoff; a destination stops at its first artefact that keeps
+failing, so its `metadata.json` never announces an incomplete bulletin. Every upload carries the MD5 of its body, which
+S3 checks before storing it: the consistency report lists, per destination, the keys written with their MD5.
+"""
+
+import base64
+import hashlib
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from aws_lambda_powertools import Logger
+
+from aopcs_lambda.src.tools.compression import compress, is_compressible, upload_args
+
+if TYPE_CHECKING:
+    from aopcs_lambda.src.global_config import DestinationConfig
+
+logger = Logger()
+
+RETRY_BASE_DELAY_SECONDS = 0.2
+
+
+@dataclass
+class DestinationResult:
+    """Outcome of the replication to one destination."""
+
+    bucket: str
+    prefix: str
+    keys: Dict[str, str] = field(default_factory=dict)  # Key: MD5 of the body
+    missing_keys: List[str] = field(default_factory=list)
+    attempts: int = 0
+    duration_ms: float = 0.0
+    error: Optional[str] = None
+
+    @property
+    def consistent(self) -> bool:
+        return self.error is None
+
+
+def destination_key(s3_key: str, aopcs_path: str, prefix: str) -> str:
+    """Key of an artefact in a destination: its path relative to `aopcs_path`, under `prefix`."""
+    relative = s3_key[len(aopcs_path) + 1 :] if s3_key.startswith(f"{aopcs_path}/") else s3_key
+    return f"{prefix.rstrip('/')}/{relative}" if prefix else relative
+
+
+def selected_artefacts(artefacts: Sequence[Tuple[str, bytes]], aopcs_path: str, destination: "DestinationConfig") -> List[Tuple[str, bytes]]:
+    if not destination.artefacts:
+        return list(artefacts)
+    return [(s3_key, body) for s3_key, body in artefacts if destination_key(s3_key, aopcs_path, "") in destination.artefacts]
+
+
+class Replicator:
+    """Write the artefacts of a bulletin to several destinations.
+
+    Args:
+        client_factory (Callable[[Optional[str]], Any]): S3 client of a region (None: the region of the function).
+        max_workers (int): Destinations written at the same time.
+        max_attempts (int): Attempts of each upload.
+    """
+
+    def __init__(self, client_factory: Callable[[Optional[str]], Any], max_workers: int = 4, max_attempts: int = 3) -> None:
+        self.client_factory = client_factory
+        self.max_workers = max_workers
+        self.max_attempts = max_attempts
+        self._clients: Dict[Optional[str], Any] = {}
+        self._lock = threading.Lock()
+
+    def client(self, region: Optional[str]) -> Any:
+        with self._lock:
+            if region not in self._clients:
+                self._clients[region] = self.client_factory(region)
+            return self._clients[region]
+
+    def put(self, client: Any, bucket: str, s3_key: str, body: bytes, extra_args: Dict[str, str], result: DestinationResult) -> None:
+        """Upload with retries; S3 rejects a body that does not match its MD5."""
+        md5 = hashlib.md5(body, usedforsecurity=False)
+        attempt = 0
+        while True:
+            attempt += 1
+            result.attempts += 1
+            try:
+                client.put_object(Bucket=bucket, Key=s3_key, Body=body, ContentMD5=base64.b64encode(md5.digest()).decode("ascii"), **extra_args)
+                result.keys[s3_key] = md5.hexdigest()
+                return
+            except Exception as e:
+                if attempt >= self.max_attempts:
+                    raise e
+                logger.warning(f"Replication upload failed, retrying: {e}", extra={"s3_uri": f"s3://{bucket}/{s3_key}"})
+                time.sleep(RETRY_BASE_DELAY_SECONDS * 2 ** (attempt - 1))
+
+    def replicate_to(self, artefacts: Sequence[Tuple[str, bytes]], aopcs_path: str, destination: "DestinationConfig", prefix: str) -> DestinationResult:
+        result = DestinationResult(bucket=destination.bucket, prefix=prefix)
+        start = time.perf_counter()
+        selected = selected_artefacts(artefacts, aopcs_path, destination)
+        try:
+            client = self.client(destination.region)
+            for s3_key, body in selected:
+                extra_args = upload_args(s3_key)
+                if destination.compression and not extra_args and is_compressible(s3_key):
+                    body = compress(body, destination.compression, destination.compression_level)
+                    extra_args = {"ContentEncoding": destination.compression}
+                self.put(client, destination.bucket, destination_key(s3_key, aopcs_path, prefix), body, extra_args, result)
+        except Exception as e:
+            logger.error(f"Replication failed: {e}", extra={"bucket": destination.bucket, "prefix": prefix})
+            result.error = f"{type(e).__name__}: {e}"
+            result.missing_keys = [key for key in (destination_key(s3_key, aopcs_path, prefix) for s3_key, _ in selected) if key not in result.keys]
+        result.duration_ms = (time.perf_counter() - start) * 1000
+        return result
+
+    def replicate(
+        self, artefacts: Sequence[Tuple[str, bytes]], aopcs_path: str, destinations: Sequence["DestinationConfig"], tenant: str = "default"
+    ) -> Dict[str, Any]:
+        """Write the artefacts to every destination (prefixes may use `{tenant}`).
+
+        Returns:
+            Dict[str, Any]: Consistency report: `consistent` when every destination holds every artefact, and the
+                result of each destination.
+        """
+        with ThreadPoolExecutor(max_workers=max(1, min(len(destinations), self.max_workers))) as executor:
+            futures = [
+                executor.submit(self.replicate_to, artefacts, aopcs_path, destination, destination.prefix.format(tenant=tenant)) for destination in destinations
+            ]
+            results = [future.result() for future in futures]
+        return {
+            "consistent": all(result.consistent for result in results),
+            "destinations": [asdict(result) | {"consistent": result.consistent} for result in results],
+        }
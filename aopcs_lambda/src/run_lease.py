@@ -0,0 +1,99 @@
+import json
+import time
+import uuid
+from typing import Any, Dict, Optional
+from aws_lambda_powertools import Logger
+
+# Lease of a run of the handler, held as an S3 object created with a conditional put (`If-None-Match: *`): a duplicate
+# delivery of the scheduled event, or a manual invocation overlapping a scheduled one, finds the lease taken and exits.
+# The lease expires after its TTL, so a crashed run does not block the next ones.
+
+logger = Logger()
+
+LEASE_FILE = "run.lock"
+MAX_ACQUIRE_ATTEMPTS = 3  # Races lost to other runs before giving up
+
+
+def is_precondition_failed(error: Exception) -> bool:
+    import botocore.exceptions
+
+    return isinstance(error, botocore.exceptions.ClientError) and error.response.get("Error", {}).get("Code") in ("PreconditionFailed", "412")
+
+
+def is_no_such_key(error: Exception) -> bool:
+    import botocore.exceptions
+
+    return isinstance(error, botocore.exceptions.ClientError) and error.response.get("Error", {}).get("Code") in ("NoSuchKey", "404")
+
+
+class RunLease:
+    """Exclusive lease of a run, as an S3 object.
+
+    Args:
+        s3_client (Any): S3 client.
+        bucket_name (str): Bucket of the lease object.
+        s3_key (str): Key of the lease object.
+        ttl_seconds (float): Lifetime of the lease; an expired lease can be taken over.
+        run_id (Optional[str]): Identifier of this run, random by default.
+    """
+
+    def __init__(self, s3_client: Any, bucket_name: str, s3_key: str, ttl_seconds: float, run_id: Optional[str] = None) -> None:
+        self.s3_client = s3_client
+        self.bucket_name = bucket_name
+        self.s3_key = s3_key
+        self.ttl_seconds = ttl_seconds
+        self.run_id = run_id or str(uuid.uuid4())
+        self.etag: Optional[str] = None
+
+    def _document(self) -> bytes:
+        now = time.time()
+        return json.dumps({"run_id": self.run_id, "acquired_at": now, "expires_at": now + self.ttl_seconds}).encode("utf-8")
+
+    def acquire(self) -> Optional[Dict[str, Any]]:
+        """Take the lease.
+
+        Returns:
+            Optional[Dict[str, Any]]: None when the lease is taken, otherwise the lease of the run that owns it.
+
+        Raises:
+            RuntimeError: Every attempt lost a race against another run (lease released or taken over meanwhile).
+        """
+        for _ in range(MAX_ACQUIRE_ATTEMPTS):
+            try:
+                self.etag = self.s3_client.put_object(Bucket=self.bucket_name, Key=self.s3_key, Body=self._document(), IfNoneMatch="*")["ETag"]
+                return None
+            except Exception as e:
+                if not is_precondition_failed(e):
+                    raise e
+
+            try:
+                response = self.s3_client.get_object(Bucket=self.bucket_name, Key=self.s3_key)
+            except Exception as e:
+                if not is_no_such_key(e):
+                    raise e
+                continue  # Released by its owner since the put
+            owner: Dict[str, Any] = json.loads(response["Body"].read())
+            if owner.get("expires_at", 0) > time.time():
+                return owner
+
+            # Expired lease: take it over, unless another run did it first
+            try:
+                self.etag = self.s3_client.put_object(Bucket=self.bucket_name, Key=self.s3_key, Body=self._document(), IfMatch=response["ETag"])["ETag"]
+            except Exception as e:
+                if not is_precondition_failed(e):
+                    raise e
+                continue
+            logger.warning("Expired run lease taken over", extra={"expired_run_id": owner.get("run_id"), "run_id": self.run_id})
+            return None
+        raise RuntimeError(f"Could not acquire the run lease after {MAX_ACQUIRE_ATTEMPTS} attempts")
+
+    def release(self) -> None:
+        """Delete the lease if this run still holds it."""
+        if self.etag is None:
+            return
+        try:
+            self.s3_client.delete_object(Bucket=self.bucket_name, Key=self.s3_key, IfMatch=self.etag)
+        except Exception as e:
+            if not is_precondition_failed(e):
+                logger.warning(f"Could not release the run lease: {e}")
+        self.etag = None
@@ -0,0 +1,97 @@
+from datetime import datetime, timezone
+from typing import Dict, NamedTuple, Optional, Tuple
+
+
+class FieldSpec(NamedTuple):
+    """One field of an Allcast frame, in transmission order.
+
+    Attributes:
+        name (str): Key of the field in the structures returned by `parse_binary_data`.
+        width (int): Width of the field in bits.
+        codec (str): How the raw bits map to the decoded value:
+            `uint` / `int` (two's complement) integers, `scaled` signed fixed point (`raw * scale`),
+            `hex` satellite addresses ("F1"), `text` integers decoded as strings ("0"), `bool` flags,
+            `enum` members of the decoder enum named by `enum`, `date` counts of `scale` seconds since `DATE_EPOCH`.
+        scale (float): Resolution of `scaled` and `date` fields.
+        enum (Optional[str]): Name of the decoder enum (`FormatReference`, `PayloadType`) of `enum` fields.
+    """
+
+    name: str
+    width: int
+    codec: str = "uint"
+    scale: float = 1.0
+    enum: Optional[str] = None
+
+
+Layout = Tuple[FieldSpec, ...]
+
+
+def layout_size_in_bits(layout: Layout) -> int:
+    return sum(field.width for field in layout)
+
+
+def is_layout_available() -> bool:
+    """False in the public repository, where the bit widths are removed."""
+    return all(field.width > 0 for layout in ALL_LAYOUTS for field in layout)
+
+
+###########################################################################
+## For Security reason, bit widths and resolutions of frames are removed ##
+###########################################################################
+
+DATE_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+# Header common to every frame
+FRAME_HEADER_LAYOUT: Layout = (
+    FieldSpec("broadcasterReference", 0, "text"),
+    FieldSpec("formatReference", 0, "enum", enum="FormatReference"),
+)
+
+# `satelliteData` of AOP_MONOSAT and `satelliteReference` of AOP_MULTISAT
+SATELLITE_DATA_LAYOUT: Layout = (
+    FieldSpec("satelliteAddress", 0, "hex"),
+    FieldSpec("date", 0, "date"),
+    FieldSpec("anLongitude", 0, "scaled"),
+    FieldSpec("anLongitudeDrift", 0, "scaled"),
+    FieldSpec("nodalPeriod", 0, "scaled"),
+    FieldSpec("semiMajorAxis", 0, "uint"),
+    FieldSpec("semiMajorAxisDecay", 0, "scaled"),
+    FieldSpec("inclination", 0, "scaled"),
+)
+
+# Entries of `relativeSatellites` of AOP_MULTISAT
+RELATIVE_SATELLITE_LAYOUT: Layout = (
+    FieldSpec("satelliteAddressRelative", 0, "hex"),
+    FieldSpec("deltaDateRelative", 0, "scaled"),
+)
+MULTISAT_RELATIVE_SATELLITE_COUNT = 4
+
+AOP_FRAME_CHECK_SEQUENCE_LAYOUT: Layout = (FieldSpec("frameCheckSequence", 0, "uint"),)
+
+# Constellation status formats (CS_2_SAT, CS_10_SAT, CS_17_SAT)
+CONSTELLATION_STATUS_HEADER_LAYOUT: Layout = (
+    FieldSpec("counter", 0, "uint"),
+    FieldSpec("index", 0, "uint"),
+    FieldSpec("totalNumberOfMessages", 0, "uint"),
+)
+
+# Entries of `satellitesStatus`
+SATELLITE_STATUS_LAYOUT: Layout = (
+    FieldSpec("satelliteAddress", 0, "hex"),
+    FieldSpec("payloadType", 0, "enum", enum="PayloadType"),
+    FieldSpec("payloadUplinkMissionStatus", 0, "bool"),
+    FieldSpec("payloadDownlinkMissionStatus", 0, "bool"),
+)
+CONSTELLATION_STATUS_SLOTS: Dict[str, int] = {"CS_2_SAT": 2, "CS_10_SAT": 10, "CS_17_SAT": 17}
+
+CS_FRAME_CHECK_SEQUENCE_LAYOUT: Layout = (FieldSpec("fcs", 0, "uint"),)
+
+ALL_LAYOUTS: Tuple[Layout, ...] = (
+    FRAME_HEADER_LAYOUT,
+    SATELLITE_DATA_LAYOUT,
+    RELATIVE_SATELLITE_LAYOUT,
+    AOP_FRAME_CHECK_SEQUENCE_LAYOUT,
+    CONSTELLATION_STATUS_HEADER_LAYOUT,
+    SATELLITE_STATUS_LAYOUT,
+    CS_FRAME_CHECK_SEQUENCE_LAYOUT,
+)
@@ -0,0 +1,207 @@
+"""Compact binary encoding of the `aop` file, published as `aop.bin`.
+
+Layout (little-endian, version 1):
+
+- Header, 8 bytes: magic `b"AOPB"`, version (uint8), flags (uint8, bit 0 set when a CRC is appended),
+  record count (uint16).
+- String table: count (uint8), then for each string its length (uint8) and its UTF-8 bytes. It holds the
+  satellite names, hexadecimal ids, DCS ids and payload status labels, referenced by index from the records.
+- Records, 33 bytes per satellite, in the order of the `aop` file:
+
+  ======================  ======  ==========================================  ==================
+  Field                   Type    Content                                     Text column
+  ======================  ======  ==========================================  ==================
+  name                    uint8   string index                                satName
+  hex_id                  uint8   string index                                satHexId
+  dcs_id                  uint8   string index                                satDcsId
+  downlink_status         uint8   string index, 255 when missing              downlinkStatus
+  uplink_status           uint8   string index, 255 when missing              uplinkStatus
+  epoch                   uint32  seconds since 1970-01-01T00:00:00Z          year ... second
+  semi_major_axis         int32   metres (km × 1e3)                           semiMajorAxisKm
+  inclination             int32   1e-4 degrees                                inclinationDeg
+  asc_node_longitude      int32   1e-3 degrees                                ascNodeLongitudeDeg
+  asc_node_drift          int32   1e-3 degrees                                ascNodeDriftDeg
+  orbit_period            int32   1e-4 minutes                                orbitPeriodMin
+  semi_major_axis_drift   int32   1e-2 metres per day                         semiMajorAxisDriftMeterPerDay
+  ======================  ======  ==========================================  ==================
+
+- Optional CRC-32 (uint32, `zlib.crc32`) of everything before it.
+
+The fixed-point resolutions are the precisions of the text file, so both files carry exactly the same values.
+"""
+
+import struct
+import zlib
+from datetime import datetime, timezone
+from typing import Any, Dict, List, NamedTuple, Optional
+
+MAGIC = b"AOPB"
+VERSION = 1
+FLAG_CRC = 0x01
+MISSING_STRING = 0xFF
+
+HEADER = struct.Struct("<4sBBH")
+RECORD = struct.Struct("<BBBBBIiiiiii")
+CRC = struct.Struct("<I")
+
+# (text column, fixed-point factor, decimals of the text column, width of the text column)
+FIXED_POINT_FIELDS = [
+    ("semiMajorAxisKm", 1_000, 3, 9),
+    ("inclinationDeg", 10_000, 4, 8),
+    ("ascNodeLongitudeDeg", 1_000, 3, 8),
+    ("ascNodeDriftDeg", 1_000, 3, 8),
+    ("orbitPeriodMin", 10_000, 4, 9),
+    ("semiMajorAxisDriftMeterPerDay", 100, 2, 6),
+]
+
+
+class AopBinaryRecord(NamedTuple):
+    """One satellite of an `aop.bin` file, values in the units of the text file."""
+
+    name: str
+    hex_id: str
+    dcs_id: str
+    downlink_status: Optional[str]
+    uplink_status: Optional[str]
+    epoch: datetime
+    semi_major_axis_km: float
+    inclination_deg: float
+    asc_node_longitude_deg: float
+    asc_node_drift_deg: float
+    orbit_period_min: float
+    semi_major_axis_drift_meter_per_day: float
+
+
+def render_aop_binary(rows: List[Dict[str, Any]], with_crc: bool = True) -> bytes:
+    """Encode the rows of the `aop` file (see `build_satellite_rows`) in the binary format.
+
+    Args:
+        rows (List[Dict[str, Any]]): Satellite rows, as rendered in the text file.
+        with_crc (bool): Append a CRC-32 of the payload.
+
+    Returns:
+        bytes: Content of `aop.bin`.
+    """
+    strings: Dict[str, int] = {}
+
+    def string_index(value: Optional[str]) -> int:
+        if value is None:
+            return MISSING_STRING
+        if value not in strings:
+            if len(strings) == MISSING_STRING:
+                raise ValueError("Too many distinct strings for the aop binary format")
+            strings[value] = len(strings)
+        return strings[value]
+
+    records = []
+    for row in rows:
+        epoch = datetime(int(row["year"]), int(row["month"]), int(row["day"]), int(row["hour"]), int(row["minute"]), int(row["second"]), tzinfo=timezone.utc)
+        fixed_point = [round(float(row[column]) * factor) for column, factor, _, _ in FIXED_POINT_FIELDS]
+        records.append(
+            RECORD.pack(
+                string_index(row["satName"]),
+                string_index(row["satHexId"]),
+                string_index(row["satDcsId"]),
+                string_index(row["downlinkStatus"]),
+                string_index(row["uplinkStatus"]),
+                int(epoch.timestamp()),
+                *fixed_point,
+            )
+        )
+
+    string_table = bytearray([len(strings)])
+    for value in strings:
+        encoded = value.encode("utf-8")
+        string_table += bytes([len(encoded)]) + encoded
+
+    payload = HEADER.pack(MAGIC, VERSION, FLAG_CRC if with_crc else 0, len(records)) + bytes(string_table) + b"".join(records)
+    if with_crc:
+        payload += CRC.pack(zlib.crc32(payload))
+    return payload
+
+
+def read_aop_binary(data: bytes) -> List[AopBinaryRecord]:
+    """Decode an `aop.bin` file.
+
+    Args:
+        data (bytes): Content of the file.
+
+    Raises:
+        ValueError: Not an aop binary file, unsupported version, truncated or corrupt file, or CRC mismatch.
+
+    Returns:
+        List[AopBinaryRecord]: Satellites, in the order of the file.
+    """
+    if len(data) < HEADER.size:
+        raise ValueError("Truncated aop binary file")
+    magic, version, flags, count = HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise ValueError("Not an aop binary file")
+    if version != VERSION:
+        raise ValueError(f"Unsupported aop binary version: {version}")
+    if flags & FLAG_CRC:
+        if len(data) < HEADER.size + CRC.size:
+            raise ValueError("Truncated aop binary file")
+        (expected_crc,) = CRC.unpack_from(data, len(data) - CRC.size)
+        data = data[: -CRC.size]
+        if zlib.crc32(data) != expected_crc:
+            raise ValueError("CRC mismatch in aop binary file")
+
+    offset = HEADER.size
+    if offset >= len(data):
+        raise ValueError("Truncated aop binary file")
+    strings = []
+    for _ in range(data[offset]):
+        if offset + 1 >= len(data):
+            raise ValueError("Truncated aop binary file")
+        length = data[offset + 1]
+        if offset + 2 + length > len(data):
+            raise ValueError("Truncated aop binary file")
+        strings.append(data[offset + 2 : offset + 2 + length].decode("utf-8"))
+        offset += 1 + length
+    offset += 1
+    if len(data) != offset + count * RECORD.size:
+        raise ValueError("Truncated aop binary file")
+
+    def string_at(index: int) -> Optional[str]:
+        if index == MISSING_STRING:
+            return None
+        if index >= len(strings):
+            raise ValueError(f"Invalid string index {index} in aop binary file")
+        return strings[index]
+
+    records = []
+    for name, hex_id, dcs_id, downlink, uplink, epoch, *fixed_point in RECORD.iter_unpack(data[offset:]):
+        values = [raw / factor for raw, (_, factor, _, _) in zip(fixed_point, FIXED_POINT_FIELDS)]
+        records.append(
+            AopBinaryRecord(
+                str(string_at(name)),
+                str(string_at(hex_id)),
+                str(string_at(dcs_id)),
+                string_at(downlink),
+                string_at(uplink),
+                datetime.fromtimestamp(epoch, tz=timezone.utc),
+                *values,
+            )
+        )
+    return records
+
+
+def record_to_row(record: AopBinaryRecord) -> Dict[str, Any]:
+    """Format a record as a row of the text `aop` file."""
+    row: Dict[str, Any] = {
+        "satName": record.name,
+        "satHexId": record.hex_id,
+        "satDcsId": record.dcs_id,
+        "downlinkStatus": record.downlink_status,
+        "uplinkStatus": record.uplink_status,
+        "year": record.epoch.strftime("%Y"),
+        "month": record.epoch.strftime("%m"),
+        "day": record.epoch.strftime("%d"),
+        "hour": record.epoch.strftime("%H"),
+        "minute": record.epoch.strftime("%M"),
+        "second": record.epoch.strftime("%S"),
+    }
+    for (column, _, decimals, width), value in zip(FIXED_POINT_FIELDS, record[6:]):
+        row[column] = f"{value:>{width}.{decimals}f}"
+    return row
@@ -0,0 +1,102 @@
+"""Columnar export of the satellite rows of the `aop` file, for analytics.
+
+Each bulletin is written as one Parquet file when `pyarrow` is installed, otherwise as a NumPy `.npz` archive, with
+typed columns:
+
+- `satName`, `satHexId`, `satDcsId`, `downlinkStatus`, `uplinkStatus`: strings (missing statuses are empty);
+- `epoch`: timestamp (seconds, UTC) of the orbital elements;
+- `semiMajorAxisKm`, `inclinationDeg`, `ascNodeLongitudeDeg`, `ascNodeDriftDeg`, `orbitPeriodMin`,
+  `semiMajorAxisDriftMeterPerDay`: float64;
+- `bulletinTime`: timestamp (seconds, UTC) of the publication of the bulletin.
+
+Archived bulletins are partitioned by publication date (`date=YYYY-MM-DD/`, Hive style), so a period is loaded with a
+single read of the partitions, see `read_columnar_files`.
+"""
+
+from datetime import datetime, timezone
+from io import BytesIO
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+STRING_COLUMNS = ["satName", "satHexId", "satDcsId", "downlinkStatus", "uplinkStatus"]
+FLOAT_COLUMNS = ["semiMajorAxisKm", "inclinationDeg", "ascNodeLongitudeDeg", "ascNodeDriftDeg", "orbitPeriodMin", "semiMajorAxisDriftMeterPerDay"]
+TIMESTAMP_COLUMNS = ["epoch", "bulletinTime"]
+
+Columns = Dict[str, np.ndarray]
+
+
+def has_pyarrow() -> bool:
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def rows_to_columns(rows: List[Dict[str, Any]], bulletin_time: datetime) -> Columns:
+    """Typed columns of the rows of the `aop` file (see `build_satellite_rows`)."""
+    columns: Columns = {name: np.array(["" if row[name] is None else str(row[name]) for row in rows], dtype=str) for name in STRING_COLUMNS}
+    columns["epoch"] = np.array(
+        [f"{row['year']}-{row['month']}-{row['day']}T{row['hour']}:{row['minute']}:{row['second']}" for row in rows],
+        dtype="datetime64[s]",
+    )
+    for name in FLOAT_COLUMNS:
+        columns[name] = np.array([float(row[name]) for row in rows], dtype=np.float64)
+    bulletin_time_utc = bulletin_time.astimezone(timezone.utc).replace(tzinfo=None)
+    columns["bulletinTime"] = np.full(len(rows), np.datetime64(bulletin_time_utc, "s"))
+    return columns
+
+
+def render_columnar(rows: List[Dict[str, Any]], bulletin_time: datetime, file_format: Optional[str] = None) -> Tuple[bytes, str]:
+    """Write the rows as a columnar file.
+
+    Args:
+        rows (List[Dict[str, Any]]): Satellite rows of the bulletin.
+        bulletin_time (datetime): Publication time of the bulletin (timezone aware).
+        file_format (Optional[str]): `parquet` or `npz`; by default Parquet when `pyarrow` is installed.
+
+    Returns:
+        Tuple[bytes, str]: Content of the file and its extension.
+    """
+    file_format = file_format or ("parquet" if has_pyarrow() else "npz")
+    columns = rows_to_columns(rows, bulletin_time)
+    buffer = BytesIO()
+    if file_format == "parquet":
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        arrays = {
+            name: pa.array(values, type=pa.timestamp("s", tz="UTC")) if name in TIMESTAMP_COLUMNS else pa.array(values) for name, values in columns.items()
+        }
+        pq.write_table(pa.table(arrays), buffer, compression="zstd")
+    elif file_format == "npz":
+        np.savez_compressed(buffer, **columns)  # type: ignore[arg-type]
+    else:
+        raise ValueError(f"Unknown columnar format: {file_format}")
+    return buffer.getvalue(), file_format
+
+
+def archive_key(prefix: str, bulletin_time: datetime, extension: str) -> str:
+    """Key of a bulletin in the archive, partitioned by UTC publication date."""
+    bulletin_time = bulletin_time.astimezone(timezone.utc)
+    return f"{prefix}/date={bulletin_time:%Y-%m-%d}/aop-{bulletin_time:%H%M%S}.{extension}"
+
+
+def read_columnar_files(paths: Iterable[str]) -> Columns:
+    """Load archived bulletins as one set of columns, concatenated in the order of `paths`.
+
+    Parquet files are read in one `pyarrow` call; `.npz` archives are concatenated column by column.
+    """
+    paths = list(paths)
+    if not paths:
+        return {}
+    if all(path.endswith(".parquet") for path in paths):
+        import pyarrow.parquet as pq
+
+        table = pq.read_table(paths, partitioning=None)
+        return {name: table.column(name).to_numpy() for name in table.column_names}
+    if all(path.endswith(".npz") for path in paths):
+        archives = [np.load(path) for path in paths]
+        return {name: np.concatenate([archive[name] for archive in archives]) for name in archives[0].files}
+    raise ValueError("Cannot mix Parquet and npz files in one read")
@@ -0,0 +1,156 @@
+"""Coverage statistics of the constellation of the current AOP over a latitude/longitude grid.
+
+Each satellite is flown on its AOP elements (near circular orbit, epoch at the ascending node, node longitude moving by
+`ascNodeDriftDeg` per orbit as in `aop_propagation`). A grid point sees a satellite when the satellite is above
+`min_elevation_deg`, i.e. when the angle between the point and the sub-satellite point is below the half-angle of the
+visibility cone. For every grid point, over the horizon:
+
+- `passes_per_day`: number of contacts (runs of visibility of any satellite) per day;
+- `visibility_min_per_day`: minutes of visibility per day;
+- `mean_revisit_min`, `max_revisit_min`: mean and longest gap between two contacts (None with less than two contacts).
+
+The visibility is computed by chunks of time steps, in parallel threads (the NumPy kernels release the GIL), then the
+contacts and gaps of all grid points are extracted at once from the stitched visibility matrix. A chunk takes as many
+time steps as fit its (grid points, satellites, time steps) working arrays in `CHUNK_MEMORY_BYTES`.
+"""
+
+import math
+import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from aopcs_lambda.src.tools.aop_propagation import EARTH_RADIUS_KM, AopElements
+
+DEFAULT_MIN_ELEVATION_DEG = 5.0
+DEFAULT_STEP_SECONDS = 60.0
+CHUNK_MEMORY_BYTES = 64 * 1024 * 1024  # Working arrays of a chunk, held by each worker
+
+
+def grid(step_deg: float) -> Tuple[np.ndarray, np.ndarray]:
+    """Latitudes and longitudes of the centers of the grid cells, in degrees."""
+    latitudes = np.arange(-90 + step_deg / 2, 90, step_deg)
+    longitudes = np.arange(-180 + step_deg / 2, 180, step_deg)
+    return latitudes, longitudes
+
+
+def unit_vectors(latitudes_rad: np.ndarray, longitudes_rad: np.ndarray) -> np.ndarray:
+    cos_latitudes = np.cos(latitudes_rad)
+    return np.stack((cos_latitudes * np.cos(longitudes_rad), cos_latitudes * np.sin(longitudes_rad), np.sin(latitudes_rad)), axis=-1)
+
+
+def visibility_half_angle(semi_major_axis_km: np.ndarray, min_elevation_deg: float) -> np.ndarray:
+    """Earth central angle between a satellite and the edge of its visibility cone, in radians."""
+    elevation = math.radians(min_elevation_deg)
+    angle: np.ndarray = np.arccos(EARTH_RADIUS_KM / semi_major_axis_km * math.cos(elevation)) - elevation
+    return angle
+
+
+def visibility(elements: AopElements, start: np.datetime64, offsets_min: np.ndarray, points: np.ndarray, min_elevation_deg: float) -> np.ndarray:
+    """Whether each grid point (unit vectors, shape (G, 3)) sees at least one satellite at each time offset, shape (G, T)."""
+    elapsed_min = (start - elements.epoch).astype(np.float64)[:, None] / 60 + offsets_min[None, :]  # (S, T)
+    period = elements.period_min[:, None]
+    argument_of_latitude = 2 * np.pi * elapsed_min / period
+    node = np.radians(elements.asc_node_deg[:, None] + elements.node_drift_deg[:, None] / period * elapsed_min)
+    inclination = np.radians(elements.inclination_deg)[:, None]
+    sin_u = np.sin(argument_of_latitude)
+    latitudes = np.arcsin(np.sin(inclination) * sin_u)
+    longitudes = node + np.arctan2(np.cos(inclination) * sin_u, np.cos(argument_of_latitude))
+    satellites = unit_vectors(latitudes, longitudes)  # (S, T, 3)
+    cos_angles = np.einsum("gk,stk->gst", points, satellites, optimize=True)
+    threshold = np.cos(visibility_half_angle(elements.semi_major_axis_km, min_elevation_deg))[None, :, None]
+    visible: np.ndarray = (cos_angles >= threshold).any(axis=1)
+    return visible
+
+
+def chunk_steps(point_count: int, satellite_count: int, memory_bytes: int = CHUNK_MEMORY_BYTES) -> int:
+    """Time steps of a chunk: its cosines (float64) and their comparison (bool) for every grid point and satellite."""
+    bytes_per_step = point_count * satellite_count * (np.dtype(np.float64).itemsize + np.dtype(np.bool_).itemsize)
+    return max(1, memory_bytes // max(1, bytes_per_step))
+
+
+def contact_statistics(visible: np.ndarray, step_min: float) -> Dict[str, np.ndarray]:
+    """Contacts and revisit gaps of every row of a visibility matrix (G, T)."""
+    point_count = visible.shape[0]
+    visibility_min = visible.sum(axis=1) * step_min
+    transitions = np.diff(visible.astype(np.int8), axis=1)  # +1: contact starts at j + 1, -1: gap starts at j + 1
+    passes = visible[:, 0].astype(np.int64) + (transitions == 1).sum(axis=1)
+
+    rows, columns = np.nonzero(transitions)
+    signs = transitions[rows, columns]
+    gaps = (signs[:-1] == -1) & (signs[1:] == 1) & (rows[:-1] == rows[1:])  # End of a contact followed by the next one
+    gap_rows = rows[:-1][gaps]
+    gap_lengths = (columns[1:][gaps] - columns[:-1][gaps]) * step_min
+    gap_counts = np.bincount(gap_rows, minlength=point_count)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean_revisit = np.bincount(gap_rows, weights=gap_lengths, minlength=point_count) / gap_counts
+    max_revisit = np.full(point_count, np.nan)
+    np.fmax.at(max_revisit, gap_rows, gap_lengths)
+    mean_revisit[gap_counts == 0] = np.nan
+    return {"passes": passes, "visibility_min": visibility_min, "mean_revisit_min": mean_revisit, "max_revisit_min": max_revisit}
+
+
+def compute_coverage(
+    rows: List[Dict[str, Any]],
+    start: datetime,
+    horizon_hours: float = 24.0,
+    grid_step_deg: float = 10.0,
+    step_seconds: float = DEFAULT_STEP_SECONDS,
+    min_elevation_deg: float = DEFAULT_MIN_ELEVATION_DEG,
+    max_workers: Optional[int] = None,
+) -> Dict[str, Any]:
+    """Coverage statistics of the satellites of `rows` (see `build_satellite_rows`) from `start` (timezone aware).
+
+    Returns:
+        Dict[str, Any]: Parameters, grid, per-point statistics (latitude-major lists, None where undefined) and their
+            means over the grid.
+    """
+    latitudes, longitudes = grid(grid_step_deg)
+    lat_grid, lon_grid = np.meshgrid(latitudes, longitudes, indexing="ij")
+    points = unit_vectors(np.radians(lat_grid.ravel()), np.radians(lon_grid.ravel()))
+    step_min = step_seconds / 60
+    offsets_min = np.arange(0, horizon_hours * 60, step_min)
+    days = horizon_hours / 24
+
+    if rows:
+        elements = AopElements.from_rows(rows)
+        start64 = np.datetime64(start.astimezone(timezone.utc).replace(tzinfo=None), "s")
+        steps = chunk_steps(len(points), len(rows))
+        chunks = [offsets_min[i : i + steps] for i in range(0, len(offsets_min), steps)]
+        with ThreadPoolExecutor(max_workers=max_workers or os.cpu_count()) as executor:
+            parts = list(executor.map(lambda chunk: visibility(elements, start64, chunk, points, min_elevation_deg), chunks))
+        visible = np.concatenate(parts, axis=1)
+    else:
+        visible = np.zeros((len(points), len(offsets_min)), dtype=bool)
+    statistics = contact_statistics(visible, step_min)
+
+    def as_grid(values: np.ndarray) -> List[List[Optional[float]]]:
+        shaped = np.round(values, 1).reshape(lat_grid.shape)
+        return [[None if math.isnan(value) else float(value) for value in row] for row in shaped]
+
+    def grid_mean(values: np.ndarray) -> Optional[float]:
+        return None if np.isnan(values).all() else round(float(np.nanmean(values)), 1)
+
+    passes_per_day = statistics["passes"] / days
+    visibility_per_day = statistics["visibility_min"] / days
+    return {
+        "start": start.astimezone(timezone.utc).isoformat(),
+        "horizon_hours": horizon_hours,
+        "step_seconds": step_seconds,
+        "min_elevation_deg": min_elevation_deg,
+        "satellite_count": len(rows),
+        "latitudes": latitudes.tolist(),
+        "longitudes": longitudes.tolist(),
+        "passes_per_day": as_grid(passes_per_day),
+        "visibility_min_per_day": as_grid(visibility_per_day),
+        "mean_revisit_min": as_grid(statistics["mean_revisit_min"]),
+        "max_revisit_min": as_grid(statistics["max_revisit_min"]),
+        "summary": {
+            "passes_per_day": grid_mean(passes_per_day),
+            "visibility_min_per_day": grid_mean(visibility_per_day),
+            "mean_revisit_min": grid_mean(statistics["mean_revisit_min"]),
+            "max_revisit_min": None if np.isnan(statistics["max_revisit_min"]).all() else float(np.nanmax(statistics["max_revisit_min"])),
+        },
+    }
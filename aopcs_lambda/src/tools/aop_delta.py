@@ -0,0 +1,111 @@
+"""Delta between two consecutive `aop` bulletins, published as `aop.delta`.
+
+A delta is a compact JSON document (version 1):
+
+- `v`: version of the format;
+- `base` / `target`: `bulletin_hash` of the bulletin the delta applies to, and of the bulletin it produces;
+- `changed`: for each changed satellite (by `satName`), its changed fields, keyed by their index in `AOP_FIELDNAMES`;
+- `added`: new satellites, as the list of their field values in `AOP_FIELDNAMES` order;
+- `removed`: names of the satellites no longer in the bulletin;
+- `order`: names of the satellites in the order of the target, only when it differs from the base order
+  (removed satellites dropped, added satellites appended).
+
+Values are the strings of the text file, so applying a delta reproduces the target bulletin exactly. Consumers keep
+the rows of the bulletin they hold (`bulletin.json`, or `record_to_row` over the records of `aop.bin`), check the
+`base` hash, and call `apply_delta`.
+"""
+
+import hashlib
+import json
+from typing import Any, Dict, List
+
+from aopcs_lambda.src.tools.convert_binary_to_aop_configuration_file_for_previpass import AOP_FIELDNAMES, render_aop_text
+
+DELTA_VERSION = 1
+HASH_LENGTH = 16  # Hexadecimal characters of SHA-256 kept as reference
+
+
+def bulletin_hash(rows: List[Dict[str, Any]]) -> str:
+    """Reference of a bulletin: truncated SHA-256 of its `aop` text file."""
+    return hashlib.sha256(render_aop_text(rows).getvalue().encode("utf-8")).hexdigest()[:HASH_LENGTH]
+
+
+def compute_delta(base_rows: List[Dict[str, Any]], rows: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Compute the delta turning the bulletin `base_rows` into the bulletin `rows`.
+
+    Args:
+        base_rows (List[Dict[str, Any]]): Rows of the previous bulletin (see `build_satellite_rows`).
+        rows (List[Dict[str, Any]]): Rows of the new bulletin.
+
+    Returns:
+        Dict[str, Any]: The delta, see the module documentation.
+    """
+    base_by_name = {row["satName"]: row for row in base_rows}
+    names = [row["satName"] for row in rows]
+    name_set = set(names)
+
+    delta: Dict[str, Any] = {"v": DELTA_VERSION, "base": bulletin_hash(base_rows), "target": bulletin_hash(rows)}
+    changed: Dict[str, Dict[str, Any]] = {}
+    added: List[List[Any]] = []
+    for row in rows:
+        base_row = base_by_name.get(row["satName"])
+        if base_row is None:
+            added.append([row[field] for field in AOP_FIELDNAMES])
+            continue
+        fields = {str(index): row[field] for index, field in enumerate(AOP_FIELDNAMES) if row[field] != base_row[field]}
+        if fields:
+            changed[row["satName"]] = fields
+    removed = [name for name in base_by_name if name not in name_set]
+
+    if changed:
+        delta["changed"] = changed
+    if added:
+        delta["added"] = added
+    if removed:
+        delta["removed"] = removed
+    default_order = [row["satName"] for row in base_rows if row["satName"] not in removed] + [values[0] for values in added]
+    if names != default_order:
+        delta["order"] = names
+    return delta
+
+
+def apply_delta(base_rows: List[Dict[str, Any]], delta: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Apply a delta to the rows of the bulletin it was computed from.
+
+    Args:
+        base_rows (List[Dict[str, Any]]): Rows of the bulletin held by the consumer.
+        delta (Dict[str, Any]): Delta, as returned by `compute_delta` or `decode_delta`.
+
+    Raises:
+        ValueError: Unsupported version, the delta does not apply to this bulletin, or its result does not match
+            the target hash.
+
+    Returns:
+        List[Dict[str, Any]]: Rows of the target bulletin.
+    """
+    if delta.get("v") != DELTA_VERSION:
+        raise ValueError(f"Unsupported delta version: {delta.get('v')}")
+    if bulletin_hash(base_rows) != delta["base"]:
+        raise ValueError("Delta does not apply to this bulletin")
+
+    removed = set(delta.get("removed", []))
+    rows_by_name = {row["satName"]: dict(row) for row in base_rows if row["satName"] not in removed}
+    for name, fields in delta.get("changed", {}).items():
+        for index, value in fields.items():
+            rows_by_name[name][AOP_FIELDNAMES[int(index)]] = value
+    for values in delta.get("added", []):
+        rows_by_name[values[0]] = dict(zip(AOP_FIELDNAMES, values))
+
+    rows = [rows_by_name[name] for name in delta.get("order", rows_by_name)]
+    if bulletin_hash(rows) != delta["target"]:
+        raise ValueError("Delta result does not match its target bulletin")
+    return rows
+
+
+def encode_delta(delta: Dict[str, Any]) -> bytes:
+    return json.dumps(delta, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def decode_delta(data: bytes) -> Dict[str, Any]:
+    delta: Dict[str, Any] = json.loads(data)
+    return delta
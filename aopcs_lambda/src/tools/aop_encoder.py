@@ -0,0 +1,166 @@
+from datetime import datetime
+from typing import Any, List
+
+from aopcs_lambda.src.tools import convert_binary_to_aop_configuration_file_for_previpass as decoder
+from aopcs_lambda.src.tools.allcast_layout import (
+    AOP_FRAME_CHECK_SEQUENCE_LAYOUT,
+    CONSTELLATION_STATUS_HEADER_LAYOUT,
+    CS_FRAME_CHECK_SEQUENCE_LAYOUT,
+    DATE_EPOCH,
+    FRAME_HEADER_LAYOUT,
+    RELATIVE_SATELLITE_LAYOUT,
+    SATELLITE_DATA_LAYOUT,
+    SATELLITE_STATUS_LAYOUT,
+    FieldSpec,
+    Layout,
+    is_layout_available,
+    layout_size_in_bits,
+)
+
+ParsedData = decoder.ParsedData
+
+
+class BitWriter:
+    """Write unsigned fields, most significant bit first, into a preallocated buffer.
+
+    Args:
+        size_in_bits (int): Capacity of the buffer; the encoded payload is padded with zeros up to the next byte.
+    """
+
+    def __init__(self, size_in_bits: int) -> None:
+        self.buffer = bytearray((size_in_bits + 7) // 8)
+        self.size_in_bits = size_in_bits
+        self.position = 0
+
+    def write(self, value: int, width: int) -> None:
+        if width == 0:
+            return
+        if value < 0 or value >> width:
+            raise ValueError(f"Value {value} does not fit in {width} bits")
+        end = self.position + width
+        if end > self.size_in_bits:
+            raise ValueError(f"Writing {width} bits at {self.position} overflows the {self.size_in_bits} bits buffer")
+
+        first_byte = self.position >> 3
+        last_byte = (end - 1) >> 3
+        byte_count = last_byte - first_byte + 1
+        shift = byte_count * 8 - (self.position & 7) - width
+        span = int.from_bytes(self.buffer[first_byte : last_byte + 1], "big") | (value << shift)
+        self.buffer[first_byte : last_byte + 1] = span.to_bytes(byte_count, "big")
+        self.position = end
+
+    def skip_to(self, position: int) -> None:
+        """Leave the bits up to `position` to zero (padding of fixed-size frames)."""
+        if position < self.position or position > self.size_in_bits:
+            raise ValueError(f"Cannot skip from bit {self.position} to bit {position}")
+        self.position = position
+
+    def getvalue(self) -> bytes:
+        return bytes(self.buffer)
+
+
+def encode_field_value(field: FieldSpec, value: Any) -> int:
+    """Return the raw bits of a decoded value, the inverse of the decoder for this field."""
+    if field.codec == "hex":
+        raw = int(value, 16)
+    elif field.codec == "text":
+        raw = int(value)
+    elif field.codec == "bool":
+        raw = int(bool(value))
+    elif field.codec == "enum":
+        raw = getattr(decoder, str(field.enum))[value].value
+    elif field.codec == "date":
+        raw = round((datetime.fromisoformat(value) - DATE_EPOCH).total_seconds() / field.scale)
+    elif field.codec == "scaled":
+        raw = round(value / field.scale)
+    else:
+        raw = int(value)
+    if field.codec in ("int", "scaled"):
+        # Two's complement
+        if not -(1 << (field.width - 1)) <= raw < (1 << (field.width - 1)):
+            raise ValueError(f"{field.name}={value} does not fit in {field.width} signed bits")
+        raw &= (1 << field.width) - 1
+    return int(raw)
+
+
+def write_structure(writer: BitWriter, layout: Layout, values: ParsedData) -> None:
+    for field in layout:
+        writer.write(encode_field_value(field, values[field.name]), field.width)
+
+
+def frame_size_in_bits(frame: ParsedData) -> int:
+    """Size of an encoded frame: its fields, padded up to the size of its format."""
+    if "satelliteData" in frame:
+        size = layout_size_in_bits(SATELLITE_DATA_LAYOUT) + layout_size_in_bits(AOP_FRAME_CHECK_SEQUENCE_LAYOUT)
+    elif "satelliteReference" in frame:
+        size = (
+            layout_size_in_bits(SATELLITE_DATA_LAYOUT)
+            + len(frame["relativeSatellites"]) * layout_size_in_bits(RELATIVE_SATELLITE_LAYOUT)
+            + layout_size_in_bits(AOP_FRAME_CHECK_SEQUENCE_LAYOUT)
+        )
+    else:
+        size = (
+            layout_size_in_bits(CONSTELLATION_STATUS_HEADER_LAYOUT)
+            + len(frame["satellitesStatus"]) * layout_size_in_bits(SATELLITE_STATUS_LAYOUT)
+            + layout_size_in_bits(CS_FRAME_CHECK_SEQUENCE_LAYOUT)
+        )
+    size += layout_size_in_bits(FRAME_HEADER_LAYOUT)
+    format_reference = frame.get("formatReference")
+    if format_reference not in decoder.FormatReference.__members__:
+        raise Exception(f"Unknown format reference: {format_reference}")
+    format_size = decoder.get_format_size_in_bits(decoder.FormatReference[format_reference].value)
+    return max(size, format_size)
+
+
+# Function to encode AOP Monosat format
+def encode_aop_monosat(writer: BitWriter, frame: ParsedData) -> None:
+    write_structure(writer, FRAME_HEADER_LAYOUT, frame)
+    write_structure(writer, SATELLITE_DATA_LAYOUT, frame["satelliteData"])
+    write_structure(writer, AOP_FRAME_CHECK_SEQUENCE_LAYOUT, frame)
+
+
+# Function to encode AOP Multisat format
+def encode_aop_multisat(writer: BitWriter, frame: ParsedData) -> None:
+    write_structure(writer, FRAME_HEADER_LAYOUT, frame)
+    write_structure(writer, SATELLITE_DATA_LAYOUT, frame["satelliteReference"])
+    for relative_satellite in frame["relativeSatellites"]:
+        write_structure(writer, RELATIVE_SATELLITE_LAYOUT, relative_satellite)
+    write_structure(writer, AOP_FRAME_CHECK_SEQUENCE_LAYOUT, frame)
+
+
+# Function to encode Constellation Status formats
+def encode_constellation_status(writer: BitWriter, frame: ParsedData) -> None:
+    write_structure(writer, FRAME_HEADER_LAYOUT, frame)
+    write_structure(writer, CONSTELLATION_STATUS_HEADER_LAYOUT, frame)
+    for satellite_status in frame["satellitesStatus"]:
+        write_structure(writer, SATELLITE_STATUS_LAYOUT, satellite_status)
+    write_structure(writer, CS_FRAME_CHECK_SEQUENCE_LAYOUT, frame)
+
+
+def encode_frames(frames: List[ParsedData]) -> bytes:
+    """Serialise decoded frames back to the Allcast binary format, the inverse of `parse_binary_data`.
+
+    Args:
+        frames (List[ParsedData]): Frames in the shape returned by `parse_binary_data`.
+
+    Returns:
+        bytes: Allcast payload, frames packed back to back in a single preallocated buffer.
+    """
+    if not is_layout_available():
+        raise Exception("Allcast frame layout is not available in this build")
+
+    sizes = [frame_size_in_bits(frame) for frame in frames]
+    writer = BitWriter(sum(sizes))
+    for frame, size in zip(frames, sizes):
+        end = writer.position + size
+        format_reference = frame.get("formatReference")
+        if format_reference == decoder.FormatReference.AOP_MONOSAT.name:
+            encode_aop_monosat(writer, frame)
+        elif format_reference == decoder.FormatReference.AOP_MULTISAT.name:
+            encode_aop_multisat(writer, frame)
+        elif format_reference in (decoder.FormatReference.CS_2_SAT.name, decoder.FormatReference.CS_10_SAT.name, decoder.FormatReference.CS_17_SAT.name):
+            encode_constellation_status(writer, frame)
+        else:
+            raise Exception(f"Unknown format reference: {format_reference}")
+        writer.skip_to(end)
+    return writer.getvalue()
@@ -0,0 +1,151 @@
+"""Packed `aop` file with a byte-range index, published as `aop.pack`, and its range-request client.
+
+Consumers that only need a few satellites read the fixed-size header, then only the bytes of the records they need,
+with HTTP range requests (S3 GET with `Range`, or any HTTP server/CDN in front of the bucket).
+
+Layout (little-endian, version 1):
+
+- Header, 8 bytes: magic `b"AOPK"`, version (uint8), reserved (uint8), index capacity (uint16).
+- Index, `capacity` entries of 20 bytes (unused entries are zeroed, so the records always start at the same offset for
+  a given capacity, at least `DEFAULT_CAPACITY`):
+
+  ======  =======  =====================================================
+  Field   Type     Content
+  ======  =======  =====================================================
+  name    8 bytes  satellite name (satName), UTF-8, zero padded
+  offset  uint32   offset of the record from the start of the file
+  length  uint32   length of the record
+  epoch   uint32   epoch of the AOP, seconds since 1970-01-01T00:00:00Z
+  ======  =======  =====================================================
+
+- Records: the text of each satellite in the `aop` file, in the order of the file. The `aop` file of any subset of
+  satellites is a space followed by their records joined by spaces (see `aop_text`).
+"""
+
+import struct
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Tuple
+
+from aopcs_lambda.src.tools.convert_binary_to_aop_configuration_file_for_previpass import render_aop_text
+
+MAGIC = b"AOPK"
+VERSION = 1
+DEFAULT_CAPACITY = 64
+MERGE_GAP_BYTES = 512
+
+HEADER = struct.Struct("<4sBBH")
+ENTRY = struct.Struct("<8sIII")
+
+RangeReader = Callable[[int, int], bytes]  # Bytes `start` to `end` included
+
+
+class IndexEntry(NamedTuple):
+    name: str
+    offset: int
+    length: int
+    epoch: datetime
+
+
+def header_size(capacity: int) -> int:
+    return HEADER.size + capacity * ENTRY.size
+
+
+def render_aop_packed(rows: List[Dict[str, Any]]) -> bytes:
+    """Pack the rows of the `aop` file (see `build_satellite_rows`) with their index."""
+    capacity = max(DEFAULT_CAPACITY, len(rows))
+    if capacity > 0xFFFF:
+        raise ValueError("Too many satellites for the aop packed format")
+    records = [render_aop_text([row]).getvalue()[1:].encode("utf-8") for row in rows]
+
+    index = bytearray(capacity * ENTRY.size)
+    offset = header_size(capacity)
+    for i, (row, record) in enumerate(zip(rows, records)):
+        name = row["satName"].encode("utf-8")
+        if len(name) > 8:
+            raise ValueError(f"Satellite name too long for the aop packed format: {row['satName']}")
+        epoch = datetime(int(row["year"]), int(row["month"]), int(row["day"]), int(row["hour"]), int(row["minute"]), int(row["second"]), tzinfo=timezone.utc)
+        ENTRY.pack_into(index, i * ENTRY.size, name, offset, len(record), int(epoch.timestamp()))
+        offset += len(record)
+    return HEADER.pack(MAGIC, VERSION, 0, capacity) + bytes(index) + b"".join(records)
+
+
+def read_index(read_range: RangeReader) -> List[IndexEntry]:
+    """Index of a packed file, read with one range request (two if its capacity exceeds `DEFAULT_CAPACITY`).
+
+    Raises:
+        ValueError: Not an aop packed file, or unsupported version.
+    """
+    header = read_range(0, header_size(DEFAULT_CAPACITY) - 1)
+    if len(header) < HEADER.size:
+        raise ValueError("Truncated aop packed file")
+    magic, version, _, capacity = HEADER.unpack_from(header)
+    if magic != MAGIC:
+        raise ValueError("Not an aop packed file")
+    if version != VERSION:
+        raise ValueError(f"Unsupported aop packed version: {version}")
+    if capacity > DEFAULT_CAPACITY:
+        header += read_range(len(header), header_size(capacity) - 1)
+
+    entries = []
+    for raw_name, offset, length, epoch in ENTRY.iter_unpack(header[HEADER.size : header_size(capacity)]):
+        if length == 0:
+            break
+        entries.append(IndexEntry(raw_name.rstrip(b"\0").decode("utf-8"), offset, length, datetime.fromtimestamp(epoch, tz=timezone.utc)))
+    return entries
+
+
+def coalesce(entries: Iterable[IndexEntry], merge_gap_bytes: int = MERGE_GAP_BYTES) -> List[Tuple[int, int]]:
+    """Byte ranges (start, end included) covering the entries; ranges closer than `merge_gap_bytes` are merged."""
+    ranges: List[Tuple[int, int]] = []
+    for entry in sorted(entries, key=lambda entry: entry.offset):
+        end = entry.offset + entry.length - 1
+        if ranges and entry.offset - ranges[-1][1] - 1 <= merge_gap_bytes:
+            ranges[-1] = (ranges[-1][0], max(ranges[-1][1], end))
+        else:
+            ranges.append((entry.offset, end))
+    return ranges
+
+
+def fetch_records(read_range: RangeReader, names: Iterable[str], merge_gap_bytes: int = MERGE_GAP_BYTES) -> Dict[str, str]:
+    """Records of the requested satellites present in the file, by name, in the order of the file.
+
+    S3 serves a single range per request: the records are read in one request per group of neighbouring records.
+    """
+    wanted = set(names)
+    entries = [entry for entry in read_index(read_range) if entry.name in wanted]
+    chunks = {start: read_range(start, end) for start, end in coalesce(entries, merge_gap_bytes)}
+
+    records = {}
+    starts = sorted(chunks)
+    for entry in entries:
+        start = max(start for start in starts if start <= entry.offset)
+        relative = entry.offset - start
+        records[entry.name] = chunks[start][relative : relative + entry.length].decode("utf-8")
+    return records
+
+
+def aop_text(records: Dict[str, str]) -> str:
+    """`aop` file of the fetched records."""
+    return " " + " ".join(records.values()) if records else ""
+
+
+def s3_range_reader(s3_client: Any, bucket_name: str, s3_key: str) -> RangeReader:
+    def read_range(start: int, end: int) -> bytes:
+        body: bytes = s3_client.get_object(Bucket=bucket_name, Key=s3_key, Range=f"bytes={start}-{end}")["Body"].read()
+        return body
+
+    return read_range
+
+
+def http_range_reader(url: str, timeout: float = 10.0) -> RangeReader:
+    def read_range(start: int, end: int) -> bytes:
+        import requests
+
+        response = requests.get(url, headers={"Range": f"bytes={start}-{end}"}, timeout=timeout)
+        response.raise_for_status()
+        if response.status_code != 206:
+            # The server ignored the range: keep the requested bytes
+            return response.content[start : end + 1]
+        return response.content
+
+    return read_range
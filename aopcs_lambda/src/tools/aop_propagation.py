@@ -0,0 +1,134 @@
+"""Re-epoch of the AOP: propagation of the orbital elements of every satellite to a new reference time.
+
+The elements age from their epoch; re-epoching them to the time of use keeps the predictions of the devices fresh
+without a new Allcast bulletin. The model is the one used for the relative satellites of AOP_MULTISAT frames
+(`SatelliteRowJoiner._aop_rows`):
+
+- the ascending node longitude moves by `ascNodeDriftDeg` (degrees per orbit) every `orbitPeriodMin`;
+- the semi-major axis decreases by `semiMajorAxisDriftMeterPerDay` (the decoded `semiMajorAxisDecay`);
+- inclination, node drift and nodal period are constant.
+
+With `j2=True`, the secular J2 terms follow the decay of the semi-major axis: the nodal period scales with a^1.5 and
+the J2 regression of the node with a^-3.5 (near circular orbits), which matters for epochs days away from the
+bulletin.
+
+All satellites, and any number of target epochs, are propagated at once with NumPy broadcasting.
+"""
+
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Dict, List
+
+import numpy as np
+
+from aopcs_lambda.src.tools.aop_columnar import rows_to_columns
+
+J2 = 1.08262668e-3
+EARTH_RADIUS_KM = 6378.137
+EARTH_MU_KM3_S2 = 398600.4418
+
+
+@dataclass
+class AopElements:
+    """Orbital elements of the satellites of a bulletin, one array entry per satellite (epochs broadcast)."""
+
+    epoch: np.ndarray  # datetime64[s], UTC
+    semi_major_axis_km: np.ndarray
+    decay_m_per_day: np.ndarray
+    inclination_deg: np.ndarray
+    asc_node_deg: np.ndarray
+    node_drift_deg: np.ndarray  # Per orbit
+    period_min: np.ndarray
+
+    @classmethod
+    def from_rows(cls, rows: List[Dict[str, Any]]) -> "AopElements":
+        """Elements of the rows of the `aop` file (see `build_satellite_rows`)."""
+        columns = rows_to_columns(rows, datetime.now(tz=timezone.utc))
+        return cls(
+            epoch=columns["epoch"],
+            semi_major_axis_km=columns["semiMajorAxisKm"],
+            decay_m_per_day=columns["semiMajorAxisDriftMeterPerDay"],
+            inclination_deg=columns["inclinationDeg"],
+            asc_node_deg=columns["ascNodeLongitudeDeg"],
+            node_drift_deg=columns["ascNodeDriftDeg"],
+            period_min=columns["orbitPeriodMin"],
+        )
+
+
+def j2_node_rate_deg_per_min(semi_major_axis_km: np.ndarray, inclination_deg: np.ndarray) -> np.ndarray:
+    """Secular regression of the ascending node due to J2, for near circular orbits."""
+    mean_motion = np.sqrt(EARTH_MU_KM3_S2 / semi_major_axis_km**3)  # rad/s
+    rate: np.ndarray = -1.5 * mean_motion * J2 * (EARTH_RADIUS_KM / semi_major_axis_km) ** 2 * np.cos(np.radians(inclination_deg))
+    return np.degrees(rate) * 60
+
+
+def propagate(elements: AopElements, target_epochs: np.ndarray, j2: bool = False) -> AopElements:
+    """Elements at each target epoch.
+
+    Args:
+        elements (AopElements): Elements of the `n` satellites.
+        target_epochs (np.ndarray): `m` target epochs (datetime64, UTC).
+        j2 (bool): Apply the J2 secular terms to the decay of the semi-major axis.
+
+    Returns:
+        AopElements: Elements of shape (m, n), row `k` at `target_epochs[k]`.
+    """
+    targets = np.asarray(target_epochs, dtype="datetime64[s]").reshape(-1, 1)
+    elapsed_min = (targets - elements.epoch).astype(np.float64) / 60
+
+    semi_major_axis = elements.semi_major_axis_km - elements.decay_m_per_day * 0.001 * elapsed_min / 1440
+    node_rate = elements.node_drift_deg / elements.period_min  # Degrees per minute
+    period = np.broadcast_to(elements.period_min, semi_major_axis.shape)
+    node_drift = np.broadcast_to(elements.node_drift_deg, semi_major_axis.shape)
+    node_shift = node_rate * elapsed_min
+    if j2:
+        # The semi-major axis decays linearly: the node rate is integrated at the mean semi-major axis
+        reference_rate = j2_node_rate_deg_per_min(elements.semi_major_axis_km, elements.inclination_deg)
+        mean_semi_major_axis = (elements.semi_major_axis_km + semi_major_axis) / 2
+        node_shift = node_shift + (j2_node_rate_deg_per_min(mean_semi_major_axis, elements.inclination_deg) - reference_rate) * elapsed_min
+        period = elements.period_min * (semi_major_axis / elements.semi_major_axis_km) ** 1.5
+        node_drift = (node_rate + j2_node_rate_deg_per_min(semi_major_axis, elements.inclination_deg) - reference_rate) * period
+
+    return AopElements(
+        epoch=np.broadcast_to(targets, semi_major_axis.shape),
+        semi_major_axis_km=semi_major_axis,
+        decay_m_per_day=np.broadcast_to(elements.decay_m_per_day, semi_major_axis.shape),
+        inclination_deg=np.broadcast_to(elements.inclination_deg, semi_major_axis.shape),
+        asc_node_deg=np.mod(elements.asc_node_deg + node_shift, 360),
+        node_drift_deg=node_drift,
+        period_min=period,
+    )
+
+
+def reepoch_rows(rows: List[Dict[str, Any]], target_epochs: List[datetime], j2: bool = False) -> List[List[Dict[str, Any]]]:
+    """Rows of the `aop` file re-epoched at each target epoch (timezone aware), in the same order as `rows`."""
+    if not rows:
+        return [[] for _ in target_epochs]
+    targets = np.array([target.astimezone(timezone.utc).replace(tzinfo=None) for target in target_epochs], dtype="datetime64[s]")
+    propagated = propagate(AopElements.from_rows(rows), targets, j2=j2)
+
+    bulletins = []
+    for k, target in enumerate(target_epochs):
+        target = target.astimezone(timezone.utc)
+        epoch_fields = {
+            "year": target.strftime("%Y"),
+            "month": target.strftime("%m"),
+            "day": target.strftime("%d"),
+            "hour": target.strftime("%H"),
+            "minute": target.strftime("%M"),
+            "second": target.strftime("%S"),
+        }
+        bulletin = []
+        for i, row in enumerate(rows):
+            bulletin.append(
+                row
+                | epoch_fields
+                | {
+                    "semiMajorAxisKm": f"{propagated.semi_major_axis_km[k, i]:>9.3f}",
+                    "ascNodeLongitudeDeg": format(propagated.asc_node_deg[k, i], ">8.3f"),
+                    "ascNodeDriftDeg": f"{propagated.node_drift_deg[k, i]:>8.3f}",
+                    "orbitPeriodMin": f"{propagated.period_min[k, i]:>9.4f}",
+                }
+            )
+        bulletins.append(bulletin)
+    return bulletins
@@ -0,0 +1,63 @@
+"""Precompressed variants of the published artefacts.
+
+The `aop` file and the JSON artefacts are also stored compressed next to them (`aop.gz`, `metadata.json.zst`, ...)
+with the matching `Content-Encoding` and the `Content-Type` of the original, so a CDN or a device can fetch the
+variant its client accepts. zstd variants need the optional `zstandard` package and are skipped without it.
+"""
+
+import gzip
+import mimetypes
+from typing import Dict, List, Sequence, Tuple
+
+from aws_lambda_powertools import Logger
+
+logger = Logger()
+
+SUFFIXES = {"gzip": ".gz", "zstd": ".zst"}
+DEFAULT_LEVELS = {"gzip": 6, "zstd": 3}
+
+
+def has_zstd() -> bool:
+    try:
+        import zstandard  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def compress(body: bytes, encoding: str, level: int) -> bytes:
+    """`body` compressed with `gzip` (levels 1-9, reproducible output) or `zstd` (levels 1-22)."""
+    if encoding == "gzip":
+        return gzip.compress(body, compresslevel=level, mtime=0)
+    if encoding == "zstd":
+        import zstandard
+
+        return zstandard.ZstdCompressor(level=level).compress(body)
+    raise ValueError(f"Unknown encoding {encoding}")
+
+
+def is_compressible(s3_key: str) -> bool:
+    """The `aop` file and the JSON artefacts."""
+    return s3_key.rsplit("/", 1)[-1] == "aop" or s3_key.endswith(".json")
+
+
+def compressed_variants(artefacts: Sequence[Tuple[str, bytes]], encodings: Sequence[str], levels: Dict[str, int]) -> List[Tuple[str, bytes]]:
+    """Compressed variants of the compressible artefacts, for each encoding (in order)."""
+    if "zstd" in encodings and not has_zstd():
+        logger.warning("zstandard is not installed, no zstd variant published")
+        encodings = [encoding for encoding in encodings if encoding != "zstd"]
+    return [
+        (s3_key + SUFFIXES[encoding], compress(body, encoding, levels.get(encoding, DEFAULT_LEVELS[encoding])))
+        for s3_key, body in artefacts
+        if is_compressible(s3_key)
+        for encoding in encodings
+    ]
+
+
+def upload_args(s3_key: str) -> Dict[str, str]:
+    """`ExtraArgs` of the upload of an artefact: encoding and type of the compressed variants."""
+    for encoding, suffix in SUFFIXES.items():
+        if s3_key.endswith(suffix):
+            content_type = mimetypes.guess_type(s3_key[: -len(suffix)])[0] or "text/plain"
+            return {"ContentEncoding": encoding, "ContentType": content_type}
+    return {}
@@ -1,7 +1,7 @@
 from datetime import datetime, timedelta, timezone
 from io import StringIO
-from typing import Any, Dict, List, Optional
-import requests
+from collections import OrderedDict
+from typing import AbstractSet, Any, Dict, Iterable, Iterator, List, Optional, Tuple
 import binascii
 from enum import Enum
 import pytz
@@ -9,6 +9,7 @@ import pytz
 from aws_lambda_powertools import Logger
 
 from aopcs_lambda.src.models.metadata_model import AOPCSMetadataModel
+from aopcs_lambda.src.tools.satellite_registry import SatelliteRegistry, get_satellite_registry
 
 logger = Logger()
 
@@ -23,6 +24,7 @@ class PayloadType(Enum):
 class FormatReference(Enum):
 
 # Satellite identification table (Satellite Address (hexadecimal coding) : Satellite Mnemonic)
+# Used when no satellite registry document is configured, see satellite_registry.py
 satellite_identification = {
     "XX": "XX",
 }
@@ -34,6 +36,8 @@ uplink_status = {}
 
 # Function to make the API call and fetch binary data
 def fetch_binary_data(api_url: str, headers: dict[str, str]) -> bytes:
+    import requests
+
     response = requests.get(api_url, headers=headers, timeout=10)
     if response.status_code == 200:
         return response.content
@@ -135,7 +139,7 @@ def get_format_size_in_bits(format_reference: int) -> int:
 
 
 # Functions to bulid metadata from CSV Rows
-def build_metadata_from_csv_rows(rows: List[Dict[str, Any]]) -> Optional[AOPCSMetadataModel]:
+def build_metadata_from_csv_rows(rows: List[Dict[str, Any]]) -> AOPCSMetadataModel:
     """Construit la metadata (dates min/max) à partir des lignes CSV déjà prêtes."""
     if not rows:
         return AOPCSMetadataModel()
@@ -166,11 +170,13 @@ def build_metadata_from_csv_rows(rows: List[Dict[str, Any]]) -> Optional[AOPCSMe
 
 
 # Functions to convert parsed data to CSV format
-def build_csv_row(address: str, date: datetime, data: Dict[str, Any], name: str, down_status: str = "", up_status: str = "") -> Dict[str, Any]:
+def build_csv_row(
+    address: str, date: datetime, data: Dict[str, Any], name: str, down_status: str = "", up_status: str = "", dcs_id: str = "0"
+) -> Dict[str, Any]:
     return {
         "satName": name,
         "satHexId": address,
-        "satDcsId": "0",
+        "satDcsId": dcs_id,
         "downlinkStatus": down_status,
         "uplinkStatus": up_status,
         "year": date.strftime("%Y"),
@@ -188,99 +194,205 @@ def build_csv_row(address: str, date: datetime, data: Dict[str, Any], name: str,
     }
 
 
-def convert_to_csv(parsed_data: List[ParsedData], csv_file_path: Optional[str] = None, satellite_whitelist: List[str] = []) -> Any:
-    fieldnames = [
-        "satName",
-        "satHexId",
-        "satDcsId",
-        "downlinkStatus",
-        "uplinkStatus",
-        "year",
-        "month",
-        "day",
-        "hour",
-        "minute",
-        "second",
-        "semiMajorAxisKm",
-        "inclinationDeg",
-        "ascNodeLongitudeDeg",
-        "ascNodeDriftDeg",
-        "orbitPeriodMin",
-        "semiMajorAxisDriftMeterPerDay",
-    ]
-
-    satellite_data_map = {}
+AOP_FIELDNAMES = [
+    "satName",
+    "satHexId",
+    "satDcsId",
+    "downlinkStatus",
+    "uplinkStatus",
+    "year",
+    "month",
+    "day",
+    "hour",
+    "minute",
+    "second",
+    "semiMajorAxisKm",
+    "inclinationDeg",
+    "ascNodeLongitudeDeg",
+    "ascNodeDriftDeg",
+    "orbitPeriodMin",
+    "semiMajorAxisDriftMeterPerDay",
+]
+
+
+MAX_PENDING_STATUSES = 256  # Statuses waiting for the AOP frame of their satellite
+
+
+class SatelliteRowJoiner:
+    """Streaming join of the constellation statuses onto the satellite rows, whatever the order of the frames.
+
+    Rows are keyed by integer satellite address. A row is complete once its status is known; a status received before
+    the AOP frame of its satellite waits in a bounded pending table (oldest dropped first). The last status of each
+    satellite is kept and applied to its AOP frames received later.
+
+    Args:
+        registry (SatelliteRegistry): Identification of the satellites and payload status labels.
+        max_pending (int): Capacity of the pending status table.
+        addresses (Optional[AbstractSet[int]]): Satellites to build rows for (the resolved whitelist), all when None.
+    """
+
+    def __init__(self, registry: SatelliteRegistry, max_pending: int = MAX_PENDING_STATUSES, addresses: Optional[AbstractSet[int]] = None) -> None:
+        self.registry = registry
+        self.max_pending = max_pending
+        self.addresses = addresses
+        self.first_seen: Dict[int, int] = {}  # Address: rank of its first AOP frame
+        self.incomplete: Dict[int, Dict[str, Any]] = {}
+        self.complete: Dict[int, Dict[str, Any]] = {}
+        self.pending: "OrderedDict[int, ParsedData]" = OrderedDict()
+        self.statuses: Dict[int, ParsedData] = {}  # Address: last status attached to its row
+        self.dropped_statuses = 0
+
+    def _attach_status(self, row: Dict[str, Any], status: ParsedData) -> None:
+        row["downlinkStatus"], row["uplinkStatus"] = self.registry.payload_status(
+            status["payloadType"], status["payloadDownlinkMissionStatus"], status["payloadUplinkMissionStatus"]
+        )
 
-    for entry in parsed_data:
+    def _aop_rows(self, sat_data: ParsedData, relative_satellites: List[ParsedData]) -> List[Tuple[int, Dict[str, Any]]]:
+        rows = []
+        address = sat_data["satelliteAddress"]
+        satellite = self.registry.lookup_hex(address)
+        if satellite is None or not satellite.mnemonic:
+            return rows
+        sat_data["ascNodeLongitudeDeg"] = sat_data["anLongitude"]
+
+        if self.addresses is None or int(address, 16) in self.addresses:
+            rows.append(
+                (int(address, 16), build_csv_row(address[0], datetime.fromisoformat(sat_data["date"]), sat_data, satellite.mnemonic, dcs_id=satellite.dcs_id))
+            )
+
+        # Relative satellites (only for AOP_MULTISAT)
+        for rel_sat in relative_satellites:
+            rel_address = rel_sat["satelliteAddressRelative"]
+            rel_satellite = self.registry.lookup_hex(rel_address)
+            if rel_satellite is None or not rel_satellite.mnemonic:
+                continue
+            if self.addresses is not None and int(rel_address, 16) not in self.addresses:
+                continue
+            # delta = timedelta(seconds=rel_sat["deltaDateRelative"] * 0.125)
+            # rel_date = (datetime.fromisoformat(sat_data["date"]) + delta).isoformat()
+            reference_bulletin = datetime.fromisoformat(sat_data["date"])
+            rel_date = reference_bulletin + timedelta(seconds=rel_sat["deltaDateRelative"])
+
+            driftCoefficient = (sat_data["anLongitudeDrift"] / sat_data["nodalPeriod"]) / 0.001 / 60 * 0.125
+            ascNodeLongitudeDeg = float(sat_data["anLongitude"]) + driftCoefficient * float(rel_sat["deltaDateRelative"] / 0.125) * 0.001
+            if ascNodeLongitudeDeg < 0:
+                ascNodeLongitudeDeg = 360 + ascNodeLongitudeDeg
+            elif ascNodeLongitudeDeg >= 360:
+                ascNodeLongitudeDeg = ascNodeLongitudeDeg - 360
+            sat_data["ascNodeLongitudeDeg"] = ascNodeLongitudeDeg
+
+            rows.append((int(rel_address, 16), build_csv_row(rel_address[0], rel_date, sat_data, rel_satellite.mnemonic, dcs_id=rel_satellite.dcs_id)))
+        return rows
+
+    def feed(self, entry: ParsedData) -> List[Tuple[int, Dict[str, Any]]]:
+        """Join one frame, return the rows it completes (address, row).
+
+        A satellite repeated later in the stream replaces its row, and is emitted again once complete.
+        """
+        completed = []
         if "satelliteData" in entry or "satelliteReference" in entry:
             key = "satelliteData" if "satelliteData" in entry else "satelliteReference"
-            sat_data = entry[key]
-            address = sat_data["satelliteAddress"]
+            for address, row in self._aop_rows(entry[key], entry.get("relativeSatellites", [])):
+                self.first_seen.setdefault(address, len(self.first_seen))
+                self.complete.pop(address, None)
+                status = self.pending.pop(address, None) or self.statuses.get(address)
+                if status is None:
+                    self.incomplete[address] = row
+                    continue
+                self._attach_status(row, status)
+                self.statuses[address] = status
+                self.incomplete.pop(address, None)
+                self.complete[address] = row
+                completed.append((address, row))
 
-            name = satellite_identification.get(address)
-            if not name:
-                continue
-            sat_data["ascNodeLongitudeDeg"] = sat_data["anLongitude"]
+        elif "satellitesStatus" in entry:
+            for status in entry["satellitesStatus"]:
+                try:
+                    address = int(status["satelliteAddress"], 16)
+                except ValueError:
+                    continue
+                if self.addresses is not None and address not in self.addresses:
+                    continue
+                row = self.incomplete.pop(address, None) or self.complete.get(address)
+                if row is None:
+                    self.pending[address] = status
+                    self.pending.move_to_end(address)
+                    if len(self.pending) > self.max_pending:
+                        self.pending.popitem(last=False)
+                        self.dropped_statuses += 1
+                    continue
+                self._attach_status(row, status)
+                self.statuses[address] = status
+                self.complete[address] = row
+                completed.append((address, row))
+        return completed
 
-            satellite_data_map[address] = build_csv_row(address[0], datetime.fromisoformat(sat_data["date"]), sat_data, name)
+    def finish(self) -> List[Tuple[int, Dict[str, Any]]]:
+        """End of the stream: return the rows that never got a status."""
+        if self.dropped_statuses:
+            logger.warning(f"{self.dropped_statuses} satellite statuses dropped: pending status table full")
+        remaining = list(self.incomplete.items())
+        self.complete.update(self.incomplete)
+        self.incomplete.clear()
+        return remaining
 
-            # Relative satellites (only for AOP_MULTISAT)
-            for rel_sat in entry.get("relativeSatellites", []):
-                rel_address = rel_sat["satelliteAddressRelative"]
-                rel_name = satellite_identification.get(rel_address)
-                if not rel_name:
-                    continue
-                # delta = timedelta(seconds=rel_sat["deltaDateRelative"] * 0.125)
-                # rel_date = (datetime.fromisoformat(sat_data["date"]) + delta).isoformat()
-                reference_bulletin = datetime.fromisoformat(sat_data["date"])
-                rel_date = reference_bulletin + timedelta(seconds=rel_sat["deltaDateRelative"])
 
-                driftCoefficient = (sat_data["anLongitudeDrift"] / sat_data["nodalPeriod"]) / 0.001 / 60 * 0.125
-                ascNodeLongitudeDeg = float(sat_data["anLongitude"]) + driftCoefficient * float(rel_sat["deltaDateRelative"] / 0.125) * 0.001
-                if ascNodeLongitudeDeg < 0:
-                    ascNodeLongitudeDeg = 360 + ascNodeLongitudeDeg
-                elif ascNodeLongitudeDeg >= 360:
-                    ascNodeLongitudeDeg = ascNodeLongitudeDeg - 360
-                sat_data["ascNodeLongitudeDeg"] = ascNodeLongitudeDeg
+def get_registry() -> SatelliteRegistry:
+    return get_satellite_registry() or SatelliteRegistry.from_tables(satellite_identification, downlink_status, uplink_status)
 
-                satellite_data_map[rel_address] = build_csv_row(rel_address[0], rel_date, sat_data, rel_name)
 
-        elif "satellitesStatus" in entry:
-            for status in entry["satellitesStatus"]:
-                addr = status["satelliteAddress"]
-                if addr in satellite_data_map:
-                    down_status = downlink_status.get(status["payloadType"]) if status["payloadDownlinkMissionStatus"] else downlink_status.get("OFF")
-                    up_status = uplink_status.get(status["payloadType"]) if status["payloadUplinkMissionStatus"] else uplink_status.get("OFF")
-                    satellite_data_map[addr]["downlinkStatus"] = down_status
-                    satellite_data_map[addr]["uplinkStatus"] = up_status
+def iter_satellite_rows(parsed_data: Iterable[ParsedData], satellite_whitelist: List[str] = []) -> Iterator[Dict[str, Any]]:
+    """Stream the rows of the `aop` file as soon as they are complete (rows without status at the end of the stream).
+
+    A satellite repeated in the stream is emitted again; its last row wins.
+    """
+    registry = get_registry()
+    joiner = SatelliteRowJoiner(registry, addresses=registry.resolve_addresses(satellite_whitelist) if satellite_whitelist else None)
+    for entry in parsed_data:
+        for _, row in joiner.feed(entry):
+            yield row
+    for _, row in joiner.finish():
+        yield row
+
+
+def build_satellite_rows(parsed_data: List[ParsedData], satellite_whitelist: List[str] = []) -> List[Dict[str, Any]]:
+    """Rows of the `aop` file, in the order of the first AOP frame of each satellite.
+
+    The rows of the satellites missing from `satellite_whitelist` (all kept when empty) are never built.
+    """
+    registry = get_registry()
+    joiner = SatelliteRowJoiner(registry, addresses=registry.resolve_addresses(satellite_whitelist) if satellite_whitelist else None)
+    for entry in parsed_data:
+        joiner.feed(entry)
+    joiner.finish()
 
-    # === FILTER on specific sat_list ===
-    ## will must be done in the embedded side ?
-    rows = list(satellite_data_map.values())
+    return [joiner.complete[address] for address in sorted(joiner.complete, key=joiner.first_seen.__getitem__)]
 
-    if len(satellite_whitelist) > 0:
-        rows = [row for row in rows if row["satName"].strip() in satellite_whitelist]
+
+def render_aop_text(rows: List[Dict[str, Any]]) -> StringIO:
+    # Add a space at the beginning to match the expected output format
+    full_output = StringIO("")
+    if len(rows) > 0:
+        full_output.write(" ")
+    full_output.write(" ".join([f"{row[field]}" for row in rows for field in AOP_FIELDNAMES]))
+    return full_output
+
+
+def convert_to_csv(parsed_data: List[ParsedData], csv_file_path: Optional[str] = None, satellite_whitelist: List[str] = []) -> Any:
+    rows = build_satellite_rows(parsed_data, satellite_whitelist)
 
     output = StringIO("")
     if csv_file_path:
         # Write to CSV
         with open(csv_file_path, mode="w", newline=" ") as file:
-            output = StringIO(" ".join([f"{row[field]}" for row in rows for field in fieldnames]))
+            output = StringIO(" ".join([f"{row[field]}" for row in rows for field in AOP_FIELDNAMES]))
 
             file.write(output.getvalue())
 
         output.seek(0)
         return output
     else:
-        output = StringIO(" ".join([f"{row[field]}" for row in rows for field in fieldnames]))
-
-        output.seek(0)
-
-        # Add a space at the beginning to match the expected output format
-        full_output = StringIO("")
-        if len(rows) > 0:
-            full_output.write(" ")
-        full_output.write(output.getvalue())
+        full_output = render_aop_text(rows)
 
         # === Build metadata from CSV rows ===
         metadata = build_metadata_from_csv_rows(rows)
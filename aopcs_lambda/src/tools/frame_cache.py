@@ -0,0 +1,188 @@
+"""Cache of decoded Allcast frames across runs, keyed by the digest of their bits.
+
+Most frames of a bulletin (the AOP of the satellites that were not updated) are identical from one run to the next.
+`parse_binary_data_cached` indexes the frames of the payload (`frame_validation.index_frames`, headers only) and only
+decodes the frames whose digest is not in the cache. The cache lives in the memory of the container and, when
+`frame_cache_s3_key` is set, is persisted as a gzipped JSON object loaded on cold start.
+"""
+
+import copy
+import gzip
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from aws_lambda_powertools import Logger
+
+from aopcs_lambda.src.tools import allcast_layout as layout
+from aopcs_lambda.src.tools import convert_binary_to_aop_configuration_file_for_previpass as decoder
+from aopcs_lambda.src.tools.frame_validation import index_frames
+
+logger = Logger()
+
+ParsedData = Dict[str, Any]
+
+CACHE_VERSION = 1
+
+
+def frame_digest(bits: np.ndarray) -> str:
+    """Digest of the bits of a frame (their count included, frames are not byte aligned)."""
+    return hashlib.blake2b(np.packbits(bits).tobytes() + len(bits).to_bytes(4, "big"), digest_size=16).hexdigest()
+
+
+class FrameCache:
+    """LRU cache of decoded frames by digest, shared by the tenants ingested concurrently.
+
+    Args:
+        max_entries (int): Number of frames kept, the least recently used are evicted first.
+    """
+
+    def __init__(self, max_entries: int) -> None:
+        self.max_entries = max_entries
+        self.frames: "OrderedDict[str, ParsedData]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.dirty = False
+        self.lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.frames)
+
+    def get(self, digest: str) -> Optional[ParsedData]:
+        """Copy of the cached frame, the callers are free to modify it."""
+        with self.lock:
+            frame = self.frames.get(digest)
+            if frame is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.frames.move_to_end(digest)
+        return copy.deepcopy(frame)
+
+    def put(self, digest: str, frame: ParsedData) -> None:
+        frame = copy.deepcopy(frame)
+        with self.lock:
+            self.frames[digest] = frame
+            self.frames.move_to_end(digest)
+            self.dirty = True
+            while len(self.frames) > self.max_entries:
+                self.frames.popitem(last=False)
+
+    @property
+    def hit_rate(self) -> Optional[float]:
+        """Share of the lookups served from the cache since it was created, None without lookups."""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else None
+
+    def dumps(self) -> bytes:
+        """Gzipped JSON of the cache, least recently used first (the frames are snapshotted under the lock)."""
+        with self.lock:
+            frames = list(self.frames.items())
+        document = {"v": CACHE_VERSION, "frames": frames}
+        return gzip.compress(json.dumps(document, separators=(",", ":")).encode("utf-8"))
+
+    def loads(self, data: bytes) -> None:
+        """Add the frames of a `dumps` output; documents of another version are ignored."""
+        document = json.loads(gzip.decompress(data))
+        if document.get("v") != CACHE_VERSION:
+            logger.warning(f"Ignoring frame cache of version {document.get('v')}")
+            return
+        with self.lock:
+            for digest, frame in document["frames"]:
+                self.frames[digest] = frame
+                self.frames.move_to_end(digest)
+            while len(self.frames) > self.max_entries:
+                self.frames.popitem(last=False)
+
+
+@dataclass
+class CacheLookups:
+    """Lookups of one `parse_binary_data_cached` call; the counters of the shared cache mix every tenant."""
+
+    hits: int = 0
+    misses: int = 0
+
+    @property
+    def hit_rate(self) -> Optional[float]:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else None
+
+
+def parse_binary_data_cached(binary_data: bytes, cache: FrameCache, lookups: Optional[CacheLookups] = None) -> List[ParsedData]:
+    """`parse_binary_data`, decoding only the frames missing from the cache, counting the lookups in `lookups`.
+
+    Payloads whose frames cannot all be located (or without the frame layout) are decoded as a whole, uncached.
+    """
+    lookups = lookups if lookups is not None else CacheLookups()
+    if not layout.is_layout_available():
+        return decoder.parse_binary_data(binary_data)
+    bits = np.unpackbits(np.frombuffer(binary_data, dtype=np.uint8))
+    spans, issues = index_frames(bits)
+    if issues:
+        return decoder.parse_binary_data(binary_data)
+
+    parsed_data = []
+    for span in spans:
+        frame_bits = bits[span.offset : span.offset + span.size]
+        digest = frame_digest(frame_bits)
+        frame = cache.get(digest)
+        if frame is None:
+            lookups.misses += 1
+            decoded = decoder.parse_binary_data(np.packbits(frame_bits).tobytes())
+            if len(decoded) != 1:
+                return decoder.parse_binary_data(binary_data)
+            frame = decoded[0]
+            cache.put(digest, frame)
+        else:
+            lookups.hits += 1
+        parsed_data.append(frame)
+    return parsed_data
+
+
+_cache: Optional[FrameCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_frame_cache() -> FrameCache:
+    """Cache of the container, loaded from S3 (`frame_cache_s3_key`) when it is created."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            from aopcs_lambda.src.global_config import get_global_config
+
+            global_config = get_global_config()
+            cache = FrameCache(global_config.frame_cache_size)
+            if global_config.frame_cache_s3_key:
+                from aopcs_lambda.src.aws_clients import create_client
+
+                try:
+                    response = create_client("s3").get_object(Bucket=global_config.bucket_name, Key=global_config.frame_cache_s3_key)
+                    cache.loads(response["Body"].read())
+                    logger.info("Frame cache loaded", extra={"frame_count": len(cache)})
+                except Exception as e:
+                    logger.warning(f"Could not load the frame cache: {e}")
+            _cache = cache
+        return _cache
+
+
+def persist_frame_cache(cache: FrameCache) -> None:
+    """Upload the cache to S3 (`frame_cache_s3_key`) if it gained frames since it was last persisted."""
+    from aopcs_lambda.src.global_config import get_global_config
+
+    global_config = get_global_config()
+    if not global_config.frame_cache_s3_key or not cache.dirty:
+        return
+    from aopcs_lambda.src.aws_clients import create_client
+
+    # Cleared before the snapshot: frames added meanwhile by another tenant mark the cache dirty again
+    with cache.lock:
+        cache.dirty = False
+    try:
+        create_client("s3").put_object(Bucket=global_config.bucket_name, Key=global_config.frame_cache_s3_key, Body=cache.dumps())
+    except Exception as e:
+        cache.dirty = True
+        logger.warning(f"Could not persist the frame cache: {e}")
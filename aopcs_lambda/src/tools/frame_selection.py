@@ -0,0 +1,70 @@
+"""Whitelist pushdown: drop the AOP frames of unwanted satellites before `parse_binary_data` decodes them.
+
+The frames are indexed from their headers (`frame_validation.index_frames`), then the satellite addresses of every
+AOP frame are read at their offsets, without decoding the other fields. An AOP_MONOSAT frame is kept when its
+satellite is wanted, an AOP_MULTISAT frame when its reference or one of its relative satellites is wanted (the
+relatives are dated from the reference). Constellation status frames are always kept.
+
+The selection works on whole frames, the decoder itself is unchanged. When the payload cannot be selected, it is
+decoded in full and a warning says why.
+"""
+
+from typing import AbstractSet, Tuple
+
+import numpy as np
+from aws_lambda_powertools import Logger
+
+from aopcs_lambda.src.tools import allcast_layout as layout
+from aopcs_lambda.src.tools.frame_validation import index_frames, read_uint
+
+logger = Logger()
+
+
+def field_position(fields: layout.Layout, name: str) -> Tuple[int, int]:
+    """Offset and width of a field in a layout."""
+    offset = 0
+    for field in fields:
+        if field.name == name:
+            return offset, field.width
+        offset += field.width
+    raise KeyError(name)
+
+
+def select_frames(binary_data: bytes, addresses: AbstractSet[int]) -> bytes:
+    """Payload without the AOP frames of the satellites missing from `addresses`.
+
+    The payload is returned unchanged, with a warning, when its frames cannot all be located (or without the frame
+    layout).
+    """
+    if not layout.is_layout_available():
+        logger.warning("Satellite whitelist not pushed down: frame layout unavailable, decoding every frame")
+        return binary_data
+    bits = np.unpackbits(np.frombuffer(binary_data, dtype=np.uint8))
+    spans, issues = index_frames(bits)
+    if issues or not spans:
+        logger.warning(f"Satellite whitelist not pushed down: {len(issues)} frame indexing issues, decoding every frame")
+        return binary_data
+
+    header_size = layout.layout_size_in_bits(layout.FRAME_HEADER_LAYOUT)
+    address_offset, address_width = field_position(layout.SATELLITE_DATA_LAYOUT, "satelliteAddress")
+    relative_offset, relative_width = field_position(layout.RELATIVE_SATELLITE_LAYOUT, "satelliteAddressRelative")
+    satellite_data_size = layout.layout_size_in_bits(layout.SATELLITE_DATA_LAYOUT)
+    relative_size = layout.layout_size_in_bits(layout.RELATIVE_SATELLITE_LAYOUT)
+    wanted = np.fromiter(addresses, dtype=np.uint64, count=len(addresses))
+
+    formats = np.array([span.format_reference for span in spans])
+    offsets = np.array([span.offset for span in spans])
+    keep = np.ones(len(spans), dtype=bool)
+
+    aop = (formats == "AOP_MONOSAT") | (formats == "AOP_MULTISAT")
+    keep[aop] = np.isin(read_uint(bits, offsets[aop] + header_size + address_offset, address_width), wanted)
+    multisat = np.flatnonzero(formats == "AOP_MULTISAT")
+    for relative in range(layout.MULTISAT_RELATIVE_SATELLITE_COUNT):
+        relative_offsets = offsets[multisat] + header_size + satellite_data_size + relative * relative_size + relative_offset
+        keep[multisat] |= np.isin(read_uint(bits, relative_offsets, relative_width), wanted)
+
+    logger.info(f"Satellite whitelist pushed down: {int(keep.sum())} of {len(spans)} frames kept")
+    if keep.all():
+        return binary_data
+    kept = [bits[span.offset : span.offset + span.size] for span, selected in zip(spans, keep) if selected]
+    return np.packbits(np.concatenate(kept)).tobytes() if kept else b""
@@ -0,0 +1,192 @@
+"""Integrity pre-pass over an Allcast payload, before `parse_binary_data` decodes it.
+
+The payload is unpacked to a bit array once. The frame index (offset, format and size of every frame) is built by
+reading only the frame headers, then the checks run over the whole index at once:
+
+- `unknown_format`: the format reference of a frame is not a known format; the frames after it cannot be located;
+- `truncated`: a frame declares more bits than remain in the payload (truncated download);
+- `reserved_bits`: the padding between the last field of a frame and the end of its format is not zero;
+- `check_sequence`: the frame check sequence does not match, when a `check_sequence` function is given (the check
+  sequence algorithms are not part of the public repository).
+
+Invalid frames can be rejected (`FrameValidationError`, with the structured report) or quarantined, the valid frames
+being salvaged with `salvage_frames`.
+"""
+
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from aopcs_lambda.src.tools import allcast_layout as layout
+from aopcs_lambda.src.tools import convert_binary_to_aop_configuration_file_for_previpass as decoder
+
+CheckSequence = Callable[[np.ndarray, int], bool]  # (bits of the frame before its check sequence, check sequence) -> valid
+
+
+class FrameSpan(NamedTuple):
+    index: int
+    offset: int  # In bits from the start of the payload
+    size: int  # In bits
+    format_reference: str
+
+
+class FrameIssue(NamedTuple):
+    frame_index: int
+    offset: int
+    code: str
+    detail: str
+
+
+@dataclass
+class FrameValidationReport:
+    size_in_bits: int
+    frames: List[FrameSpan] = field(default_factory=list)
+    issues: List[FrameIssue] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        return not self.issues
+
+    @property
+    def valid_frames(self) -> List[FrameSpan]:
+        invalid = {issue.frame_index for issue in self.issues}
+        return [frame for frame in self.frames if frame.index not in invalid]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "size_in_bits": self.size_in_bits,
+            "frame_count": len(self.frames),
+            "valid_frame_count": len(self.valid_frames),
+            "issues": [issue._asdict() for issue in self.issues],
+        }
+
+
+class FrameValidationError(Exception):
+    """Invalid Allcast payload; `report` holds every issue found."""
+
+    def __init__(self, report: FrameValidationReport) -> None:
+        self.report = report
+        details = "; ".join(issue.detail for issue in report.issues[:5])
+        more = f" (and {len(report.issues) - 5} more)" if len(report.issues) > 5 else ""
+        super().__init__(f"Invalid Allcast payload: {details}{more}")
+
+
+def fields_size_in_bits(format_name: str) -> Tuple[int, int]:
+    """Size of the fields of a frame format, and width of its check sequence (the last field)."""
+    header = layout.layout_size_in_bits(layout.FRAME_HEADER_LAYOUT)
+    satellite_data = layout.layout_size_in_bits(layout.SATELLITE_DATA_LAYOUT)
+    if format_name == "AOP_MONOSAT":
+        check_sequence = layout.layout_size_in_bits(layout.AOP_FRAME_CHECK_SEQUENCE_LAYOUT)
+        return header + satellite_data + check_sequence, check_sequence
+    if format_name == "AOP_MULTISAT":
+        check_sequence = layout.layout_size_in_bits(layout.AOP_FRAME_CHECK_SEQUENCE_LAYOUT)
+        relatives = layout.MULTISAT_RELATIVE_SATELLITE_COUNT * layout.layout_size_in_bits(layout.RELATIVE_SATELLITE_LAYOUT)
+        return header + satellite_data + relatives + check_sequence, check_sequence
+    check_sequence = layout.layout_size_in_bits(layout.CS_FRAME_CHECK_SEQUENCE_LAYOUT)
+    statuses = layout.CONSTELLATION_STATUS_SLOTS[format_name] * layout.layout_size_in_bits(layout.SATELLITE_STATUS_LAYOUT)
+    return header + layout.layout_size_in_bits(layout.CONSTELLATION_STATUS_HEADER_LAYOUT) + statuses + check_sequence, check_sequence
+
+
+def read_uint(bits: np.ndarray, offsets: np.ndarray, width: int) -> np.ndarray:
+    """Unsigned fields of `width` bits (most significant first) at each of `offsets`."""
+    if width == 0:
+        return np.zeros(len(offsets), dtype=np.uint64)
+    positions = offsets[:, None] + np.arange(width)
+    weights = np.left_shift(np.uint64(1), np.arange(width - 1, -1, -1, dtype=np.uint64))
+    values: np.ndarray = (bits[positions].astype(np.uint64) * weights).sum(axis=1, dtype=np.uint64)
+    return values
+
+
+def index_frames(bits: np.ndarray) -> Tuple[List[FrameSpan], List[FrameIssue]]:
+    """Offset, format and size of the frames of an unpacked payload, reading only their headers.
+
+    Each frame starts where the previous one ends: the index stops at the first frame that cannot be sized.
+    """
+    frames: List[FrameSpan] = []
+    issues: List[FrameIssue] = []
+    header_size = layout.layout_size_in_bits(layout.FRAME_HEADER_LAYOUT)
+    format_offset, format_width = 0, 0
+    for header_field in layout.FRAME_HEADER_LAYOUT:
+        if header_field.name == "formatReference":
+            format_width = header_field.width
+            break
+        format_offset += header_field.width
+    formats = {member.value: member.name for member in decoder.FormatReference}
+    sizes = {value: max(fields_size_in_bits(name)[0], decoder.get_format_size_in_bits(value)) for value, name in formats.items()}
+
+    offset = 0
+    while offset < len(bits):
+        remaining = len(bits) - offset
+        if remaining < 8 and not bits[offset:].any():
+            break  # Byte padding of the payload
+        index = len(frames)
+        if remaining < header_size:
+            issues.append(FrameIssue(index, offset, "truncated", f"Truncated frame header: {remaining} bits remain"))
+            break
+        format_value = int(read_uint(bits, np.array([offset + format_offset]), format_width)[0])
+        if format_value not in formats:
+            issues.append(FrameIssue(index, offset, "unknown_format", f"Unknown format reference: {format_value} at bit {offset}"))
+            break
+        if sizes[format_value] > remaining:
+            detail = f"Truncated {formats[format_value]} frame at bit {offset}: {sizes[format_value]} bits declared, {remaining} remain"
+            issues.append(FrameIssue(index, offset, "truncated", detail))
+            break
+        frames.append(FrameSpan(index, offset, sizes[format_value], formats[format_value]))
+        offset += sizes[format_value]
+    return frames, issues
+
+
+def validate_frames(binary_data: bytes, check_sequence: Optional[CheckSequence] = None) -> FrameValidationReport:
+    """Index the frames of an Allcast payload and check their integrity.
+
+    Args:
+        binary_data (bytes): Allcast payload.
+        check_sequence (Optional[CheckSequence]): Verifies the check sequence of a frame; not checked when None.
+
+    Returns:
+        FrameValidationReport: Frame index and issues found.
+    """
+    if not layout.is_layout_available():
+        raise Exception("Allcast frame layout is not available in this build")
+
+    bits = np.unpackbits(np.frombuffer(binary_data, dtype=np.uint8))
+    report = FrameValidationReport(size_in_bits=len(bits))
+    report.frames, report.issues = index_frames(bits)
+
+    if not report.frames:
+        return report
+
+    # Checks over the whole index at once
+    offsets = np.array([frame.offset for frame in report.frames])
+    ends = offsets + np.array([frame.size for frame in report.frames])
+    field_sizes = {name: fields_size_in_bits(name) for name in {frame.format_reference for frame in report.frames}}
+    field_ends = offsets + np.array([field_sizes[frame.format_reference][0] for frame in report.frames])
+    ones = np.concatenate(([0], np.cumsum(bits, dtype=np.int64)))
+    reserved = ones[ends] - ones[field_ends]
+    for frame_index in np.flatnonzero(reserved):
+        frame = report.frames[frame_index]
+        report.issues.append(
+            FrameIssue(frame.index, frame.offset, "reserved_bits", f"Non-zero reserved bits in {frame.format_reference} frame at bit {frame.offset}")
+        )
+
+    if check_sequence is not None:
+        for frame, field_end in zip(report.frames, field_ends):
+            width = field_sizes[frame.format_reference][1]
+            value = int(read_uint(bits, np.array([field_end - width]), width)[0])
+            if not check_sequence(bits[frame.offset : field_end - width], value):
+                report.issues.append(
+                    FrameIssue(frame.index, frame.offset, "check_sequence", f"Invalid check sequence in {frame.format_reference} frame at bit {frame.offset}")
+                )
+
+    report.issues.sort(key=lambda issue: issue.offset)
+    return report
+
+
+def salvage_frames(binary_data: bytes, report: FrameValidationReport) -> bytes:
+    """Payload made of the valid frames of the report only, ready for `parse_binary_data`."""
+    bits = np.unpackbits(np.frombuffer(binary_data, dtype=np.uint8))
+    valid = [bits[frame.offset : frame.offset + frame.size] for frame in report.valid_frames]
+    if not valid:
+        return b""
+    return np.packbits(np.concatenate(valid)).tobytes()
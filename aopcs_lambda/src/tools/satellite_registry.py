@@ -0,0 +1,201 @@
+"""Satellite registry: identification of the satellite addresses of the Allcast frames, and payload status labels.
+
+The registry is a versioned document, JSON or TOML, on local disk or in S3 (`satellite_registry_uri`):
+
+```json
+{
+    "version": "2025-05-01",
+    "address_bits": 8,
+    "satellites": [{"address": "F1", "mnemonic": "1A", "dcs_id": "0"}],
+    "downlink_status": {"KINEIS_V1": "...", "OFF": "..."},
+    "uplink_status": {"KINEIS_V1": "...", "OFF": "..."}
+}
+```
+
+It is cached, and reloaded when the document changes (ETag in S3, modification time on disk), checked at most every
+`satellite_registry_revalidate_seconds`. Without a configured document, the tables of the decoder module are used.
+"""
+
+import json
+import os
+import time
+from typing import Any, Dict, FrozenSet, Iterable, List, Mapping, NamedTuple, Optional, Tuple
+
+from aws_lambda_powertools import Logger
+
+logger = Logger()
+
+DEFAULT_ADDRESS_BITS = 8
+
+
+class SatelliteRecord(NamedTuple):
+    mnemonic: str
+    dcs_id: str = "0"
+
+
+class SatelliteRegistry:
+    """Satellites by integer address, in a dense list indexed by address.
+
+    Args:
+        satellites (Mapping[int, SatelliteRecord]): Satellites by address.
+        downlink_status (Mapping[str, str]): Downlink status label by payload type name, `OFF` for a disabled payload.
+        uplink_status (Mapping[str, str]): Uplink status label by payload type name, `OFF` for a disabled payload.
+        version (str): Version of the registry document.
+        address_bits (int): Width of the satellite addresses; larger addresses are kept in an overflow dict.
+    """
+
+    def __init__(
+        self,
+        satellites: Mapping[int, SatelliteRecord],
+        downlink_status: Mapping[str, str],
+        uplink_status: Mapping[str, str],
+        version: str = "",
+        address_bits: int = DEFAULT_ADDRESS_BITS,
+    ) -> None:
+        self.version = version
+        self.downlink_status = dict(downlink_status)
+        self.uplink_status = dict(uplink_status)
+        self.index: List[Optional[SatelliteRecord]] = [None] * (1 << address_bits)
+        self.overflow: Dict[int, SatelliteRecord] = {}
+        for address, record in satellites.items():
+            if address < len(self.index):
+                self.index[address] = record
+            else:
+                self.overflow[address] = record
+
+    def __len__(self) -> int:
+        return sum(record is not None for record in self.index) + len(self.overflow)
+
+    def lookup(self, address: int) -> Optional[SatelliteRecord]:
+        if 0 <= address < len(self.index):
+            return self.index[address]
+        return self.overflow.get(address)
+
+    def lookup_hex(self, address: str) -> Optional[SatelliteRecord]:
+        """Look up an address as decoded from the frames ("F1")."""
+        try:
+            return self.lookup(int(address, 16))
+        except ValueError:
+            return None
+
+    def resolve_addresses(self, mnemonics: Iterable[str]) -> FrozenSet[int]:
+        """Addresses of the satellites with these mnemonics."""
+        wanted = set(mnemonics)
+        satellites = [(address, record) for address, record in enumerate(self.index) if record is not None] + list(self.overflow.items())
+        return frozenset(address for address, record in satellites if record.mnemonic.strip() in wanted)
+
+    def payload_status(self, payload_type: str, downlink_enabled: bool, uplink_enabled: bool) -> Tuple[Optional[str], Optional[str]]:
+        """Downlink and uplink status labels of a payload."""
+        down_status = self.downlink_status.get(payload_type if downlink_enabled else "OFF")
+        up_status = self.uplink_status.get(payload_type if uplink_enabled else "OFF")
+        return down_status, up_status
+
+    @classmethod
+    def from_tables(
+        cls, satellite_identification: Mapping[str, str], downlink_status: Mapping[str, str], uplink_status: Mapping[str, str]
+    ) -> "SatelliteRegistry":
+        """Registry of the legacy tables (hexadecimal address: mnemonic); keys that are not addresses are ignored."""
+        satellites = {}
+        for address, mnemonic in satellite_identification.items():
+            try:
+                satellites[int(address, 16)] = SatelliteRecord(mnemonic)
+            except ValueError:
+                continue
+        return cls(satellites, downlink_status, uplink_status)
+
+    @classmethod
+    def from_document(cls, document: Mapping[str, Any]) -> "SatelliteRegistry":
+        """Registry of a parsed registry document (see the module documentation)."""
+        try:
+            satellites = {
+                int(str(entry["address"]), 16): SatelliteRecord(str(entry["mnemonic"]), str(entry.get("dcs_id", "0"))) for entry in document["satellites"]
+            }
+            return cls(
+                satellites,
+                document.get("downlink_status", {}),
+                document.get("uplink_status", {}),
+                version=str(document["version"]),
+                address_bits=int(document.get("address_bits", DEFAULT_ADDRESS_BITS)),
+            )
+        except (KeyError, TypeError, ValueError) as e:
+            raise ValueError(f"Invalid satellite registry: {e!r}") from e
+
+
+def parse_registry(data: bytes, name: str) -> SatelliteRegistry:
+    """Parse a registry document, TOML when `name` ends with `.toml`, JSON otherwise."""
+    if name.endswith(".toml"):
+        import tomllib
+
+        return SatelliteRegistry.from_document(tomllib.loads(data.decode("utf-8")))
+    return SatelliteRegistry.from_document(json.loads(data))
+
+
+class RegistryLoader:
+    """Cached registry of a document, reloaded when it changes.
+
+    Args:
+        uri (str): `s3://bucket/key` or local path of the document.
+        revalidate_seconds (float): Minimum delay between two checks of the document.
+    """
+
+    def __init__(self, uri: str, revalidate_seconds: float) -> None:
+        self.uri = uri
+        self.revalidate_seconds = revalidate_seconds
+        self.version_tag: Optional[str] = None
+        self.registry: Optional[SatelliteRegistry] = None
+        self.checked_at = 0.0
+
+    def _current_tag(self) -> str:
+        if self.uri.startswith("s3://"):
+            from aopcs_lambda.src.aws_clients import create_client
+
+            bucket, key = self.uri[len("s3://") :].split("/", 1)
+            return str(create_client("s3").head_object(Bucket=bucket, Key=key)["ETag"])
+        stat = os.stat(self.uri)
+        return f"{stat.st_mtime_ns}-{stat.st_size}"
+
+    def _read(self) -> bytes:
+        if self.uri.startswith("s3://"):
+            from aopcs_lambda.src.aws_clients import create_client
+
+            bucket, key = self.uri[len("s3://") :].split("/", 1)
+            body: bytes = create_client("s3").get_object(Bucket=bucket, Key=key)["Body"].read()
+            return body
+        with open(self.uri, "rb") as file:
+            return file.read()
+
+    def get(self) -> Optional[SatelliteRegistry]:
+        """Current registry; the last loaded one (None before the first) when the document cannot be read."""
+        now = time.monotonic()
+        if self.registry is not None and now - self.checked_at < self.revalidate_seconds:
+            return self.registry
+        try:
+            tag = self._current_tag()
+            if tag != self.version_tag:
+                self.registry = parse_registry(self._read(), self.uri)
+                self.version_tag = tag
+                logger.info("Satellite registry loaded", extra={"uri": self.uri, "version": self.registry.version, "satellite_count": len(self.registry)})
+        except Exception as e:
+            logger.warning(f"Could not load the satellite registry {self.uri}: {e}")
+        self.checked_at = now
+        return self.registry
+
+
+_loader: Optional[RegistryLoader] = None
+
+
+def get_satellite_registry() -> Optional[SatelliteRegistry]:
+    """Registry of the configured document, None when none is configured (or it never loaded)."""
+    global _loader
+    from aopcs_lambda.src.global_config import get_global_config
+
+    try:
+        global_config = get_global_config()
+    except Exception:
+        return None
+    uri = global_config.satellite_registry_uri
+    if not uri:
+        return None
+    if _loader is None or _loader.uri != uri:
+        _loader = RegistryLoader(uri, global_config.satellite_registry_revalidate_seconds)
+    return _loader.get()
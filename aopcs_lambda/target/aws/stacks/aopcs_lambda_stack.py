@@ -1,7 +1,7 @@
 from typing import Any
 
-from aws_cdk import Duration, Stack, IgnoreMode
-from aws_cdk import aws_lambda, aws_logs, aws_ecr_assets, aws_s3, aws_events, aws_events_targets, aws_iam
+from aws_cdk import CfnOutput, Duration, Stack, IgnoreMode
+from aws_cdk import aws_lambda, aws_logs, aws_ecr_assets, aws_s3, aws_events, aws_events_targets, aws_iam, aws_sns
 
 from constructs import Construct
 
@@ -23,6 +23,8 @@ class AopcsLambdaStack(Stack):
         self.configuration = AopcsLambdaConfigurationModel.read_configuration(environment=str(env))
         self.aopcs_bucket = self.__import_bucket()
         self.aopcs_lambda = self.__create_aopcs_lambda()
+        self.aopcs_query_lambda = self.__create_aopcs_query_lambda()
+        self.bulletin_topic = self.__create_bulletin_topic()
         self.__set_lambda_permissions()
 
         self.__create_event_bridge()
@@ -47,8 +49,40 @@ class AopcsLambdaStack(Stack):
             memory_size=self.configuration.lambda_configuration.memory,
         )
 
+    def __create_aopcs_query_lambda(self) -> aws_lambda.Function:
+        """Read side of the AOP: same image, query handler as entry point, served by a function URL signed with IAM."""
+        base_path = __file__.split("aopcs_lambda")[0]
+        query_lambda = aws_lambda.DockerImageFunction(
+            self,
+            id="aopcs-query-lambda",
+            function_name="aopcs-query-lambda",
+            code=aws_lambda.DockerImageCode.from_image_asset(
+                directory=base_path,
+                file="Dockerfile",
+                ignore_mode=IgnoreMode.DOCKER,
+                network_mode=aws_ecr_assets.NetworkMode.HOST,
+                cmd=["aopcs_lambda/src/query_handler.handler"],
+            ),
+            log_retention=aws_logs.RetentionDays.ONE_MONTH,
+            environment={**self.configuration.lambda_configuration.environment_variables},
+            timeout=Duration.seconds(30),
+            memory_size=self.configuration.lambda_configuration.memory,
+        )
+        function_url = query_lambda.add_function_url(auth_type=aws_lambda.FunctionUrlAuthType.AWS_IAM)
+        CfnOutput(self, "aopcs-query-url", value=function_url.url)
+        return query_lambda
+
+    def __create_bulletin_topic(self) -> aws_sns.Topic:
+        """Change events of the AOP, published by the lambda once a bulletin is uploaded (see `notifier.py`)."""
+        topic = aws_sns.Topic(self, "aopcs-bulletin-published", topic_name="aopcs-bulletin-published", display_name="AOPCS bulletin published")
+        self.aopcs_lambda.add_environment("notifier", "sns")
+        self.aopcs_lambda.add_environment("notification_target", topic.topic_arn)
+        return topic
+
     def __set_lambda_permissions(self) -> None:
         self.aopcs_bucket.grant_read_write(self.aopcs_lambda)
+        self.aopcs_bucket.grant_read(self.aopcs_query_lambda)
+        self.bulletin_topic.grant_publish(self.aopcs_lambda)
 
         # Authorize access to Kinéis secret
         secret_arn = self.configuration.secret_manager_arn
@@ -0,0 +1,55 @@
+import json
+import random
+from typing import Any, Dict, List
+
+import pytest
+from pytest_benchmark.fixture import BenchmarkFixture
+
+from aopcs_lambda.src.tools.compression import compress, has_zstd
+from aopcs_lambda.src.tools.convert_binary_to_aop_configuration_file_for_previpass import render_aop_text
+from tests.fixtures.aop_rows import make_row
+
+CODECS = [("gzip", 1), ("gzip", 6), ("gzip", 9), ("zstd", 3), ("zstd", 19)]
+
+
+def bulletin_rows(satellite_count: int, seed: int = 0) -> List[Dict[str, Any]]:
+    """Rows of a bulletin with realistic orbital elements."""
+    generator = random.Random(seed)
+    return [
+        make_row(
+            f"{i // 26 + 1}{chr(ord('A') + i % 26)}",
+            minute=f"{generator.randrange(60):02d}",
+            second=f"{generator.randrange(60):02d}",
+            semiMajorAxisKm=f"{generator.uniform(6800, 7200):>9.3f}",
+            inclinationDeg=f"{generator.uniform(97, 99):>8.4f}",
+            ascNodeLongitudeDeg=f"{generator.uniform(0, 360):>8.3f}",
+            ascNodeDriftDeg=f"{generator.uniform(-25.5, -24.5):>8.3f}",
+            orbitPeriodMin=f"{generator.uniform(94, 101):>9.4f}",
+            semiMajorAxisDriftMeterPerDay=f"{generator.uniform(0, 5):>6.2f}",
+        )
+        for i in range(satellite_count)
+    ]
+
+
+@pytest.fixture(params=[25, 250], ids=["current", "large"])
+def artefacts(request: pytest.FixtureRequest) -> Dict[str, bytes]:
+    rows = bulletin_rows(request.param)
+    return {"aop": render_aop_text(rows).getvalue().encode("utf-8"), "bulletin.json": json.dumps(rows, separators=(",", ":")).encode("utf-8")}
+
+
+class TestCompressionBenchmarks:
+    """Size and CPU trade-off of the precompressed variants, the compression ratio is in the `extra_info` of each result.
+
+    Run with `pytest tests/benchmarks --benchmark-enable`.
+    """
+
+    @pytest.mark.parametrize("encoding, level", CODECS, ids=[f"{encoding}-{level}" for encoding, level in CODECS])
+    def test_compress_artefacts(self, benchmark: BenchmarkFixture, artefacts: Dict[str, bytes], encoding: str, level: int) -> None:
+        if encoding == "zstd" and not has_zstd():
+            pytest.skip("zstandard is not installed")
+
+        variants = benchmark(lambda: {name: compress(body, encoding, level) for name, body in artefacts.items()})
+
+        for name, body in artefacts.items():
+            benchmark.extra_info[f"{name}_ratio"] = round(len(body) / len(variants[name]), 2)
+        assert all(len(variants[name]) < len(body) for name, body in artefacts.items())
@@ -0,0 +1,69 @@
+import copy
+from typing import Any, Dict, List
+import pytest
+from pytest import MonkeyPatch
+from pytest_benchmark.fixture import BenchmarkFixture
+from pytest_mock import MockerFixture
+
+import aopcs_lambda.src.tools.convert_binary_to_aop_configuration_file_for_previpass as module
+from aopcs_lambda.src.tools.convert_binary_to_aop_configuration_file_for_previpass import (
+    build_metadata_from_csv_rows,
+    build_satellite_rows,
+    convert_to_csv,
+    parse_binary_data,
+)
+from tests.fixtures.synthetic_allcast import SyntheticAllcast
+
+# Bulletin sizes: today's constellation, and a grown constellation with a long Allcast payload.
+SCENARIOS = {
+    "current": SyntheticAllcast(monosat_count=8, multisat_count=3, status_format="CS_10_SAT"),
+    "large": SyntheticAllcast(monosat_count=40, multisat_count=20, status_format="CS_17_SAT", repeat=10),
+}
+
+
+@pytest.fixture(params=list(SCENARIOS))
+def bulletin(request: pytest.FixtureRequest, monkeypatch: MonkeyPatch) -> SyntheticAllcast:
+    synthetic = SCENARIOS[request.param]
+    monkeypatch.setattr(module, "satellite_identification", synthetic.satellite_identification())
+    monkeypatch.setattr(module, "downlink_status", {member.name: f"DL-{member.name}" for member in module.PayloadType} | {"OFF": "OFF"})
+    monkeypatch.setattr(module, "uplink_status", {member.name: f"UL-{member.name}" for member in module.PayloadType} | {"OFF": "OFF"})
+    return synthetic
+
+
+class TestPipelineBenchmarks:
+    """Benchmarks of the decoding and conversion pipeline on synthetic Allcast bulletins.
+
+    Run with `pytest tests/benchmarks --benchmark-enable`; see the `benchmark` job of the CI for the regression gate.
+    """
+
+    def test_parse_binary_data(self, benchmark: BenchmarkFixture, bulletin: SyntheticAllcast) -> None:
+        binary_data = bulletin.binary()
+
+        result = benchmark(parse_binary_data, binary_data)
+
+        assert len(result) == len(bulletin.frames())
+
+    def test_convert_to_csv(self, benchmark: BenchmarkFixture, bulletin: SyntheticAllcast) -> None:
+        frames = bulletin.frames()
+
+        csv_output, metadata = benchmark(convert_to_csv, frames)
+
+        assert csv_output.getvalue()
+        assert metadata.satellite_prevision_min_date is not None
+
+    def test_build_metadata_from_csv_rows(self, benchmark: BenchmarkFixture, bulletin: SyntheticAllcast) -> None:
+        rows: List[Dict[str, Any]] = build_satellite_rows(copy.deepcopy(bulletin.frames()))
+
+        metadata = benchmark(build_metadata_from_csv_rows, rows)
+
+        assert metadata.satellite_prevision_max_date is not None
+
+    def test_fetch_and_convert_kineis_data(self, benchmark: BenchmarkFixture, bulletin: SyntheticAllcast, mocker: MockerFixture, set_env_vars: None) -> None:
+        from aopcs_lambda.src.kineis_converter import fetch_and_convert_kineis_data
+
+        mocker.patch("aopcs_lambda.src.kineis_converter.get_kineis_jwt", return_value="token")
+        mocker.patch("aopcs_lambda.src.kineis_converter.get_allcast_response", return_value=bulletin.binary())
+
+        csv_output, _, _ = benchmark(fetch_and_convert_kineis_data, "client_id", "client_secret", [])
+
+        assert csv_output.getvalue()
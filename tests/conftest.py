@@ -33,11 +33,19 @@ def test_secret_name() -> str:
 
 
 @pytest.fixture(scope="function")
-def set_env_vars(monkeypatch: MonkeyPatch, test_bucket_name: str, test_secret_name: str) -> None:
+def set_env_vars(monkeypatch: MonkeyPatch, test_bucket_name: str, test_secret_name: str) -> Generator[None, None, None]:
     monkeypatch.setenv("bucket_name", test_bucket_name)
     monkeypatch.setenv("aopcs_path", "resources/aopcs/kineis/aop")
     monkeypatch.setenv("secret_manager_arn", test_secret_name)
 
+    # Settings are cached on first access: rebuild them from the patched environment, and drop them afterwards so
+    # the settings of a test do not leak into the next ones.
+    from aopcs_lambda.src.global_config import get_global_config
+
+    get_global_config.cache_clear()
+    yield
+    get_global_config.cache_clear()
+
 
 # === AWS mock clients ===
 
@@ -0,0 +1,40 @@
+from pytest import MonkeyPatch
+
+from aopcs_lambda.src.tools import allcast_layout as layout
+from aopcs_lambda.src.tools import convert_binary_to_aop_configuration_file_for_previpass as decoder
+from aopcs_lambda.src.tools.frame_validation import fields_size_in_bits
+
+# Test layout: 4 bits for the format reference, 2 bits for every other field.
+# AOP_MONOSAT frames are 24 bits long, AOP_MULTISAT 40 bits, CS_2_SAT 30 bits.
+LAYOUT_NAMES = (
+    "FRAME_HEADER_LAYOUT",
+    "SATELLITE_DATA_LAYOUT",
+    "RELATIVE_SATELLITE_LAYOUT",
+    "AOP_FRAME_CHECK_SEQUENCE_LAYOUT",
+    "CONSTELLATION_STATUS_HEADER_LAYOUT",
+    "SATELLITE_STATUS_LAYOUT",
+    "CS_FRAME_CHECK_SEQUENCE_LAYOUT",
+)
+
+
+def use_test_layout(monkeypatch: MonkeyPatch) -> None:
+    """Give the redacted layout small bit widths, so frames can be written by hand."""
+    layouts = []
+    for name in LAYOUT_NAMES:
+        fields = tuple(field._replace(width=4 if field.name == "formatReference" else 2) for field in getattr(layout, name))
+        monkeypatch.setattr(layout, name, fields)
+        layouts.append(fields)
+    monkeypatch.setattr(layout, "ALL_LAYOUTS", tuple(layouts))
+    monkeypatch.setattr(decoder, "get_format_size_in_bits", lambda format_reference: 0)
+
+
+def frame(format_name: str, fill: str = "1", check_sequence: str = "11", reserved: str = "") -> str:
+    """Bits of a frame: header, fields filled with `fill`, check sequence and reserved bits."""
+    size = fields_size_in_bits(format_name)[0]
+    header = "01" + format(decoder.FormatReference[format_name].value, "04b")
+    return header + fill * (size - len(header) - len(check_sequence)) + check_sequence + reserved
+
+
+def pack(bits: str) -> bytes:
+    bits += "0" * (-len(bits) % 8)
+    return int(bits, 2).to_bytes(len(bits) // 8, "big")
@@ -0,0 +1,26 @@
+from typing import Any, Dict
+
+
+def make_row(name: str, **fields: Any) -> Dict[str, Any]:
+    """Row of the `aop` file (as built by `build_satellite_rows`), with the given fields overridden."""
+    row = {
+        "satName": name,
+        "satHexId": name[0],
+        "satDcsId": "0",
+        "downlinkStatus": "",
+        "uplinkStatus": "",
+        "year": "2025",
+        "month": "05",
+        "day": "15",
+        "hour": "12",
+        "minute": "00",
+        "second": "00",
+        "semiMajorAxisKm": " 6789.000",
+        "inclinationDeg": " 98.7000",
+        "ascNodeLongitudeDeg": " 123.400",
+        "ascNodeDriftDeg": " -24.972",
+        "orbitPeriodMin": "  96.5000",
+        "semiMajorAxisDriftMeterPerDay": "  0.50",
+    }
+    row.update(fields)
+    return row
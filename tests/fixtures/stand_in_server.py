@@ -0,0 +1,40 @@
+import gzip
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Thread
+from typing import Iterator
+
+
+@contextmanager
+def stand_in_server(body: bytes = b"allcast", delay: float = 0.0, status: int = 200, gzip_enabled: bool = False) -> Iterator[str]:
+    """Local HTTP server answering every GET with `body` after `delay` seconds (gzipped if enabled and accepted); yields its URL."""
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self) -> None:
+            time.sleep(delay)
+            content = body
+            encoded = gzip_enabled and "gzip" in self.headers.get("Accept-Encoding", "")
+            if encoded:
+                content = gzip.compress(body)
+            try:
+                self.send_response(status)
+                if encoded:
+                    self.send_header("Content-Encoding", "gzip")
+                self.send_header("Content-Length", str(len(content)))
+                self.end_headers()
+                self.wfile.write(content)
+            except (BrokenPipeError, ConnectionResetError):
+                pass  # The client gave up (hedged or timed out)
+
+        def log_message(self, format: str, *args: object) -> None:
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    Thread(target=server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True).start()
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}/allcast"
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,129 @@
+import random
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List
+
+import aopcs_lambda.src.tools.convert_binary_to_aop_configuration_file_for_previpass as decoder
+from aopcs_lambda.src.tools.allcast_layout import (
+    CONSTELLATION_STATUS_SLOTS,
+    MULTISAT_RELATIVE_SATELLITE_COUNT,
+    RELATIVE_SATELLITE_LAYOUT,
+    SATELLITE_DATA_LAYOUT,
+    FieldSpec,
+    Layout,
+)
+from aopcs_lambda.src.tools.aop_encoder import encode_frames
+
+ParsedData = Dict[str, Any]
+
+
+def quantize(field: FieldSpec, value: float) -> float:
+    """Snap a physical value on the resolution of its field, as the decoder would return it."""
+    return round(value / field.scale) * field.scale
+
+
+def field_by_name(layout: Layout, name: str) -> FieldSpec:
+    return next(field for field in layout if field.name == name)
+
+
+class SyntheticAllcast:
+    """Generate realistic Allcast bulletins (decoded frames and their binary encoding).
+
+    Args:
+        monosat_count (int): Number of AOP_MONOSAT frames.
+        multisat_count (int): Number of AOP_MULTISAT frames, each with `MULTISAT_RELATIVE_SATELLITE_COUNT` relatives.
+        status_format (str): Constellation status format (`CS_2_SAT`, `CS_10_SAT` or `CS_17_SAT`).
+        repeat (int): Number of times the bulletin is repeated, to scale the payload size.
+        seed (int): Seed of the generator, the same arguments always give the same bulletin.
+    """
+
+    def __init__(self, monosat_count: int = 10, multisat_count: int = 3, status_format: str = "CS_10_SAT", repeat: int = 1, seed: int = 0) -> None:
+        self.monosat_count = monosat_count
+        self.multisat_count = multisat_count
+        self.status_format = status_format
+        self.repeat = repeat
+        self.seed = seed
+        self.epoch = datetime(2025, 5, 15, tzinfo=timezone.utc)
+
+    @property
+    def addresses(self) -> List[str]:
+        count = self.monosat_count + self.multisat_count * (1 + MULTISAT_RELATIVE_SATELLITE_COUNT)
+        # Address 0 pads the unused slots of the frames
+        return [f"{address:X}" for address in range(1, count + 1)]
+
+    def satellite_identification(self) -> Dict[str, str]:
+        """Satellite identification table matching the generated addresses."""
+        return {address: f"S{address}" for address in self.addresses}
+
+    def satellite_data(self, rng: random.Random, address: str) -> ParsedData:
+        date = self.epoch + timedelta(seconds=rng.randrange(0, 86400 * 8) * 0.125)
+        return {
+            "satelliteAddress": address,
+            "date": date.isoformat(timespec="milliseconds"),
+            "anLongitude": quantize(field_by_name(SATELLITE_DATA_LAYOUT, "anLongitude"), rng.uniform(0, 360)),
+            "anLongitudeDrift": quantize(field_by_name(SATELLITE_DATA_LAYOUT, "anLongitudeDrift"), rng.uniform(-25.6, -24.2)),
+            "nodalPeriod": quantize(field_by_name(SATELLITE_DATA_LAYOUT, "nodalPeriod"), rng.uniform(96.0, 102.0)),
+            "semiMajorAxis": rng.randrange(7_000_000, 7_230_000),
+            "semiMajorAxisDecay": quantize(field_by_name(SATELLITE_DATA_LAYOUT, "semiMajorAxisDecay"), rng.uniform(0, 15)),
+            "inclination": quantize(field_by_name(SATELLITE_DATA_LAYOUT, "inclination"), rng.uniform(97.5, 99.1)),
+        }
+
+    def frames(self) -> List[ParsedData]:
+        """Decoded frames, in the shape returned by `parse_binary_data`."""
+        rng = random.Random(self.seed)
+        addresses = iter(self.addresses)
+        delta_field = field_by_name(RELATIVE_SATELLITE_LAYOUT, "deltaDateRelative")
+        bulletin: List[ParsedData] = []
+        for _ in range(self.monosat_count):
+            bulletin.append(
+                {
+                    "broadcasterReference": "0",
+                    "formatReference": "AOP_MONOSAT",
+                    "satelliteData": self.satellite_data(rng, next(addresses)),
+                    "frameCheckSequence": rng.randrange(0, 1 << 16),
+                }
+            )
+        for _ in range(self.multisat_count):
+            bulletin.append(
+                {
+                    "broadcasterReference": "0",
+                    "formatReference": "AOP_MULTISAT",
+                    "satelliteReference": self.satellite_data(rng, next(addresses)),
+                    "relativeSatellites": [
+                        {"satelliteAddressRelative": next(addresses), "deltaDateRelative": quantize(delta_field, rng.uniform(-9000, 9000))}
+                        for _ in range(MULTISAT_RELATIVE_SATELLITE_COUNT)
+                    ],
+                    "frameCheckSequence": rng.randrange(0, 1 << 16),
+                }
+            )
+
+        slots = CONSTELLATION_STATUS_SLOTS[self.status_format]
+        statuses = [
+            {
+                "satelliteAddress": address,
+                "payloadType": rng.choice([member.name for member in decoder.PayloadType]),
+                "payloadUplinkMissionStatus": rng.random() < 0.9,
+                "payloadDownlinkMissionStatus": rng.random() < 0.9,
+            }
+            for address in self.addresses
+        ]
+        chunks = [statuses[start : start + slots] for start in range(0, len(statuses), slots)]
+        for index, chunk in enumerate(chunks):
+            padding = [
+                {"satelliteAddress": "0", "payloadType": chunk[0]["payloadType"], "payloadUplinkMissionStatus": False, "payloadDownlinkMissionStatus": False}
+            ] * (slots - len(chunk))
+            bulletin.append(
+                {
+                    "broadcasterReference": "0",
+                    "formatReference": self.status_format,
+                    "counter": 1,
+                    "index": index,
+                    "totalNumberOfMessages": len(chunks),
+                    "satellitesStatus": chunk + padding,
+                    "fcs": rng.randrange(0, 1 << 16),
+                }
+            )
+        return bulletin * self.repeat
+
+    def binary(self) -> bytes:
+        """Binary Allcast payload of `frames()`."""
+        return encode_frames(self.frames())
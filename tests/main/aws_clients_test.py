@@ -0,0 +1,33 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+from pytest_mock import MockerFixture
+
+from aopcs_lambda.src.aws_clients import create_client
+
+
+class TestCreateClient:
+    """Test of the client creation from worker threads"""
+
+    def test_clients_are_never_created_concurrently(self, mocker: MockerFixture) -> None:
+        lock = threading.Lock()
+        running = []
+
+        def client(service_name: str, **kwargs: Any) -> str:
+            with lock:
+                running.append(service_name)
+                overlapping = len(running) > 1
+            time.sleep(0.01)
+            with lock:
+                running.remove(service_name)
+            assert not overlapping
+            return service_name
+
+        mocker.patch("boto3.client", side_effect=client)
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            clients = list(executor.map(create_client, ["s3", "sns", "events", "secretsmanager"]))
+
+        assert clients == ["s3", "sns", "events", "secretsmanager"]
@@ -0,0 +1,69 @@
+import time
+from typing import Iterator
+
+import pytest
+import requests
+from pytest import MonkeyPatch
+
+from aopcs_lambda.src.hedged_requests import get_endpoint_stats, hedged_get, order_endpoints, reset_endpoint_stats
+from tests.fixtures.stand_in_server import stand_in_server
+
+
+@pytest.fixture(autouse=True)
+def endpoint_stats() -> Iterator[None]:
+    reset_endpoint_stats()
+    yield
+    reset_endpoint_stats()
+
+
+class TestHedgedGet:
+    """Test of the hedged download over equivalent endpoints"""
+
+    def test_slow_endpoint_is_hedged(self) -> None:
+        with stand_in_server(b"slow", delay=1.5) as slow, stand_in_server(b"fast") as fast:
+            start = time.perf_counter()
+            body = hedged_get([slow, fast], {}, timeout=5, default_hedge_delay=0.1)
+
+            assert body == b"fast"
+            assert time.perf_counter() - start < 1.0
+
+    def test_failing_endpoint_hands_over_at_once(self) -> None:
+        with stand_in_server(status=500) as failing, stand_in_server(b"mirror") as mirror:
+            body = hedged_get([failing, mirror], {}, timeout=5, default_hedge_delay=float("inf"))
+
+        assert body == b"mirror"
+        assert get_endpoint_stats(failing).consecutive_failures == 1
+        assert order_endpoints([failing, mirror]) == [mirror, failing]
+
+    def test_last_error_is_raised_when_every_endpoint_fails(self) -> None:
+        with stand_in_server(status=500) as first, stand_in_server(status=503) as second:
+            with pytest.raises(requests.exceptions.HTTPError):
+                hedged_get([first, second], {}, timeout=5, default_hedge_delay=0.1)
+
+    def test_overall_timeout_is_kept(self) -> None:
+        with stand_in_server(delay=1.0) as first, stand_in_server(delay=1.0) as second:
+            start = time.perf_counter()
+            with pytest.raises(requests.exceptions.Timeout):
+                hedged_get([first, second], {}, timeout=0.3, default_hedge_delay=0.1)
+
+            assert time.perf_counter() - start < 0.8
+
+    def test_hedge_delay_follows_the_recent_p95(self) -> None:
+        with stand_in_server(b"fast") as fast:
+            for _ in range(5):
+                hedged_get([fast], {}, timeout=5, default_hedge_delay=0.1)
+
+        p95 = get_endpoint_stats(fast).p95()
+        assert p95 is not None and p95 < 0.5
+
+
+def test_get_allcast_response_uses_the_mirrors(monkeypatch: MonkeyPatch, set_env_vars: None) -> None:
+    from aopcs_lambda.src.global_config import get_global_config
+    from aopcs_lambda.src.kineis_converter import get_allcast_response
+
+    with stand_in_server(status=502) as primary, stand_in_server(b"mirror") as mirror:
+        monkeypatch.setenv("kineis_api_url", primary)
+        monkeypatch.setenv("kineis_api_mirror_urls", f'["{mirror}"]')
+        get_global_config.cache_clear()
+
+        assert get_allcast_response("token") == b"mirror"
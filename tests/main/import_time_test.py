@@ -0,0 +1,45 @@
+import os
+import subprocess
+import sys
+from typing import List
+
+import pytest
+
+HANDLER_MODULE = "aopcs_lambda.src.main"
+# Cumulative import time allowed for the handler module, in microseconds (best of several runs).
+IMPORT_TIME_BUDGET_US = int(os.getenv("AOPCS_IMPORT_TIME_BUDGET_US", "150000"))
+DEFERRED_MODULES = ["boto3", "requests", "pydantic", "pydantic_settings", "pytz"]
+
+
+def run_python(code: str, *options: str) -> subprocess.CompletedProcess[str]:
+    # Clean environment: the handler module must be importable without any Lambda configuration.
+    env = {key: value for key, value in os.environ.items() if key not in ("bucket_name", "aopcs_path", "secret_manager_arn")}
+    return subprocess.run([sys.executable, *options, "-c", code], capture_output=True, text=True, env=env, check=True)  # nosec B603
+
+
+def measure_import_time_us(module: str) -> int:
+    """Return the cumulative import time of a module reported by `python -X importtime`."""
+    stderr = run_python(f"import {module}", "-X", "importtime").stderr
+    for line in stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        fields = line.split("|")
+        if len(fields) == 3 and fields[2].strip() == module:
+            return int(fields[1])
+    raise AssertionError(f"{module} not found in importtime output: {stderr}")
+
+
+class TestImportTime:
+    """Cold start budget of the handler module"""
+
+    def test_handler_import_time_within_budget(self) -> None:
+        timings: List[int] = [measure_import_time_us(HANDLER_MODULE) for _ in range(3)]
+        assert min(timings) <= IMPORT_TIME_BUDGET_US, f"{HANDLER_MODULE} imports in {min(timings)}us, budget is {IMPORT_TIME_BUDGET_US}us"
+
+    @pytest.mark.parametrize("module", DEFERRED_MODULES)
+    def test_heavy_dependencies_are_deferred(self, module: str) -> None:
+        stdout = run_python(f"import sys, {HANDLER_MODULE}; print({module!r} in sys.modules)").stdout
+        assert stdout.strip() == "False"
+
+    def test_global_config_is_built_on_first_access(self) -> None:
+        stdout = run_python("from aopcs_lambda.src.global_config import get_global_config; print(get_global_config.cache_info().currsize)").stdout
+        assert stdout.strip() == "0"
@@ -0,0 +1,85 @@
+import json
+from pathlib import Path
+from typing import Any
+import pytest
+from pytest import CaptureFixture, MonkeyPatch
+from pytest_mock import MockerFixture
+from io import StringIO
+
+from aopcs_lambda.src.instrumentation import PipelineInstrumentation, current_instrumentation, stage
+from aopcs_lambda.src.models.metadata_model import AOPCSMetadataModel
+
+
+class TestPipelineInstrumentation:
+    """Test of the per-stage instrumentation of the handler pipeline"""
+
+    def test_stage_records_measurements(self) -> None:
+        instrumentation = PipelineInstrumentation(namespace="AOPCS")
+        with instrumentation.activate():
+            with stage("download") as record:
+                record.bytes_out = 42
+            with stage("parse") as record:
+                record.frame_count = 3
+
+        stages = instrumentation.to_dict()["stages"]
+        assert [s["name"] for s in stages] == ["download", "parse"]
+        assert stages[0]["bytes_out"] == 42
+        assert stages[1]["frame_count"] == 3
+        assert all(s["duration_ms"] >= 0 and s["peak_memory_mb"] > 0 for s in stages)
+        assert instrumentation.report.total_duration_ms >= sum(s["duration_ms"] for s in stages)
+        assert current_instrumentation.get() is None
+
+    def test_failed_stage_is_flagged(self) -> None:
+        instrumentation = PipelineInstrumentation(namespace="AOPCS")
+        with pytest.raises(ValueError):
+            with instrumentation.activate(), stage("auth"):
+                raise ValueError("boom")
+
+        assert instrumentation.report.stages[0].succeeded is False
+
+    def test_stage_without_instrumentation_is_noop(self) -> None:
+        with stage("parse") as record:
+            record.frame_count = 1
+        assert current_instrumentation.get() is None
+
+    def test_publish_metrics_emits_emf(self, capsys: CaptureFixture[str]) -> None:
+        instrumentation = PipelineInstrumentation(namespace="AOPCS")
+        with instrumentation.activate(), stage("upload") as record:
+            record.bytes_in = 10
+
+        instrumentation.publish_metrics()
+
+        emf = json.loads(capsys.readouterr().out.strip().splitlines()[-1])
+        metric_names = {metric["Name"] for metric in emf["_aws"]["CloudWatchMetrics"][0]["Metrics"]}
+        assert emf["_aws"]["CloudWatchMetrics"][0]["Namespace"] == "AOPCS"
+        assert {"UploadDuration", "UploadBytesIn", "UploadPeakMemory", "TotalDuration"} <= metric_names
+        assert emf["UploadBytesIn"] == [10.0]
+
+
+class TestHandlerMetricsReport:
+    """Test of the JSON report written by the handler"""
+
+    def test_handler_writes_stage_report(
+        self,
+        monkeypatch: MonkeyPatch,
+        mocker: MockerFixture,
+        tmp_path: Path,
+        s3: Any,
+        create_test_bucket: Any,
+        secrets_client: Any,
+        set_env_vars: None,
+        lambda_context: Any,
+    ) -> None:
+        from aopcs_lambda.src import main
+        from aopcs_lambda.src.global_config import get_global_config
+
+        report_path = tmp_path / "report.json"
+        monkeypatch.setenv("metrics_report_path", str(report_path))
+        get_global_config.cache_clear()
+        mocker.patch("aopcs_lambda.src.main.fetch_and_convert_kineis_data", return_value=(StringIO(" 1A F"), AOPCSMetadataModel(), []))
+
+        main.handler({}, lambda_context)
+
+        report = json.loads(report_path.read_text(encoding="utf-8"))
+        assert [s["name"] for s in report["stages"]] == ["secrets", "render", "upload"]
+        assert report["stages"][2]["bytes_in"] > 0
@@ -51,3 +51,32 @@ class TestKineisConverter:
 
         with pytest.raises(RequestException):
             get_allcast_response("mocked_jwt_token")
+
+    def test_invalid_frames_are_rejected(self, mocker: MockerFixture, monkeypatch: pytest.MonkeyPatch, set_env_vars: None) -> None:
+        from aopcs_lambda.src.global_config import get_global_config
+        from aopcs_lambda.src.kineis_converter import validate_allcast_binary
+        from aopcs_lambda.src.tools.frame_validation import FrameIssue, FrameSpan, FrameValidationError, FrameValidationReport
+
+        report = FrameValidationReport(16, [FrameSpan(0, 0, 8, "AOP_MONOSAT")], [FrameIssue(1, 8, "truncated", "Truncated frame")])
+        mocker.patch("aopcs_lambda.src.tools.frame_validation.validate_frames", return_value=report)
+        monkeypatch.setenv("frame_validation", "reject")
+        get_global_config.cache_clear()
+
+        with pytest.raises(FrameValidationError, match="Truncated frame"):
+            validate_allcast_binary(b"\xaa\xbb")
+
+        monkeypatch.setenv("frame_validation", "salvage")
+        get_global_config.cache_clear()
+        assert validate_allcast_binary(b"\xaa\xbb") == b"\xaa"
+
+
+def test_get_allcast_response_decompresses_gzip(monkeypatch: pytest.MonkeyPatch, set_env_vars: None) -> None:
+    from aopcs_lambda.src.global_config import get_global_config
+    from aopcs_lambda.src.kineis_converter import get_allcast_response
+    from tests.fixtures.stand_in_server import stand_in_server
+
+    with stand_in_server(b"\x00\x01" * 1000, gzip_enabled=True) as url:
+        monkeypatch.setenv("kineis_api_url", url)
+        get_global_config.cache_clear()
+
+        assert get_allcast_response("token") == b"\x00\x01" * 1000
@@ -0,0 +1,80 @@
+import hashlib
+import json
+import logging
+from typing import Any
+import pytest
+from pytest import MonkeyPatch
+from pytest_mock import MockerFixture
+
+from aopcs_lambda.src.logger import FastJSONLogFormatter, JSONLogFormatter, LazyPayload, setup_logger, stop_log_listeners
+
+
+class CountingPayload(LazyPayload):
+    formatted = 0
+
+    def __str__(self) -> str:
+        CountingPayload.formatted += 1
+        return super().__str__()
+
+
+def make_record(message: str) -> logging.LogRecord:
+    return logging.LogRecord("test", logging.INFO, __file__, 1, message, None, None)
+
+
+class TestLazyPayload:
+    """Test of the lazy payload log arguments"""
+
+    def test_not_formatted_when_the_level_is_disabled(self) -> None:
+        logger = logging.getLogger("lazy-payload-test")
+        logger.setLevel(logging.WARNING)
+        CountingPayload.formatted = 0
+
+        logger.info("Frames: %s", CountingPayload([{"formatReference": "AOP_MONOSAT"}] * 1000))
+
+        assert CountingPayload.formatted == 0
+
+    def test_summary_by_default(self) -> None:
+        digest = hashlib.sha256(b'[{"a":1},{"a":2}]').hexdigest()[:16]
+
+        assert str(LazyPayload([{"a": 1}, {"a": 2}], full=False)) == f"<list, 2 items, {digest}>"
+        assert str(LazyPayload(b"ab", full=False)) == f"<bytes, 2 items, {hashlib.sha256(b'ab').hexdigest()[:16]}>"
+
+    def test_digest_ignores_key_order(self) -> None:
+        assert LazyPayload({"a": 1, "b": 2}).digest() == LazyPayload({"b": 2, "a": 1}).digest()
+        assert LazyPayload({"a": 1}).digest() != LazyPayload({"a": 2}).digest()
+
+    def test_digest_is_computed_when_formatted(self, mocker: MockerFixture) -> None:
+        sha256 = mocker.spy(hashlib, "sha256")
+        payload = LazyPayload([{"a": 1}], full=False)
+
+        assert sha256.call_count == 0
+        str(payload)
+        assert sha256.call_count == 1
+
+    def test_full_payload_behind_the_setting(self, monkeypatch: MonkeyPatch, set_env_vars: None) -> None:
+        from aopcs_lambda.src.global_config import get_global_config
+
+        monkeypatch.setenv("log_full_payloads", "true")
+        get_global_config.cache_clear()
+
+        assert str(LazyPayload([{"a": 1}])) == '[{"a":1}]'
+
+
+class TestSetupLogger:
+    """Test of the JSON loggers"""
+
+    def test_fast_formatter_writes_the_same_record(self) -> None:
+        pytest.importorskip("orjson")
+        record = make_record("hello")
+
+        assert json.loads(FastJSONLogFormatter().format(record)) == json.loads(JSONLogFormatter().format(record))
+
+    def test_non_blocking_logger(self, capsys: Any) -> None:
+        logger = setup_logger("non-blocking-test", non_blocking=True)
+        try:
+            logger.info("queued message")
+        finally:
+            stop_log_listeners()
+            logger.handlers.clear()
+
+        assert json.loads(capsys.readouterr().err)["message"] == "queued message"
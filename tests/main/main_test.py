@@ -3,10 +3,12 @@ from typing import Any
 from pytest import MonkeyPatch
 from pytest_mock import MockerFixture
 from io import StringIO
+import gzip
 import json
 from botocore.exceptions import ClientError
 
 from aopcs_lambda.src.models.metadata_model import AOPCSMetadataModel
+from tests.fixtures.aop_rows import make_row
 
 
 class TestHandler:
@@ -25,7 +27,7 @@ class TestHandler:
         from aopcs_lambda.src import main
 
         dummy_csv = StringIO("satellite_id,timestamp,data\n1,2024-01-01T00:00:00Z,some_data\n")
-        mocker.patch("aopcs_lambda.src.main.fetch_and_convert_kineis_data", return_value=(dummy_csv, AOPCSMetadataModel()))
+        mocker.patch("aopcs_lambda.src.main.fetch_and_convert_kineis_data", return_value=(dummy_csv, AOPCSMetadataModel(), []))
 
         main.handler({}, lambda_context)
 
@@ -48,7 +50,7 @@ class TestHandler:
         from aopcs_lambda.src import main
 
         dummy_csv = StringIO("satellite_id,timestamp,data\n1,2024-01-01T00:00:00Z,some_data\n")
-        mocker.patch("aopcs_lambda.src.main.fetch_and_convert_kineis_data", return_value=(dummy_csv, AOPCSMetadataModel()))
+        mocker.patch("aopcs_lambda.src.main.fetch_and_convert_kineis_data", return_value=(dummy_csv, AOPCSMetadataModel(), []))
 
         # Patch s3.upload_fileobj to raise ClientError
         def raise_client_error(*args: Any, **kwargs: Any) -> None:
@@ -60,6 +62,195 @@ class TestHandler:
         with pytest.raises(ClientError):
             main.handler({}, lambda_context)
 
+    def test_handler_uploads_binary_aop(
+        self,
+        monkeypatch: MonkeyPatch,
+        mocker: MockerFixture,
+        s3: Any,
+        create_test_bucket: Any,
+        secrets_client: Any,
+        set_env_vars: None,
+        lambda_context: Any,
+    ) -> None:
+        from aopcs_lambda.src import main
+        from aopcs_lambda.src.global_config import get_global_config
+        from aopcs_lambda.src.tools.aop_binary_format import read_aop_binary
+
+        monkeypatch.setenv("binary_output_enabled", "true")
+        get_global_config.cache_clear()
+        row = make_row("1A", ascNodeDriftDeg="  -0.010")
+        mocker.patch("aopcs_lambda.src.main.fetch_and_convert_kineis_data", return_value=(StringIO(" 1A 1 0"), AOPCSMetadataModel(), [row]))
+
+        main.handler({}, lambda_context)
+
+        response = s3.get_object(Bucket="test-bucket", Key="resources/aopcs/kineis/aop/aop.bin")
+        records = read_aop_binary(response["Body"].read())
+        assert [record.name for record in records] == ["1A"]
+        assert records[0].asc_node_drift_deg == -0.01
+
+    def test_handler_publishes_delta_from_previous_run(
+        self,
+        monkeypatch: MonkeyPatch,
+        mocker: MockerFixture,
+        s3: Any,
+        create_test_bucket: Any,
+        secrets_client: Any,
+        set_env_vars: None,
+        lambda_context: Any,
+    ) -> None:
+        from aopcs_lambda.src import main
+        from aopcs_lambda.src.global_config import get_global_config
+        from aopcs_lambda.src.tools.aop_delta import apply_delta, decode_delta
+
+        monkeypatch.setenv("delta_output_enabled", "true")
+        get_global_config.cache_clear()
+        previous_rows = [make_row("1A"), make_row("2B")]
+        rows = [make_row("1A", hour="13"), make_row("2B")]
+        fetch = mocker.patch("aopcs_lambda.src.main.fetch_and_convert_kineis_data", return_value=(StringIO(" 1A"), AOPCSMetadataModel(), previous_rows))
+
+        main.handler({}, lambda_context)
+        with pytest.raises(ClientError):
+            s3.head_object(Bucket="test-bucket", Key="resources/aopcs/kineis/aop/aop.delta")
+
+        fetch.return_value = (StringIO(" 1A"), AOPCSMetadataModel(), rows)
+        main.handler({}, lambda_context)
+
+        delta = decode_delta(s3.get_object(Bucket="test-bucket", Key="resources/aopcs/kineis/aop/aop.delta")["Body"].read())
+        assert delta["changed"] == {"1A": {"8": "13"}}
+        assert apply_delta(previous_rows, delta) == rows
+
+    def test_handler_archives_columnar_bulletin(
+        self,
+        monkeypatch: MonkeyPatch,
+        mocker: MockerFixture,
+        s3: Any,
+        create_test_bucket: Any,
+        secrets_client: Any,
+        set_env_vars: None,
+        lambda_context: Any,
+    ) -> None:
+        from aopcs_lambda.src import main
+        from aopcs_lambda.src.global_config import get_global_config
+
+        monkeypatch.setenv("columnar_export_enabled", "true")
+        get_global_config.cache_clear()
+        mocker.patch("aopcs_lambda.src.main.fetch_and_convert_kineis_data", return_value=(StringIO(" 1A"), AOPCSMetadataModel(), [make_row("1A")]))
+
+        main.handler({}, lambda_context)
+
+        listing = s3.list_objects_v2(Bucket="test-bucket", Prefix="resources/aopcs/kineis/aop/archive/date=")
+        assert len(listing["Contents"]) == 1
+
+    def test_handler_publishes_gzip_variants(
+        self,
+        monkeypatch: MonkeyPatch,
+        mocker: MockerFixture,
+        s3: Any,
+        create_test_bucket: Any,
+        secrets_client: Any,
+        set_env_vars: None,
+        lambda_context: Any,
+    ) -> None:
+        from aopcs_lambda.src import main
+        from aopcs_lambda.src.global_config import get_global_config
+
+        monkeypatch.setenv("compressed_variants", '["gzip"]')
+        get_global_config.cache_clear()
+        monkeypatch.setattr(main, "get_s3_client", lambda: s3)
+        mocker.patch("aopcs_lambda.src.main.fetch_and_convert_kineis_data", return_value=(StringIO(" 1A"), AOPCSMetadataModel(), [make_row("1A")]))
+
+        main.handler({}, lambda_context)
+
+        response = s3.get_object(Bucket="test-bucket", Key="resources/aopcs/kineis/aop/aop.gz")
+        assert response["ContentEncoding"].split(",")[0] == "gzip"  # moto keeps the aws-chunked encoding of the upload
+        assert gzip.decompress(response["Body"].read()) == b" 1A"
+        assert s3.head_object(Bucket="test-bucket", Key="resources/aopcs/kineis/aop/metadata.json.gz")["ContentType"] == "application/json"
+
+    def test_handler_publishes_packed_bulletin(
+        self,
+        monkeypatch: MonkeyPatch,
+        mocker: MockerFixture,
+        s3: Any,
+        create_test_bucket: Any,
+        secrets_client: Any,
+        set_env_vars: None,
+        lambda_context: Any,
+    ) -> None:
+        from aopcs_lambda.src import main
+        from aopcs_lambda.src.global_config import get_global_config
+        from aopcs_lambda.src.tools.aop_packed import fetch_records, s3_range_reader
+
+        monkeypatch.setenv("packed_output_enabled", "true")
+        get_global_config.cache_clear()
+        monkeypatch.setattr(main, "get_s3_client", lambda: s3)
+        mocker.patch(
+            "aopcs_lambda.src.main.fetch_and_convert_kineis_data", return_value=(StringIO(" 1A"), AOPCSMetadataModel(), [make_row("1A"), make_row("3B")])
+        )
+
+        main.handler({}, lambda_context)
+
+        records = fetch_records(s3_range_reader(s3, "test-bucket", "resources/aopcs/kineis/aop/aop.pack"), ["3B"])
+        assert records["3B"].startswith("3B 3 0")
+
+    def test_handler_replicates_artefacts(
+        self,
+        monkeypatch: MonkeyPatch,
+        mocker: MockerFixture,
+        s3: Any,
+        create_test_bucket: Any,
+        secrets_client: Any,
+        set_env_vars: None,
+        lambda_context: Any,
+    ) -> None:
+        from aopcs_lambda.src import main
+        from aopcs_lambda.src.global_config import get_global_config
+
+        mocker.patch("aopcs_lambda.src.replication.RETRY_BASE_DELAY_SECONDS", 0)
+        s3.create_bucket(Bucket="devices", CreateBucketConfiguration={"LocationConstraint": "eu-west-3"})
+        destinations = [{"bucket": "devices", "prefix": "aop", "artefacts": ["aop", "metadata.json"]}, {"bucket": "missing-bucket", "prefix": "aop"}]
+        monkeypatch.setenv("replication_destinations", json.dumps(destinations))
+        get_global_config.cache_clear()
+        monkeypatch.setattr(main, "get_s3_client", lambda: s3)
+        mocker.patch("aopcs_lambda.src.main.fetch_and_convert_kineis_data", return_value=(StringIO(" 1A"), AOPCSMetadataModel(), [make_row("1A")]))
+
+        error = mocker.patch.object(main.logger, "error")
+        instrumentation = mocker.spy(main, "PipelineInstrumentation")
+
+        main.handler({}, lambda_context)
+
+        error.assert_called_once_with("Replication incomplete", extra=mocker.ANY)
+        assert [record.failure_count for record in instrumentation.spy_return.report.stages if record.name == "replicate"] == [1]
+        assert s3.get_object(Bucket="devices", Key="aop/aop")["Body"].read() == b" 1A"
+        assert [item["Key"] for item in s3.list_objects_v2(Bucket="devices")["Contents"]] == ["aop/aop", "aop/metadata.json"]
+
+    def test_handler_publishes_change_event(
+        self,
+        monkeypatch: MonkeyPatch,
+        mocker: MockerFixture,
+        s3: Any,
+        create_test_bucket: Any,
+        secrets_client: Any,
+        set_env_vars: None,
+        lambda_context: Any,
+    ) -> None:
+        from aopcs_lambda.src import main
+        from aopcs_lambda.src.global_config import get_global_config
+        from aopcs_lambda.src.notifier import InMemoryNotifier
+
+        notifier = InMemoryNotifier()
+        mocker.patch("aopcs_lambda.src.notifier._in_memory_notifier", notifier)
+        monkeypatch.setenv("notifier", "memory")
+        get_global_config.cache_clear()
+        monkeypatch.setattr(main, "get_s3_client", lambda: s3)
+        mocker.patch("aopcs_lambda.src.main.fetch_and_convert_kineis_data", return_value=(StringIO(" 1A"), AOPCSMetadataModel(), [make_row("1A")]))
+
+        main.handler({}, lambda_context)
+
+        (event,) = notifier.events
+        assert event["changed_satellites"] == ["1A"]
+        assert event["keys"][-1] == "resources/aopcs/kineis/aop/metadata.json"
+        assert event["upload_date"] is not None
+
 
 class TestGetKineisSecrets:
     """Test of get_kineis_secrets (Scerets Manager) function"""
@@ -121,3 +312,214 @@ class TestGetKineisSecrets:
             get_kineis_secrets("non-existent-secret-arn")
 
         assert exc_info.value.response["Error"]["Code"] == "ResourceNotFoundException"
+
+    def test_duplicate_run_exits_without_processing(
+        self,
+        monkeypatch: MonkeyPatch,
+        mocker: MockerFixture,
+        s3: Any,
+        create_test_bucket: Any,
+        secrets_client: Any,
+        set_env_vars: None,
+        lambda_context: Any,
+    ) -> None:
+        from aopcs_lambda.src import main
+        from aopcs_lambda.src.global_config import get_global_config
+        from aopcs_lambda.src.run_lease import RunLease
+
+        monkeypatch.setenv("run_lease_enabled", "true")
+        get_global_config.cache_clear()
+        monkeypatch.setattr(main, "get_s3_client", lambda: s3)
+        fetch = mocker.patch("aopcs_lambda.src.main.fetch_and_convert_kineis_data", return_value=(StringIO(" 1A"), AOPCSMetadataModel(), []))
+        RunLease(s3, "test-bucket", "resources/aopcs/kineis/aop/run.lock", 60, run_id="scheduled-run").acquire()
+        log_info = mocker.patch.object(main.logger, "info")
+
+        main.handler({}, lambda_context)
+
+        fetch.assert_not_called()
+        assert log_info.call_args.kwargs["extra"]["owner_run_id"] == "scheduled-run"
+
+    def test_lease_is_released_after_the_run(
+        self,
+        monkeypatch: MonkeyPatch,
+        mocker: MockerFixture,
+        s3: Any,
+        create_test_bucket: Any,
+        secrets_client: Any,
+        set_env_vars: None,
+        lambda_context: Any,
+    ) -> None:
+        from aopcs_lambda.src import main
+        from aopcs_lambda.src.global_config import get_global_config
+
+        monkeypatch.setenv("run_lease_enabled", "true")
+        get_global_config.cache_clear()
+        monkeypatch.setattr(main, "get_s3_client", lambda: s3)
+        mocker.patch("aopcs_lambda.src.main.fetch_and_convert_kineis_data", return_value=(StringIO(" 1A"), AOPCSMetadataModel(), []))
+
+        main.handler({}, lambda_context)
+
+        assert s3.list_objects_v2(Bucket="test-bucket", Prefix="resources/aopcs/kineis/aop/run.lock")["KeyCount"] == 0
+
+    def test_handler_publishes_reepoched_bulletins(
+        self,
+        monkeypatch: MonkeyPatch,
+        mocker: MockerFixture,
+        s3: Any,
+        create_test_bucket: Any,
+        secrets_client: Any,
+        set_env_vars: None,
+        lambda_context: Any,
+    ) -> None:
+        from aopcs_lambda.src import main
+        from aopcs_lambda.src.global_config import get_global_config
+
+        monkeypatch.setenv("reepoch_cadence_minutes", "60")
+        monkeypatch.setenv("reepoch_count", "3")
+        get_global_config.cache_clear()
+        monkeypatch.setattr(main, "get_s3_client", lambda: s3)
+        mocker.patch("aopcs_lambda.src.main.fetch_and_convert_kineis_data", return_value=(StringIO(" 1A"), AOPCSMetadataModel(), [make_row("1A")]))
+
+        main.handler({}, lambda_context)
+        main.handler({}, lambda_context)
+
+        listing = s3.list_objects_v2(Bucket="test-bucket", Prefix="resources/aopcs/kineis/aop/reepoch/")
+        assert [item["Key"].rsplit("/", 1)[-1] for item in listing["Contents"]] == ["aop-1", "aop-2", "aop-3"]
+        body = s3.get_object(Bucket="test-bucket", Key="resources/aopcs/kineis/aop/reepoch/aop-1")["Body"].read().decode("utf-8")
+        assert body.startswith(" 1A 1 0")
+
+    def test_handler_publishes_coverage(
+        self,
+        monkeypatch: MonkeyPatch,
+        mocker: MockerFixture,
+        s3: Any,
+        create_test_bucket: Any,
+        secrets_client: Any,
+        set_env_vars: None,
+        lambda_context: Any,
+    ) -> None:
+        from aopcs_lambda.src import main
+        from aopcs_lambda.src.global_config import get_global_config
+
+        monkeypatch.setenv("coverage_enabled", "true")
+        monkeypatch.setenv("coverage_grid_step_deg", "30")
+        get_global_config.cache_clear()
+        monkeypatch.setattr(main, "get_s3_client", lambda: s3)
+        mocker.patch("aopcs_lambda.src.main.fetch_and_convert_kineis_data", return_value=(StringIO(" 1A"), AOPCSMetadataModel(), [make_row("1A")]))
+
+        main.handler({}, lambda_context)
+
+        coverage = json.loads(s3.get_object(Bucket="test-bucket", Key="resources/aopcs/kineis/aop/coverage.json")["Body"].read())
+        assert coverage["satellite_count"] == 1
+        assert coverage["summary"]["passes_per_day"] > 0
+
+    def test_failing_tenant_does_not_stop_the_others(
+        self,
+        monkeypatch: MonkeyPatch,
+        mocker: MockerFixture,
+        s3: Any,
+        create_test_bucket: Any,
+        secrets_client: Any,
+        set_env_vars: None,
+        lambda_context: Any,
+    ) -> None:
+        from aopcs_lambda.src import main
+        from aopcs_lambda.src.global_config import get_global_config
+
+        tenants = [
+            {"name": "ops", "secret_manager_arn": "test-secret", "aopcs_path": "tenants/ops", "kineis_api_url": "https://ops.example.com/allcast"},
+            {"name": "lab", "secret_manager_arn": "missing-secret", "aopcs_path": "tenants/lab"},
+        ]
+        monkeypatch.setenv("tenants", json.dumps(tenants))
+        get_global_config.cache_clear()
+        monkeypatch.setattr(main, "get_s3_client", lambda: s3)
+        fetch = mocker.patch("aopcs_lambda.src.main.fetch_and_convert_kineis_data", return_value=(StringIO(" 1A"), AOPCSMetadataModel(), []))
+        log_info = mocker.patch.object(main.logger, "info")
+
+        with pytest.raises(Exception, match=r"failed for tenants \['lab'\]"):
+            main.handler({}, lambda_context)
+
+        assert fetch.call_args.kwargs["api_url"] == "https://ops.example.com/allcast"
+        assert s3.get_object(Bucket="test-bucket", Key="tenants/ops/aop")["Body"].read() == b" 1A"
+        assert s3.list_objects_v2(Bucket="test-bucket", Prefix="tenants/lab/")["KeyCount"] == 0
+        summary = next(call.kwargs["extra"]["tenants"] for call in log_info.call_args_list if call.args == ("Tenants ingested",))
+        assert [(result["tenant"], result["succeeded"]) for result in summary] == [("ops", True), ("lab", False)]
+
+    def test_global_mirrors_are_only_used_for_the_default_endpoint(
+        self,
+        monkeypatch: MonkeyPatch,
+        mocker: MockerFixture,
+        s3: Any,
+        create_test_bucket: Any,
+        secrets_client: Any,
+        set_env_vars: None,
+        lambda_context: Any,
+    ) -> None:
+        from aopcs_lambda.src import main
+        from aopcs_lambda.src.global_config import get_global_config
+
+        tenants = [
+            {"name": "default", "secret_manager_arn": "test-secret", "aopcs_path": "tenants/default"},
+            {"name": "ops", "secret_manager_arn": "test-secret", "aopcs_path": "tenants/ops", "kineis_api_url": "https://ops.example.com/allcast"},
+        ]
+        monkeypatch.setenv("tenants", json.dumps(tenants))
+        monkeypatch.setenv("kineis_api_url", "https://kineis.example.com/allcast")
+        monkeypatch.setenv("kineis_api_mirror_urls", json.dumps(["https://mirror.example.com/allcast"]))
+        get_global_config.cache_clear()
+        monkeypatch.setattr(main, "get_s3_client", lambda: s3)
+        mocker.patch("aopcs_lambda.src.kineis_converter.get_kineis_jwt", return_value="token")
+        hedged_get = mocker.patch("aopcs_lambda.src.hedged_requests.hedged_get", side_effect=ConnectionError("stop"))
+        get = mocker.patch("requests.get", side_effect=ConnectionError("stop"))
+
+        with pytest.raises(Exception, match="failed for tenants"):
+            main.handler({}, lambda_context)
+
+        assert [call.args[0] for call in hedged_get.call_args_list] == [["https://kineis.example.com/allcast", "https://mirror.example.com/allcast"]]
+        assert [call.args[0] for call in get.call_args_list] == ["https://ops.example.com/allcast"]
+
+    def test_tenants_are_ingested_under_cprofile(
+        self,
+        monkeypatch: MonkeyPatch,
+        mocker: MockerFixture,
+        tmp_path: Any,
+        s3: Any,
+        create_test_bucket: Any,
+        secrets_client: Any,
+        set_env_vars: None,
+        lambda_context: Any,
+    ) -> None:
+        from aopcs_lambda.src import main
+        from aopcs_lambda.src.global_config import get_global_config
+
+        tenants = [{"name": name, "secret_manager_arn": "test-secret", "aopcs_path": f"tenants/{name}"} for name in ("ops", "lab")]
+        monkeypatch.setenv("tenants", json.dumps(tenants))
+        monkeypatch.setenv("profile_mode", "cprofile")
+        monkeypatch.setenv("profile_output_dir", str(tmp_path))
+        get_global_config.cache_clear()
+        monkeypatch.setattr(main, "get_s3_client", lambda: s3)
+        mocker.patch("aopcs_lambda.src.main.fetch_and_convert_kineis_data", return_value=(StringIO(" 1A"), AOPCSMetadataModel(), []))
+
+        main.handler({}, lambda_context)
+
+        for name in ("ops", "lab"):
+            assert s3.get_object(Bucket="test-bucket", Key=f"tenants/{name}/aop")["Body"].read() == b" 1A"
+        assert [path.name.split("-", 1)[1] for path in tmp_path.iterdir()] == ["handler.prof"]
+
+    def test_handler_fails_when_every_tenant_fails(
+        self,
+        monkeypatch: MonkeyPatch,
+        s3: Any,
+        create_test_bucket: Any,
+        secrets_client: Any,
+        set_env_vars: None,
+        lambda_context: Any,
+    ) -> None:
+        from aopcs_lambda.src import main
+        from aopcs_lambda.src.global_config import get_global_config
+
+        monkeypatch.setenv("tenants", json.dumps([{"name": "lab", "secret_manager_arn": "missing-secret", "aopcs_path": "tenants/lab"}]))
+        get_global_config.cache_clear()
+        monkeypatch.setattr(main, "get_s3_client", lambda: s3)
+
+        with pytest.raises(Exception, match=r"failed for tenants \['lab'\]"):
+            main.handler({}, lambda_context)
@@ -0,0 +1,81 @@
+import json
+from typing import Any
+
+import boto3
+import pytest
+from moto import mock_aws
+from pytest_mock import MockerFixture
+
+from aopcs_lambda.src.models.metadata_model import AOPCSMetadataModel
+from aopcs_lambda.src.notifier import EventBridgeNotifier, InMemoryNotifier, SnsNotifier, build_change_event, notify
+from tests.fixtures.aop_rows import make_row
+
+KEYS = ["resources/aopcs/kineis/aop/aop", "resources/aopcs/kineis/aop/metadata.json"]
+
+
+def make_event(**kwargs: Any) -> dict:
+    rows = [make_row("1A"), make_row("1B", minute="30")]
+    return build_change_event(rows, kwargs.pop("previous_rows", None), AOPCSMetadataModel(), "test-bucket", KEYS, **kwargs)
+
+
+class TestChangeEvent:
+    """Test of the change event of a bulletin"""
+
+    def test_first_bulletin_changes_every_satellite(self) -> None:
+        event = make_event(tenant="ops")
+
+        assert event["changed_satellites"] == ["1A", "1B"]
+        assert event["previous_hash"] is None
+        assert event["tenant"] == "ops"
+        assert event["keys"] == KEYS
+
+    def test_changed_and_removed_satellites(self) -> None:
+        event = make_event(previous_rows=[make_row("1A"), make_row("1B"), make_row("3A")])
+
+        assert event["changed_satellites"] == ["1B"]
+        assert event["removed_satellites"] == ["3A"]
+        assert event["previous_hash"] != event["bulletin_hash"]
+
+
+class TestNotifiers:
+    """Test of the notifiers"""
+
+    def test_sns_notifier(self, aws_region: str) -> None:
+        with mock_aws():
+            sns = boto3.client("sns", region_name=aws_region)
+            sqs = boto3.client("sqs", region_name=aws_region)
+            topic_arn = sns.create_topic(Name="aopcs-bulletin-published")["TopicArn"]
+            queue_url = sqs.create_queue(QueueName="consumer")["QueueUrl"]
+            queue_arn = sqs.get_queue_attributes(QueueUrl=queue_url, AttributeNames=["QueueArn"])["Attributes"]["QueueArn"]
+            sns.subscribe(TopicArn=topic_arn, Protocol="sqs", Endpoint=queue_arn, Attributes={"RawMessageDelivery": "true"})
+
+            SnsNotifier(topic_arn, client=sns).publish(make_event())
+
+            message = sqs.receive_message(QueueUrl=queue_url)["Messages"][0]
+            assert json.loads(message["Body"])["changed_satellites"] == ["1A", "1B"]
+
+    def test_eventbridge_notifier(self, mocker: MockerFixture, aws_region: str) -> None:
+        with mock_aws():
+            events = boto3.client("events", region_name=aws_region)
+            put_events = mocker.spy(events, "put_events")
+
+            EventBridgeNotifier("default", client=events).publish(make_event())
+
+            assert put_events.spy_return["FailedEntryCount"] == 0
+            entry = put_events.call_args.kwargs["Entries"][0]
+            assert (entry["Source"], entry["DetailType"]) == ("aopcs-lambda", "aop.published")
+            assert json.loads(entry["Detail"])["bulletin_hash"] == make_event()["bulletin_hash"]
+
+    def test_failed_notification_does_not_raise(self, mocker: MockerFixture) -> None:
+        notifier = InMemoryNotifier()
+        mocker.patch.object(notifier, "publish", side_effect=RuntimeError("throttled"))
+
+        assert not notify(notifier, make_event())
+
+
+def test_eventbridge_rejected_entries_raise(mocker: MockerFixture) -> None:
+    client = mocker.Mock()
+    client.put_events.return_value = {"FailedEntryCount": 1, "Entries": [{"ErrorCode": "InternalFailure"}]}
+
+    with pytest.raises(RuntimeError, match="rejected"):
+        EventBridgeNotifier("default", client=client).publish(make_event())
@@ -0,0 +1,97 @@
+from io import StringIO
+import time
+from typing import Any, Dict, Iterator
+
+import pytest
+from pytest import MonkeyPatch
+from pytest_mock import MockerFixture
+
+from aopcs_lambda.src.models.metadata_model import AOPCSMetadataModel
+from aopcs_lambda.src.prefetch import prefetched_s3_client, prefetched_secrets, prefetched_token, reset_prefetch, start_prefetch, wait_for_prefetch
+
+SECRETS = {"client_id": "prefetched-id", "client_secret": "prefetched-secret"}
+
+
+def load_secrets(secret_arn: str) -> Dict[str, str]:
+    return SECRETS
+
+
+@pytest.fixture(autouse=True)
+def prefetch(mocker: MockerFixture, set_env_vars: None) -> Iterator[Any]:
+    reset_prefetch()
+    yield mocker.patch("aopcs_lambda.src.kineis_converter.get_kineis_jwt", return_value="prefetched-token")
+    reset_prefetch()
+
+
+class TestPrefetch:
+    """Test of the init-phase prefetch"""
+
+    def test_prefetched_values_are_used_once(self) -> None:
+        client = object()
+        start_prefetch(lambda: client, load_secrets)
+
+        assert prefetched_s3_client() is client
+        assert prefetched_secrets("test-secret") == SECRETS
+        assert prefetched_token("prefetched-id", max_age_seconds=60) == "prefetched-token"
+        assert prefetched_token("prefetched-id", max_age_seconds=60) is None
+
+    def test_aged_token_is_not_used(self) -> None:
+        start_prefetch(object, load_secrets)
+
+        assert prefetched_token("prefetched-id", max_age_seconds=0) is None
+
+    def test_secrets_of_another_arn_are_not_used(self) -> None:
+        start_prefetch(object, load_secrets)
+
+        assert prefetched_secrets("other-secret") is None
+
+    def test_failures_fall_back(self, prefetch: Any) -> None:
+        def fail(secret_arn: str) -> Dict[str, str]:
+            raise ConnectionError("unreachable")
+
+        start_prefetch(object, fail)
+
+        assert prefetched_secrets("test-secret") is None
+        assert prefetched_token("prefetched-id", max_age_seconds=60) is None
+        prefetch.assert_not_called()
+
+    def test_prefetched_token_skips_the_authentication(self, prefetch: Any, mocker: MockerFixture) -> None:
+        from aopcs_lambda.src.kineis_converter import fetch_and_convert_kineis_data
+
+        start_prefetch(object, load_secrets)
+        prefetched_secrets("test-secret")
+        download = mocker.patch("aopcs_lambda.src.kineis_converter.get_allcast_response", side_effect=ConnectionError("stop"))
+
+        with pytest.raises(ConnectionError):
+            fetch_and_convert_kineis_data("prefetched-id", "prefetched-secret", [])
+
+        assert download.call_args.args[0] == "prefetched-token"
+        prefetch.assert_called_once()  # By the prefetch only
+
+    def test_wait_for_prefetch_waits_for_every_step(self) -> None:
+        def slow_secrets(secret_arn: str) -> Dict[str, str]:
+            time.sleep(0.05)
+            return SECRETS
+
+        start_prefetch(object, slow_secrets)
+        wait_for_prefetch()
+
+        assert prefetched_secrets("test-secret", timeout=0) == SECRETS
+        assert prefetched_token("prefetched-id", max_age_seconds=60, timeout=0) == "prefetched-token"
+
+    def test_nothing_prefetched_when_not_started(self) -> None:
+        assert prefetched_s3_client(timeout=0) is None
+
+
+def test_handler_uses_prefetched_credentials(monkeypatch: MonkeyPatch, mocker: MockerFixture, s3: Any, create_test_bucket: Any, lambda_context: Any) -> None:
+    from aopcs_lambda.src import main
+
+    start_prefetch(lambda: s3, load_secrets)
+    get_kineis_secrets = mocker.patch("aopcs_lambda.src.main.get_kineis_secrets")
+    fetch = mocker.patch("aopcs_lambda.src.main.fetch_and_convert_kineis_data", return_value=(StringIO(" 1A"), AOPCSMetadataModel(), []))
+
+    main.handler({}, lambda_context)
+
+    get_kineis_secrets.assert_not_called()
+    assert fetch.call_args.args[:2] == ("prefetched-id", "prefetched-secret")
+    assert s3.get_object(Bucket="test-bucket", Key="resources/aopcs/kineis/aop/aop")["Body"].read() == b" 1A"
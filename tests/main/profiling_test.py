@@ -0,0 +1,123 @@
+from concurrent.futures import ThreadPoolExecutor
+import contextvars
+import marshal
+from pathlib import Path
+from typing import Any
+import pytest
+from pytest import MonkeyPatch
+from pytest_mock import MockerFixture
+
+from aopcs_lambda.src.profiling import exclusive_profile, profiled
+
+
+def busy_work() -> int:
+    return sum(len(str(i)) for i in range(100_000))
+
+
+@pytest.fixture
+def profile_dir(monkeypatch: MonkeyPatch, tmp_path: Path, set_env_vars: None) -> Path:
+    from aopcs_lambda.src.global_config import get_global_config
+
+    monkeypatch.setenv("profile_output_dir", str(tmp_path))
+    get_global_config.cache_clear()
+    return tmp_path
+
+
+def enable_profiling(monkeypatch: MonkeyPatch, mode: str, sample_rate: float = 1.0) -> None:
+    from aopcs_lambda.src.global_config import get_global_config
+
+    monkeypatch.setenv("profile_mode", mode)
+    monkeypatch.setenv("profile_sample_rate", str(sample_rate))
+    get_global_config.cache_clear()
+
+
+class TestProfiled:
+    """Test of the opt-in profiling hook"""
+
+    def test_profiling_off_by_default(self, profile_dir: Path) -> None:
+        assert profiled("busy")(busy_work)() > 0
+        assert list(profile_dir.iterdir()) == []
+
+    def test_cprofile_artefact_is_loadable(self, monkeypatch: MonkeyPatch, profile_dir: Path) -> None:
+        enable_profiling(monkeypatch, "cprofile")
+
+        profiled("busy")(busy_work)()
+
+        [artefact] = list(profile_dir.glob("*-busy.prof"))
+        stats = marshal.loads(artefact.read_bytes())
+        assert any(function == "busy_work" for (_, _, function) in stats)
+
+    def test_tracemalloc_artefact_is_written(self, monkeypatch: MonkeyPatch, profile_dir: Path) -> None:
+        enable_profiling(monkeypatch, "tracemalloc")
+
+        profiled("busy")(lambda: [bytearray(1024) for _ in range(100)])()
+
+        assert len(list(profile_dir.glob("*-busy.tracemalloc"))) == 1
+
+    def test_sampling_profiler_logs_hotspots(self, monkeypatch: MonkeyPatch, mocker: MockerFixture, profile_dir: Path) -> None:
+        enable_profiling(monkeypatch, "sample")
+        monkeypatch.setenv("profile_sampling_interval_ms", "1")
+        log_info = mocker.patch("aopcs_lambda.src.profiling.logger.info")
+
+        # Long enough to be sampled on a loaded CI runner
+        profiled("busy")(lambda: [busy_work() for _ in range(10)])()
+
+        [artefact] = list(profile_dir.glob("*-busy.collapsed"))
+        assert "busy_work" in artefact.read_text(encoding="utf-8")
+        hotspots = log_info.call_args.kwargs["extra"]["hotspots"]
+        assert hotspots and sum(hotspot["share"] for hotspot in hotspots) <= 1
+
+    def test_sample_rate_zero_skips_profiling(self, monkeypatch: MonkeyPatch, profile_dir: Path) -> None:
+        enable_profiling(monkeypatch, "cprofile", sample_rate=0.0)
+
+        profiled("busy")(busy_work)()
+
+        assert list(profile_dir.iterdir()) == []
+
+    def test_nested_calls_produce_a_single_profile(self, monkeypatch: MonkeyPatch, profile_dir: Path) -> None:
+        enable_profiling(monkeypatch, "cprofile")
+        inner = profiled("inner")(busy_work)
+
+        profiled("outer")(lambda: inner())()
+
+        assert [path.name.split("-", 1)[1] for path in profile_dir.iterdir()] == ["outer.prof"]
+
+    def test_calls_in_worker_threads_get_their_own_profile(self, monkeypatch: MonkeyPatch, profile_dir: Path) -> None:
+        enable_profiling(monkeypatch, "sample")
+        inner = profiled("inner")(busy_work)
+
+        def outer() -> None:
+            with ThreadPoolExecutor(max_workers=1) as executor:
+                executor.submit(contextvars.copy_context().run, inner).result()
+
+        profiled("outer")(outer)()
+
+        assert sorted(path.name.split("-", 1)[1] for path in profile_dir.iterdir()) == ["inner.collapsed", "outer.collapsed"]
+
+    @pytest.mark.parametrize("mode, extension", [("cprofile", "prof"), ("tracemalloc", "tracemalloc")])
+    def test_process_wide_profilers_run_one_at_a_time(self, monkeypatch: MonkeyPatch, profile_dir: Path, mode: str, extension: str) -> None:
+        enable_profiling(monkeypatch, mode)
+        inner = profiled("inner")(busy_work)
+
+        def outer() -> int:
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                return sum(executor.map(lambda _: contextvars.copy_context().run(inner), range(2)))
+
+        assert profiled("outer")(outer)() == 2 * busy_work()
+        assert [path.name.split("-", 1)[1] for path in profile_dir.iterdir()] == [f"outer.{extension}"]
+
+    def test_profiler_that_cannot_start_runs_the_call_unprofiled(self, monkeypatch: MonkeyPatch, mocker: MockerFixture, profile_dir: Path) -> None:
+        enable_profiling(monkeypatch, "cprofile")
+        mocker.patch("aopcs_lambda.src.profiling.CProfileProfiler.start", side_effect=ValueError("Another profiling tool is already active"))
+
+        assert profiled("busy")(busy_work)() == busy_work()
+        assert list(profile_dir.iterdir()) == []
+        assert not exclusive_profile.locked()
+
+    def test_profile_uploaded_to_s3(self, monkeypatch: MonkeyPatch, s3: Any, create_test_bucket: Any, set_env_vars: None) -> None:
+        enable_profiling(monkeypatch, "sample")
+
+        profiled("busy")(busy_work)()
+
+        keys = [obj["Key"] for obj in s3.list_objects_v2(Bucket="test-bucket")["Contents"]]
+        assert len(keys) == 1 and keys[0].startswith("resources/aopcs/kineis/aop/profiles/") and keys[0].endswith("-busy.collapsed")
@@ -0,0 +1,97 @@
+import base64
+import json
+from typing import Any, Dict, List
+import pytest
+from pytest import MonkeyPatch
+from pytest_mock import MockerFixture
+
+from aopcs_lambda.src import query_handler
+from aopcs_lambda.src.tools.aop_binary_format import read_aop_binary
+from tests.fixtures.aop_rows import make_row
+
+AOPCS_PATH = "resources/aopcs/kineis/aop"
+
+
+def publish(s3: Any, rows: List[Dict[str, Any]]) -> None:
+    s3.put_object(Bucket="test-bucket", Key=f"{AOPCS_PATH}/bulletin.json", Body=json.dumps(rows))
+    s3.put_object(Bucket="test-bucket", Key=f"{AOPCS_PATH}/metadata.json", Body=json.dumps({"satellite_count": len(rows)}))
+
+
+@pytest.fixture
+def store(monkeypatch: MonkeyPatch, s3: Any, create_test_bucket: Any, set_env_vars: None) -> Any:
+    monkeypatch.setattr(query_handler, "_store", None)
+    monkeypatch.setattr("boto3.client", lambda *args, **kwargs: s3)
+    publish(s3, [make_row("1A"), make_row("2B"), make_row("3C")])
+    return query_handler.get_bulletin_store()
+
+
+class TestQueryHandler:
+    """Test of the read-side query handler"""
+
+    def test_full_bulletin_as_text(self, store: Any, lambda_context: Any) -> None:
+        response = query_handler.handler({}, lambda_context)
+
+        assert response["statusCode"] == 200
+        assert response["headers"]["Content-Type"].startswith("text/plain")
+        assert response["headers"]["ETag"] == store.etag
+        assert response["body"].startswith(" 1A 1 0")
+
+    def test_subset_as_json_from_query_string(self, store: Any, lambda_context: Any) -> None:
+        response = query_handler.handler({"queryStringParameters": {"satellites": "3C, 1A", "format": "json"}}, lambda_context)
+
+        assert [row["satName"] for row in json.loads(response["body"])] == ["1A", "3C"]
+
+    def test_subset_as_binary(self, store: Any, lambda_context: Any) -> None:
+        response = query_handler.handler({"satellites": ["2B"], "format": "binary"}, lambda_context)
+
+        assert response["isBase64Encoded"]
+        assert [record.name for record in read_aop_binary(base64.b64decode(response["body"]))] == ["2B"]
+
+    def test_warm_invocations_are_served_from_memory(self, store: Any, s3: Any, mocker: MockerFixture, lambda_context: Any) -> None:
+        query_handler.handler({"satellites": "1A"}, lambda_context)
+        head_object = mocker.spy(s3, "head_object")
+        get_object = mocker.spy(s3, "get_object")
+
+        response = query_handler.handler({"satellites": "1A"}, lambda_context)
+
+        assert response["body"].startswith(" 1A")
+        assert head_object.call_count == 0
+        assert get_object.call_count == 0
+
+    def test_new_bulletin_is_loaded_after_revalidation(self, store: Any, s3: Any, lambda_context: Any) -> None:
+        store.revalidate_seconds = 0
+        query_handler.handler({"format": "json"}, lambda_context)
+
+        publish(s3, [make_row("4D")])
+        response = query_handler.handler({"format": "json"}, lambda_context)
+
+        assert [row["satName"] for row in json.loads(response["body"])] == ["4D"]
+
+    def test_unchanged_bulletin_is_not_reloaded(self, store: Any, s3: Any, mocker: MockerFixture, lambda_context: Any) -> None:
+        store.revalidate_seconds = 0
+        query_handler.handler({}, lambda_context)
+        get_object = mocker.spy(s3, "get_object")
+
+        query_handler.handler({}, lambda_context)
+
+        assert get_object.call_count == 0
+
+    def test_least_recently_used_response_is_evicted(self, store: Any, lambda_context: Any) -> None:
+        store.cache_size = 2
+        for satellites in ("1A", "2B", "1A", "3C"):
+            query_handler.handler({"satellites": satellites}, lambda_context)
+
+        assert list(store.responses) == [("text", ("1A",)), ("text", ("3C",))]
+
+    def test_unknown_format(self, store: Any, lambda_context: Any) -> None:
+        response = query_handler.handler({"format": "xml"}, lambda_context)
+
+        assert response["statusCode"] == 400
+
+    def test_no_bulletin_published(self, monkeypatch: MonkeyPatch, s3: Any, create_test_bucket: Any, set_env_vars: None, lambda_context: Any) -> None:
+        monkeypatch.setattr(query_handler, "_store", None)
+        monkeypatch.setattr("boto3.client", lambda *args, **kwargs: s3)
+
+        response = query_handler.handler({}, lambda_context)
+
+        assert response["statusCode"] == 503
@@ -0,0 +1,70 @@
+import gzip
+from typing import Any, List, Tuple
+
+import boto3
+from pytest_mock import MockerFixture
+
+from aopcs_lambda.src.global_config import DestinationConfig
+from aopcs_lambda.src.replication import Replicator, destination_key
+
+AOPCS_PATH = "resources/aopcs/kineis/aop"
+ARTEFACTS: List[Tuple[str, bytes]] = [(f"{AOPCS_PATH}/aop", b" 1A 1 0" * 50), (f"{AOPCS_PATH}/aop.bin", b"\x00\x01"), (f"{AOPCS_PATH}/metadata.json", b"{}")]
+
+
+def regional_client(region: Any) -> Any:
+    return boto3.client("s3", region_name=region or "eu-west-3")
+
+
+class TestReplicator:
+    """Test of the replication of the artefacts to several destinations"""
+
+    def test_artefacts_are_written_to_every_destination(self, s3: Any, create_test_bucket: Any) -> None:
+        regional_client("us-east-1").create_bucket(Bucket="devices-us")
+        destinations = [
+            DestinationConfig(bucket="devices-us", prefix="aop", region="us-east-1", artefacts=["aop", "metadata.json"]),
+            DestinationConfig(bucket="test-bucket", prefix="internal/{tenant}"),
+        ]
+
+        report = Replicator(regional_client).replicate(ARTEFACTS, AOPCS_PATH, destinations, tenant="ops")
+
+        assert report["consistent"]
+        assert list(report["destinations"][0]["keys"]) == ["aop/aop", "aop/metadata.json"]
+        assert regional_client("us-east-1").get_object(Bucket="devices-us", Key="aop/aop")["Body"].read() == ARTEFACTS[0][1]
+        assert s3.get_object(Bucket="test-bucket", Key="internal/ops/aop.bin")["Body"].read() == b"\x00\x01"
+
+    def test_uploads_are_retried(self, mocker: MockerFixture, s3: Any, create_test_bucket: Any) -> None:
+        mocker.patch("aopcs_lambda.src.replication.RETRY_BASE_DELAY_SECONDS", 0)
+        put_object = s3.put_object
+        mocker.patch.object(s3, "put_object", side_effect=[ConnectionError("reset")] + [mocker.DEFAULT] * 3, wraps=put_object)
+
+        report = Replicator(lambda region: s3).replicate(ARTEFACTS, AOPCS_PATH, [DestinationConfig(bucket="test-bucket", prefix="copy")])
+
+        assert report["consistent"]
+        assert report["destinations"][0]["attempts"] == 4
+
+    def test_failing_destination_is_reported_without_its_metadata(self, mocker: MockerFixture, s3: Any, create_test_bucket: Any) -> None:
+        mocker.patch("aopcs_lambda.src.replication.RETRY_BASE_DELAY_SECONDS", 0)
+        destinations = [DestinationConfig(bucket="missing-bucket", prefix="aop"), DestinationConfig(bucket="test-bucket", prefix="copy")]
+
+        report = Replicator(regional_client).replicate(ARTEFACTS, AOPCS_PATH, destinations)
+
+        assert not report["consistent"]
+        failed, replicated = report["destinations"]
+        assert failed["missing_keys"] == ["aop/aop", "aop/aop.bin", "aop/metadata.json"]
+        assert failed["attempts"] == 3
+        assert replicated["consistent"]
+
+    def test_compressed_destination(self, s3: Any, create_test_bucket: Any) -> None:
+        destination = DestinationConfig(bucket="test-bucket", prefix="cdn", compression="gzip")
+
+        Replicator(regional_client).replicate(ARTEFACTS, AOPCS_PATH, [destination])
+
+        response = s3.get_object(Bucket="test-bucket", Key="cdn/aop")
+        assert response["ContentEncoding"].split(",")[0] == "gzip"  # moto keeps the aws-chunked encoding of the upload
+        assert gzip.decompress(response["Body"].read()) == ARTEFACTS[0][1]
+        assert s3.get_object(Bucket="test-bucket", Key="cdn/aop.bin")["Body"].read() == b"\x00\x01"
+
+
+def test_destination_key() -> None:
+    assert destination_key(f"{AOPCS_PATH}/reepoch/aop-20250515T1200Z", AOPCS_PATH, "replica/") == "replica/reepoch/aop-20250515T1200Z"
+    assert destination_key("archive/2025/aop.npz", AOPCS_PATH, "replica") == "replica/archive/2025/aop.npz"
@@ -0,0 +1,71 @@
+import json
+import time
+from typing import Any
+
+import pytest
+from botocore.exceptions import ClientError
+from pytest_mock import MockerFixture
+
+from aopcs_lambda.src.run_lease import MAX_ACQUIRE_ATTEMPTS, RunLease
+
+LEASE_KEY = "resources/aopcs/kineis/aop/run.lock"
+
+
+def make_lease(s3: Any, run_id: str, ttl_seconds: float = 60) -> RunLease:
+    return RunLease(s3, "test-bucket", LEASE_KEY, ttl_seconds, run_id=run_id)
+
+
+class TestRunLease:
+    """Test of the S3 run lease"""
+
+    def test_second_run_reports_the_owner(self, s3: Any, create_test_bucket: Any) -> None:
+        assert make_lease(s3, "first").acquire() is None
+
+        owner = make_lease(s3, "second").acquire()
+
+        assert owner is not None and owner["run_id"] == "first"
+
+    def test_released_lease_can_be_taken(self, s3: Any, create_test_bucket: Any) -> None:
+        first = make_lease(s3, "first")
+        first.acquire()
+        first.release()
+
+        assert make_lease(s3, "second").acquire() is None
+
+    def test_expired_lease_is_taken_over(self, s3: Any, create_test_bucket: Any) -> None:
+        expired = {"run_id": "crashed", "acquired_at": time.time() - 120, "expires_at": time.time() - 60}
+        s3.put_object(Bucket="test-bucket", Key=LEASE_KEY, Body=json.dumps(expired))
+
+        assert make_lease(s3, "next").acquire() is None
+        assert json.loads(s3.get_object(Bucket="test-bucket", Key=LEASE_KEY)["Body"].read())["run_id"] == "next"
+
+    def test_release_without_lease_does_nothing(self, s3: Any, create_test_bucket: Any) -> None:
+        make_lease(s3, "first").acquire()
+
+        make_lease(s3, "second").release()
+
+        assert make_lease(s3, "third").acquire() is not None
+
+    def test_lease_released_between_the_put_and_the_read_is_taken(self, s3: Any, create_test_bucket: Any, mocker: MockerFixture) -> None:
+        first = make_lease(s3, "first")
+        first.acquire()
+        get_object = s3.get_object
+
+        def release_then_get_object(**kwargs: Any) -> Any:
+            first.release()
+            return get_object(**kwargs)
+
+        mocker.patch.object(s3, "get_object", side_effect=release_then_get_object)
+
+        assert make_lease(s3, "second").acquire() is None
+        assert json.loads(get_object(Bucket="test-bucket", Key=LEASE_KEY)["Body"].read())["run_id"] == "second"
+
+    def test_acquire_gives_up_after_the_last_attempt(self, mocker: MockerFixture) -> None:
+        s3 = mocker.Mock()
+        s3.put_object.side_effect = ClientError({"Error": {"Code": "PreconditionFailed"}}, "PutObject")
+        s3.get_object.side_effect = ClientError({"Error": {"Code": "NoSuchKey"}}, "GetObject")
+
+        with pytest.raises(RuntimeError):
+            make_lease(s3, "second").acquire()
+
+        assert s3.put_object.call_count == MAX_ACQUIRE_ATTEMPTS
@@ -0,0 +1,120 @@
+from typing import Any, Dict, List
+import pytest
+from pytest import MonkeyPatch
+
+import aopcs_lambda.src.tools.convert_binary_to_aop_configuration_file_for_previpass as module
+from aopcs_lambda.src.tools.aop_binary_format import HEADER, RECORD, read_aop_binary, record_to_row, render_aop_binary
+from aopcs_lambda.src.tools.convert_binary_to_aop_configuration_file_for_previpass import build_satellite_rows, render_aop_text
+from tests.fixtures.synthetic_allcast import SyntheticAllcast
+
+PARSED_DATA: List[Dict[str, Any]] = [
+    {
+        "satelliteReference": {
+            "satelliteAddress": "1234",
+            "date": "2025-05-15T12:00:00",
+            "semiMajorAxis": 6789000.0,
+            "inclination": 98.7,
+            "anLongitude": 123.4,
+            "anLongitudeDrift": -24.972,
+            "nodalPeriod": 96.5,
+            "semiMajorAxisDecay": -0.5,
+        },
+        "relativeSatellites": [{"satelliteAddressRelative": "91011", "deltaDateRelative": 8}],
+    },
+    {
+        "formatReference": "CS_2_SAT",
+        "satellitesStatus": [
+            {"satelliteAddress": "1234", "payloadType": "TYPE1", "payloadUplinkMissionStatus": True, "payloadDownlinkMissionStatus": False},
+        ],
+    },
+]
+
+
+class TestAopBinaryFormat:
+    """Test of the binary encoding of the aop file"""
+
+    @pytest.fixture(autouse=True)
+    def patch_satellite_identification(self, monkeypatch: MonkeyPatch) -> None:
+        monkeypatch.setitem(module.convert_to_csv.__globals__, "satellite_identification", {"1234": "1234", "91011": "91011"})
+        monkeypatch.setitem(module.convert_to_csv.__globals__, "downlink_status", {"TYPE1": "DL-ON", "OFF": "DL-OFF"})
+        monkeypatch.setitem(module.convert_to_csv.__globals__, "uplink_status", {"TYPE1": "UL-ON", "OFF": "UL-OFF"})
+
+    @pytest.fixture
+    def rows(self) -> List[Dict[str, Any]]:
+        return build_satellite_rows(PARSED_DATA)
+
+    def test_round_trip(self, rows: List[Dict[str, Any]]) -> None:
+        records = read_aop_binary(render_aop_binary(rows))
+
+        assert [record.name for record in records] == ["1234", "91011"]
+        assert records[0].semi_major_axis_km == 6789.0
+        assert records[0].asc_node_drift_deg == -24.972
+        assert records[0].semi_major_axis_drift_meter_per_day == -0.5
+        assert (records[1].epoch - records[0].epoch).total_seconds() == 8
+
+    @pytest.mark.parametrize("with_crc", [True, False])
+    def test_same_values_as_the_text_file(self, rows: List[Dict[str, Any]], with_crc: bool) -> None:
+        decoded_rows = [record_to_row(record) for record in read_aop_binary(render_aop_binary(rows, with_crc=with_crc))]
+
+        assert render_aop_text(decoded_rows).getvalue() == render_aop_text(rows).getvalue()
+
+    @pytest.mark.parametrize("seed", range(5))
+    def test_same_values_as_the_text_file_on_a_full_bulletin(self, monkeypatch: MonkeyPatch, seed: int) -> None:
+        synthetic = SyntheticAllcast(monosat_count=20, multisat_count=10, status_format="CS_17_SAT", seed=seed)
+        monkeypatch.setitem(module.convert_to_csv.__globals__, "satellite_identification", synthetic.satellite_identification())
+        rows = build_satellite_rows(synthetic.frames())
+
+        decoded_rows = [record_to_row(record) for record in read_aop_binary(render_aop_binary(rows))]
+
+        assert render_aop_text(decoded_rows).getvalue() == render_aop_text(rows).getvalue()
+
+    def test_smaller_than_the_text_file(self, monkeypatch: MonkeyPatch) -> None:
+        synthetic = SyntheticAllcast(monosat_count=40, multisat_count=20, status_format="CS_17_SAT")
+        monkeypatch.setitem(module.convert_to_csv.__globals__, "satellite_identification", synthetic.satellite_identification())
+        rows = build_satellite_rows(synthetic.frames())
+
+        binary = render_aop_binary(rows)
+
+        assert RECORD.size == 33
+        assert len(binary) < len(render_aop_text(rows).getvalue().encode("utf-8")) / 2
+
+    def test_empty(self) -> None:
+        binary = render_aop_binary([])
+
+        assert read_aop_binary(binary) == []
+
+    def test_crc_mismatch(self, rows: List[Dict[str, Any]]) -> None:
+        binary = bytearray(render_aop_binary(rows))
+        binary[HEADER.size + 3] ^= 0xFF
+
+        with pytest.raises(ValueError, match="CRC mismatch"):
+            read_aop_binary(bytes(binary))
+
+    def test_not_an_aop_binary_file(self) -> None:
+        with pytest.raises(ValueError, match="Not an aop binary file"):
+            read_aop_binary(b" 1234 1 0   2025 05 15")
+
+    def test_unsupported_version(self, rows: List[Dict[str, Any]]) -> None:
+        binary = bytearray(render_aop_binary(rows, with_crc=False))
+        binary[4] = 2
+
+        with pytest.raises(ValueError, match="Unsupported aop binary version: 2"):
+            read_aop_binary(bytes(binary))
+
+    def test_truncated(self, rows: List[Dict[str, Any]]) -> None:
+        with pytest.raises(ValueError, match="Truncated"):
+            read_aop_binary(render_aop_binary(rows, with_crc=False)[:-1])
+
+    @pytest.mark.parametrize("size", [0, 1, 2, 5])
+    def test_truncated_string_table(self, rows: List[Dict[str, Any]], size: int) -> None:
+        binary = render_aop_binary(rows, with_crc=False)
+
+        with pytest.raises(ValueError, match="Truncated"):
+            read_aop_binary(binary[: HEADER.size + size])
+
+    def test_invalid_string_index(self, rows: List[Dict[str, Any]]) -> None:
+        binary = bytearray(render_aop_binary(rows, with_crc=False))
+        binary[-RECORD.size * len(rows)] = 200  # Name of the first record
+
+        with pytest.raises(ValueError, match="Invalid string index 200"):
+            read_aop_binary(bytes(binary))
@@ -0,0 +1,67 @@
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List
+from zoneinfo import ZoneInfo
+import numpy as np
+import pytest
+
+from aopcs_lambda.src.tools.aop_columnar import archive_key, read_columnar_files, render_columnar, rows_to_columns
+from tests.fixtures.aop_rows import make_row
+
+BULLETIN_TIME = datetime(2025, 5, 16, 1, 30, tzinfo=ZoneInfo("Europe/Paris"))
+
+
+@pytest.fixture
+def rows() -> List[Dict[str, Any]]:
+    return [make_row("1A", downlinkStatus=None), make_row("2B", hour="13", ascNodeDriftDeg=" -24.973")]
+
+
+class TestAopColumnar:
+    """Test of the columnar export of the satellite rows"""
+
+    def test_columns_are_typed(self, rows: List[Dict[str, Any]]) -> None:
+        columns = rows_to_columns(rows, BULLETIN_TIME)
+
+        assert columns["semiMajorAxisKm"].dtype == np.float64
+        assert columns["ascNodeDriftDeg"].tolist() == [-24.972, -24.973]
+        assert columns["epoch"].tolist() == [datetime(2025, 5, 15, 12), datetime(2025, 5, 15, 13)]
+        assert columns["bulletinTime"][0] == np.datetime64("2025-05-15T23:30:00")
+        assert columns["downlinkStatus"].tolist() == ["", ""]
+
+    def test_npz_round_trip(self, tmp_path: Path, rows: List[Dict[str, Any]]) -> None:
+        paths = []
+        for day, bulletin_rows in enumerate([rows, rows[:1]]):
+            content, extension = render_columnar(bulletin_rows, BULLETIN_TIME.replace(day=16 + day), file_format="npz")
+            path = tmp_path / f"aop-{day}.{extension}"
+            path.write_bytes(content)
+            paths.append(str(path))
+
+        columns = read_columnar_files(paths)
+
+        assert columns["satName"].tolist() == ["1A", "2B", "1A"]
+        assert columns["orbitPeriodMin"].dtype == np.float64
+        assert columns["epoch"].dtype == np.dtype("datetime64[s]")
+
+    def test_parquet_round_trip(self, tmp_path: Path, rows: List[Dict[str, Any]]) -> None:
+        pytest.importorskip("pyarrow")
+        content, extension = render_columnar(rows, BULLETIN_TIME)
+        path = tmp_path / f"aop.{extension}"
+        path.write_bytes(content)
+
+        columns = read_columnar_files([str(path)])
+
+        assert extension == "parquet"
+        assert columns["satName"].tolist() == ["1A", "2B"]
+        assert columns["inclinationDeg"].tolist() == [98.7, 98.7]
+
+    def test_unknown_format(self, rows: List[Dict[str, Any]]) -> None:
+        with pytest.raises(ValueError, match="Unknown columnar format: csv"):
+            render_columnar(rows, BULLETIN_TIME, file_format="csv")
+
+    def test_mixed_formats(self) -> None:
+        with pytest.raises(ValueError, match="Cannot mix"):
+            read_columnar_files(["a.parquet", "b.npz"])
+
+    def test_archive_key_is_partitioned_by_utc_date(self) -> None:
+        assert archive_key("aop/archive", BULLETIN_TIME, "npz") == "aop/archive/date=2025-05-15/aop-233000.npz"
+        assert archive_key("aop/archive", BULLETIN_TIME.astimezone(timezone.utc), "npz") == "aop/archive/date=2025-05-15/aop-233000.npz"
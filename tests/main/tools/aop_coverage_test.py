@@ -0,0 +1,71 @@
+from datetime import datetime, timezone
+import numpy as np
+import pytest
+
+from aopcs_lambda.src.tools.aop_coverage import chunk_steps, compute_coverage, contact_statistics
+from tests.fixtures.aop_rows import make_row
+
+START = datetime(2025, 5, 15, 12, tzinfo=timezone.utc)
+
+
+def polar_satellite(name: str, node: float = 0.0) -> dict:
+    return make_row(name, semiMajorAxisKm=" 7200.000", orbitPeriodMin=" 101.3000", ascNodeLongitudeDeg=f"{node:8.3f}")
+
+
+class TestContactStatistics:
+    """Test of the contact and revisit extraction"""
+
+    def test_contacts_and_gaps(self) -> None:
+        visible = np.array(
+            [
+                [1, 1, 0, 0, 0, 1, 0, 1, 1, 0],
+                [0, 0, 0, 0, 0, 0, 0, 0, 0, 0],
+                [0, 0, 1, 1, 0, 0, 0, 0, 0, 0],
+            ],
+            dtype=bool,
+        )
+
+        statistics = contact_statistics(visible, step_min=2.0)
+
+        assert statistics["passes"].tolist() == [3, 0, 1]
+        assert statistics["visibility_min"].tolist() == [10.0, 0.0, 4.0]
+        assert statistics["mean_revisit_min"][0] == pytest.approx(4.0)
+        assert statistics["max_revisit_min"][0] == pytest.approx(6.0)
+        assert np.isnan(statistics["mean_revisit_min"][1:]).all()
+
+
+class TestComputeCoverage:
+    """Test of the coverage statistics of the constellation"""
+
+    def test_polar_orbit_covers_the_poles_best(self) -> None:
+        coverage = compute_coverage([polar_satellite("1A")], START, grid_step_deg=30.0)
+
+        passes = [row[0] for row in coverage["passes_per_day"]]
+        assert len(coverage["latitudes"]) == 6 and len(coverage["longitudes"]) == 12
+        assert passes[0] > passes[2] and passes[-1] > passes[3]
+        assert coverage["satellite_count"] == 1
+
+    def test_more_satellites_shorten_the_revisit(self) -> None:
+        single = compute_coverage([polar_satellite("1A")], START, grid_step_deg=30.0)
+        constellation = compute_coverage([polar_satellite(f"{i}A", node=i * 30.0) for i in range(6)], START, grid_step_deg=30.0, max_workers=2)
+
+        assert constellation["summary"]["mean_revisit_min"] < single["summary"]["mean_revisit_min"]
+        assert constellation["summary"]["passes_per_day"] > single["summary"]["passes_per_day"]
+
+    def test_chunking_does_not_change_the_result(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        import aopcs_lambda.src.tools.aop_coverage as aop_coverage
+
+        rows = [polar_satellite("1A"), polar_satellite("2B", node=90.0)]
+        expected = compute_coverage(rows, START, grid_step_deg=30.0)
+        monkeypatch.setattr(aop_coverage, "chunk_steps", lambda point_count, satellite_count: 7)
+
+        assert compute_coverage(rows, START, grid_step_deg=30.0) == expected
+
+    def test_chunks_fit_the_memory_budget(self) -> None:
+        assert chunk_steps(648, 20, memory_bytes=648 * 20 * 9 * 100) == 100
+        assert chunk_steps(64800, 50, memory_bytes=1024) == 1
+
+    def test_no_satellite(self) -> None:
+        coverage = compute_coverage([], START, grid_step_deg=60.0)
+
+        assert coverage["summary"] == {"passes_per_day": 0.0, "visibility_min_per_day": 0.0, "mean_revisit_min": None, "max_revisit_min": None}
@@ -0,0 +1,80 @@
+import hashlib
+from typing import Any, Dict, List
+import pytest
+
+from aopcs_lambda.src.tools.aop_delta import apply_delta, bulletin_hash, compute_delta, decode_delta, encode_delta
+from aopcs_lambda.src.tools.convert_binary_to_aop_configuration_file_for_previpass import render_aop_text
+from tests.fixtures.aop_rows import make_row
+
+
+@pytest.fixture
+def base_rows() -> List[Dict[str, Any]]:
+    return [make_row("1A"), make_row("2B", semiMajorAxisKm=" 7000.000"), make_row("3C", inclinationDeg=" 97.0000")]
+
+
+class TestAopDelta:
+    """Test of the deltas between consecutive bulletins"""
+
+    def test_bulletin_hash_is_the_hash_of_the_text_file(self, base_rows: List[Dict[str, Any]]) -> None:
+        text = render_aop_text(base_rows).getvalue().encode("utf-8")
+        assert hashlib.sha256(text).hexdigest().startswith(bulletin_hash(base_rows))
+
+    def test_unchanged_bulletin(self, base_rows: List[Dict[str, Any]]) -> None:
+        delta = compute_delta(base_rows, base_rows)
+
+        assert set(delta) == {"v", "base", "target"}
+        assert len(encode_delta(delta)) < 80
+
+    def test_only_changed_fields_are_listed(self, base_rows: List[Dict[str, Any]]) -> None:
+        rows = [dict(row) for row in base_rows]
+        rows[1].update(hour="13", ascNodeDriftDeg=" -24.973")
+
+        delta = compute_delta(base_rows, rows)
+
+        assert delta["changed"] == {"2B": {"8": "13", "14": " -24.973"}}
+        assert apply_delta(base_rows, delta) == rows
+
+    def test_added_removed_and_reordered_satellites(self, base_rows: List[Dict[str, Any]]) -> None:
+        rows = [make_row("4D"), base_rows[2], base_rows[0]]
+
+        delta = compute_delta(base_rows, rows)
+
+        assert delta["removed"] == ["2B"]
+        assert [values[0] for values in delta["added"]] == ["4D"]
+        assert delta["order"] == ["4D", "3C", "1A"]
+        assert apply_delta(base_rows, delta) == rows
+
+    def test_order_is_omitted_when_satellites_are_appended(self, base_rows: List[Dict[str, Any]]) -> None:
+        rows = base_rows + [make_row("4D")]
+
+        delta = compute_delta(base_rows, rows)
+
+        assert "order" not in delta
+        assert apply_delta(base_rows, delta) == rows
+
+    def test_encoding_round_trip(self, base_rows: List[Dict[str, Any]]) -> None:
+        rows = [dict(row) for row in base_rows]
+        rows[0]["downlinkStatus"] = None
+
+        delta = decode_delta(encode_delta(compute_delta(base_rows, rows)))
+
+        assert render_aop_text(apply_delta(base_rows, delta)).getvalue() == render_aop_text(rows).getvalue()
+
+    def test_delta_applied_to_another_bulletin(self, base_rows: List[Dict[str, Any]]) -> None:
+        delta = compute_delta(base_rows, base_rows[:2])
+
+        with pytest.raises(ValueError, match="does not apply"):
+            apply_delta(base_rows[:2], delta)
+
+    def test_unsupported_version(self, base_rows: List[Dict[str, Any]]) -> None:
+        delta = compute_delta(base_rows, base_rows) | {"v": 2}
+
+        with pytest.raises(ValueError, match="Unsupported delta version: 2"):
+            apply_delta(base_rows, delta)
+
+    def test_corrupted_delta(self, base_rows: List[Dict[str, Any]]) -> None:
+        delta = compute_delta(base_rows, base_rows)
+        delta["changed"] = {"1A": {"8": "23"}}
+
+        with pytest.raises(ValueError, match="does not match its target"):
+            apply_delta(base_rows, delta)
@@ -0,0 +1,99 @@
+import random
+from typing import List, Tuple
+import pytest
+from pytest import MonkeyPatch
+
+import aopcs_lambda.src.tools.aop_encoder as encoder
+from aopcs_lambda.src.tools.allcast_layout import FieldSpec
+from aopcs_lambda.src.tools.aop_encoder import BitWriter, encode_field_value, encode_frames
+from aopcs_lambda.src.tools.convert_binary_to_aop_configuration_file_for_previpass import FormatReference, parse_binary_data
+from tests.fixtures.synthetic_allcast import SyntheticAllcast
+
+
+def reference_packing(fields: List[Tuple[int, int]]) -> bytes:
+    bits = "".join(format(value, f"0{width}b") for value, width in fields)
+    bits += "0" * (-len(bits) % 8)
+    return int(bits, 2).to_bytes(len(bits) // 8, "big")
+
+
+class TestBitWriter:
+    """Test of the BitWriter used by the encoder"""
+
+    @pytest.mark.parametrize("seed", range(20))
+    def test_matches_reference_packing(self, seed: int) -> None:
+        rng = random.Random(seed)
+        fields = []
+        for _ in range(rng.randrange(1, 60)):
+            width = rng.randrange(1, 40)
+            fields.append((rng.randrange(0, 1 << width), width))
+        writer = BitWriter(sum(width for _, width in fields))
+
+        for value, width in fields:
+            writer.write(value, width)
+
+        assert writer.getvalue() == reference_packing(fields)
+
+    def test_value_too_large(self) -> None:
+        with pytest.raises(ValueError, match="does not fit"):
+            BitWriter(8).write(4, 2)
+
+    def test_buffer_overflow(self) -> None:
+        writer = BitWriter(10)
+        writer.write(0xFF, 8)
+        with pytest.raises(ValueError, match="overflows"):
+            writer.write(0x7, 3)
+
+    def test_skip_to_pads_with_zeros(self) -> None:
+        writer = BitWriter(16)
+        writer.write(0b101, 3)
+        writer.skip_to(12)
+        writer.write(0b1111, 4)
+        assert writer.getvalue() == bytes([0b10100000, 0b00001111])
+
+
+class TestEncodeFieldValue:
+    """Test of the field codecs of the encoder"""
+
+    def test_signed_fixed_point(self) -> None:
+        field = FieldSpec("anLongitudeDrift", 16, "scaled", scale=0.001)
+        assert encode_field_value(field, -24.972) == (1 << 16) - 24972
+
+    def test_hex_address(self) -> None:
+        assert encode_field_value(FieldSpec("satelliteAddress", 8, "hex"), "F1") == 0xF1
+
+    def test_date(self) -> None:
+        field = FieldSpec("date", 40, "date", scale=0.125)
+        assert encode_field_value(field, "1970-01-01T00:00:01.250+00:00") == 10
+
+    def test_signed_overflow(self) -> None:
+        with pytest.raises(ValueError):
+            encode_field_value(FieldSpec("deltaDateRelative", 8, "scaled", scale=0.125), 20.0)
+
+
+class TestEncodeFrames:
+    """Round trip of the encoder against parse_binary_data"""
+
+    def test_layout_must_be_available(self, monkeypatch: MonkeyPatch) -> None:
+        monkeypatch.setattr(encoder, "is_layout_available", lambda: False)
+        with pytest.raises(Exception, match="layout is not available"):
+            encode_frames([])
+
+    def test_unknown_format_reference(self, monkeypatch: MonkeyPatch) -> None:
+        monkeypatch.setattr(encoder, "is_layout_available", lambda: True)
+        with pytest.raises(Exception, match="Unknown format reference"):
+            encode_frames([{"formatReference": "UNKNOWN", "satellitesStatus": []}])
+
+    @pytest.mark.parametrize("seed", range(10))
+    @pytest.mark.parametrize("status_format", ["CS_2_SAT", "CS_10_SAT", "CS_17_SAT"])
+    def test_round_trip(self, seed: int, status_format: str) -> None:
+        frames = SyntheticAllcast(monosat_count=5, multisat_count=2, status_format=status_format, seed=seed).frames()
+
+        assert parse_binary_data(encode_frames(frames)) == frames
+
+    def test_encoded_frames_have_their_format_size(self) -> None:
+        frames = SyntheticAllcast(monosat_count=1, multisat_count=0).frames()[:1]
+
+        encoded = encode_frames(frames)
+
+        format_size = encoder.decoder.get_format_size_in_bits(FormatReference.AOP_MONOSAT.value)
+        assert len(encoded) == (max(format_size, encoder.frame_size_in_bits(frames[0])) + 7) // 8
@@ -0,0 +1,70 @@
+from typing import Any, List, Tuple
+
+import pytest
+
+from aopcs_lambda.src.tools.aop_packed import (
+    DEFAULT_CAPACITY,
+    RangeReader,
+    aop_text,
+    fetch_records,
+    header_size,
+    read_index,
+    render_aop_packed,
+    s3_range_reader,
+)
+from aopcs_lambda.src.tools.convert_binary_to_aop_configuration_file_for_previpass import render_aop_text
+from tests.fixtures.aop_rows import make_row
+
+ROWS = [make_row(name, minute=f"{i:02d}") for i, name in enumerate(["1A", "1B", "3A", "3B", "5A"])]
+PACK_KEY = "resources/aopcs/kineis/aop/aop.pack"
+
+
+def counting_reader(data: bytes, requests: List[Tuple[int, int]]) -> RangeReader:
+    def read_range(start: int, end: int) -> bytes:
+        requests.append((start, end))
+        return data[start : end + 1]
+
+    return read_range
+
+
+class TestAopPacked:
+    """Test of the packed aop file and its range-request client"""
+
+    def test_index(self) -> None:
+        data = render_aop_packed(ROWS)
+
+        index = read_index(counting_reader(data, []))
+
+        assert [entry.name for entry in index] == ["1A", "1B", "3A", "3B", "5A"]
+        assert index[2].epoch.minute == 2
+        assert index[0].offset == header_size(DEFAULT_CAPACITY)
+
+    def test_records_form_the_aop_file_of_the_satellites(self) -> None:
+        data = render_aop_packed(ROWS)
+
+        records = fetch_records(counting_reader(data, []), ["3B", "1A"])
+
+        assert aop_text(records) == render_aop_text([ROWS[0], ROWS[3]]).getvalue()
+
+    def test_bytes_read_scale_with_the_requested_satellites(self) -> None:
+        rows = [make_row(f"{i}A") for i in range(200)]
+        data = render_aop_packed(rows)
+        requests: List[Tuple[int, int]] = []
+
+        fetch_records(counting_reader(data, requests), ["7A"], merge_gap_bytes=0)
+
+        record_bytes = sum(end - start + 1 for start, end in requests[-1:])
+        assert len(requests) == 3  # Header, rest of the index, record
+        assert record_bytes == len(render_aop_text([rows[7]]).getvalue()) - 1
+
+    def test_not_a_packed_file(self) -> None:
+        with pytest.raises(ValueError, match="Not an aop packed file"):
+            read_index(counting_reader(b"AOPB" + bytes(2000), []))
+
+    def test_range_requests_on_s3(self, s3: Any, create_test_bucket: Any) -> None:
+        s3.put_object(Bucket="test-bucket", Key=PACK_KEY, Body=render_aop_packed(ROWS))
+
+        records = fetch_records(s3_range_reader(s3, "test-bucket", PACK_KEY), ["5A", "unknown"])
+
+        assert list(records) == ["5A"]
+        assert aop_text(records) == render_aop_text([ROWS[4]]).getvalue()
@@ -0,0 +1,79 @@
+from datetime import datetime, timedelta, timezone
+import numpy as np
+import pytest
+
+from aopcs_lambda.src.tools.aop_propagation import AopElements, propagate, reepoch_rows
+from tests.fixtures.aop_rows import make_row
+
+EPOCH = datetime(2025, 5, 15, 12, tzinfo=timezone.utc)
+
+
+def at(*hours: float) -> np.ndarray:
+    return np.array([np.datetime64("2025-05-15T12:00:00") + np.timedelta64(int(hour * 3600), "s") for hour in hours])
+
+
+class TestPropagate:
+    """Test of the vectorised propagation of the AOP elements"""
+
+    def test_node_follows_the_relative_satellite_drift_model(self) -> None:
+        elements = AopElements.from_rows([make_row("1A")])
+
+        propagated = propagate(elements, at(1))
+
+        # SatelliteRowJoiner._aop_rows: anLongitude + (drift / period) / 0.001 / 60 * 0.125 * (delta / 0.125) * 0.001
+        expected = 123.4 + (-24.972 / 96.5) / 0.001 / 60 * 0.125 * (3600 / 0.125) * 0.001
+        assert propagated.asc_node_deg[0, 0] == pytest.approx(expected)
+
+    def test_semi_major_axis_decays(self) -> None:
+        propagated = propagate(AopElements.from_rows([make_row("1A")]), at(48))
+
+        assert propagated.semi_major_axis_km[0, 0] == pytest.approx(6789.0 - 2 * 0.5e-3)
+
+    def test_node_longitude_is_wrapped(self) -> None:
+        propagated = propagate(AopElements.from_rows([make_row("1A", ascNodeLongitudeDeg="   1.000")]), at(1))
+
+        assert 0 <= propagated.asc_node_deg[0, 0] < 360
+        assert propagated.asc_node_deg[0, 0] == pytest.approx(1.0 - 24.972 / 96.5 * 60 + 360)
+
+    def test_batch_matches_single_targets(self) -> None:
+        elements = AopElements.from_rows([make_row("1A"), make_row("2B", orbitPeriodMin=" 100.1000", inclinationDeg=" 97.9000")])
+
+        batch = propagate(elements, at(1, 6, 24), j2=True)
+
+        assert batch.asc_node_deg.shape == (3, 2)
+        for k, hours in enumerate((1, 6, 24)):
+            np.testing.assert_allclose(batch.asc_node_deg[k], propagate(elements, at(hours), j2=True).asc_node_deg[0])
+
+    def test_j2_terms_vanish_without_decay(self) -> None:
+        elements = AopElements.from_rows([make_row("1A", semiMajorAxisDriftMeterPerDay="  0.00")])
+
+        with_j2 = propagate(elements, at(72), j2=True)
+        without_j2 = propagate(elements, at(72))
+
+        np.testing.assert_allclose(with_j2.asc_node_deg, without_j2.asc_node_deg)
+        np.testing.assert_allclose(with_j2.period_min, without_j2.period_min)
+
+    def test_j2_period_follows_the_decay(self) -> None:
+        elements = AopElements.from_rows([make_row("1A", semiMajorAxisDriftMeterPerDay=" 50.00")])
+
+        propagated = propagate(elements, at(240), j2=True)
+
+        assert propagated.period_min[0, 0] < 96.5
+
+
+class TestReepochRows:
+    """Test of the re-epoched rows of the `aop` file"""
+
+    def test_rows_at_each_target(self) -> None:
+        rows = [make_row("1A", downlinkStatus="DL-ON"), make_row("2B")]
+
+        bulletins = reepoch_rows(rows, [EPOCH + timedelta(hours=1), EPOCH + timedelta(minutes=90, seconds=30)])
+
+        assert [[row["satName"] for row in bulletin] for bulletin in bulletins] == [["1A", "2B"], ["1A", "2B"]]
+        assert (bulletins[1][0]["hour"], bulletins[1][0]["minute"], bulletins[1][0]["second"]) == ("13", "30", "30")
+        assert bulletins[0][0]["downlinkStatus"] == "DL-ON"
+        assert bulletins[0][0]["ascNodeLongitudeDeg"] == format(123.4 - 24.972 / 96.5 * 60, ">8.3f")
+        assert rows[0]["hour"] == "12"
+
+    def test_empty_bulletin(self) -> None:
+        assert reepoch_rows([], [EPOCH]) == [[]]
@@ -0,0 +1,35 @@
+import gzip
+
+import pytest
+
+from aopcs_lambda.src.tools.compression import compress, compressed_variants, has_zstd, upload_args
+
+
+class TestCompressedVariants:
+    """Test of the precompressed variants of the artefacts"""
+
+    def test_variants_of_aop_and_json_artefacts(self) -> None:
+        artefacts = [("p/aop", b" 1A" * 100), ("p/aop.bin", b"\x00" * 100), ("p/metadata.json", b"{}")]
+
+        variants = compressed_variants(artefacts, ["gzip"], {"gzip": 9})
+
+        assert [key for key, _ in variants] == ["p/aop.gz", "p/metadata.json.gz"]
+        assert gzip.decompress(variants[0][1]) == b" 1A" * 100
+
+    def test_gzip_output_is_reproducible(self) -> None:
+        assert compress(b"aop", "gzip", 6) == compress(b"aop", "gzip", 6)
+
+    @pytest.mark.skipif(has_zstd(), reason="zstandard is installed")
+    def test_zstd_variants_are_skipped_without_zstandard(self) -> None:
+        assert compressed_variants([("p/aop", b" 1A")], ["zstd", "gzip"], {}) == [("p/aop.gz", compress(b" 1A", "gzip", 6))]
+
+    @pytest.mark.skipif(not has_zstd(), reason="zstandard is not installed")
+    def test_zstd_round_trip(self) -> None:
+        import zstandard
+
+        assert zstandard.ZstdDecompressor().decompress(compress(b" 1A" * 100, "zstd", 3)) == b" 1A" * 100
+
+    def test_upload_args(self) -> None:
+        assert upload_args("p/metadata.json.gz") == {"ContentEncoding": "gzip", "ContentType": "application/json"}
+        assert upload_args("p/aop.zst") == {"ContentEncoding": "zstd", "ContentType": "text/plain"}
+        assert upload_args("p/aop") == {}
@@ -5,10 +5,18 @@ import re
 from typing import Any, List
 import pytest
 from pytest import MonkeyPatch
+from pytest_mock import MockerFixture
 from io import StringIO
 
 import aopcs_lambda.src.tools.convert_binary_to_aop_configuration_file_for_previpass as module
-from aopcs_lambda.src.tools.convert_binary_to_aop_configuration_file_for_previpass import convert_to_csv, parse_binary_data
+from aopcs_lambda.src.tools.convert_binary_to_aop_configuration_file_for_previpass import (
+    SatelliteRowJoiner,
+    build_satellite_rows,
+    convert_to_csv,
+    iter_satellite_rows,
+    parse_binary_data,
+)
+from aopcs_lambda.src.tools.satellite_registry import SatelliteRegistry
 
 
 class TestParseBinaryData:
@@ -220,3 +228,95 @@ class TestConvertToCsv:
                 assert "DL-OFF" in row and "UL-OFF" in row
             if "3333" in row:
                 assert "DL-ON" in row and "UL-ON" in row
+
+
+def aop_frame(address: str, hour: int = 12) -> dict[str, Any]:
+    return {
+        "satelliteData": {
+            "satelliteAddress": address,
+            "date": f"2025-05-15T{hour:02d}:00:00",
+            "semiMajorAxis": 7000000.0,
+            "inclination": 97.5,
+            "anLongitude": 125.0,
+            "anLongitudeDrift": -24.9,
+            "nodalPeriod": 96.0,
+            "semiMajorAxisDecay": 0.55,
+        }
+    }
+
+
+def status_frame(*addresses: str, downlink: bool = True) -> dict[str, Any]:
+    return {
+        "satellitesStatus": [
+            {"satelliteAddress": address, "payloadType": "TYPE1", "payloadDownlinkMissionStatus": downlink, "payloadUplinkMissionStatus": True}
+            for address in addresses
+        ]
+    }
+
+
+class TestSatelliteRowJoiner:
+    """Test of the streaming join of the constellation statuses onto the satellite rows"""
+
+    @pytest.fixture(autouse=True)
+    def patch_satellite_identification(self, monkeypatch: MonkeyPatch) -> None:
+        monkeypatch.setitem(module.convert_to_csv.__globals__, "satellite_identification", {"A1": "1A", "B2": "2B", "C3": "3C"})
+        monkeypatch.setitem(module.convert_to_csv.__globals__, "downlink_status", {"TYPE1": "DL-ON", "OFF": "DL-OFF"})
+        monkeypatch.setitem(module.convert_to_csv.__globals__, "uplink_status", {"TYPE1": "UL-ON", "OFF": "UL-OFF"})
+
+    def test_status_before_its_aop_frame(self) -> None:
+        rows = build_satellite_rows([status_frame("A1", "B2"), aop_frame("A1"), aop_frame("B2")])
+
+        assert [(row["satName"], row["downlinkStatus"]) for row in rows] == [("1A", "DL-ON"), ("2B", "DL-ON")]
+
+    def test_result_does_not_depend_on_frame_order(self) -> None:
+        frames = [aop_frame("A1"), status_frame("A1", "B2", "C3"), aop_frame("B2"), aop_frame("C3")]
+
+        expected = build_satellite_rows(frames)
+
+        for reordered in ([frames[1], frames[0], frames[2], frames[3]], [frames[0], frames[2], frames[3], frames[1]]):
+            assert build_satellite_rows(reordered) == expected
+
+    def test_rows_are_emitted_as_soon_as_complete(self) -> None:
+        stream = iter_satellite_rows(iter([aop_frame("A1"), aop_frame("B2"), status_frame("B2"), status_frame("A1")]))
+
+        assert next(stream)["satName"] == "2B"
+        assert next(stream)["satName"] == "1A"
+
+    def test_rows_without_status_are_emitted_at_the_end(self) -> None:
+        rows = list(iter_satellite_rows([aop_frame("A1"), aop_frame("B2"), status_frame("B2")]))
+
+        assert [(row["satName"], row["downlinkStatus"]) for row in rows] == [("2B", "DL-ON"), ("1A", "")]
+
+    def test_repeated_satellite_last_frame_wins(self) -> None:
+        rows = build_satellite_rows([aop_frame("A1"), status_frame("A1"), aop_frame("A1", hour=13), status_frame("A1", downlink=False)])
+
+        assert [(row["hour"], row["downlinkStatus"]) for row in rows] == [("13", "DL-OFF")]
+
+    def test_status_applies_to_later_aop_frames(self) -> None:
+        rows = list(iter_satellite_rows([aop_frame("A1"), status_frame("A1", downlink=False), aop_frame("A1", hour=13)]))
+
+        assert [(row["hour"], row["downlinkStatus"]) for row in rows] == [("12", "DL-OFF"), ("13", "DL-OFF")]
+
+    def test_pending_status_table_is_bounded(self) -> None:
+        registry = SatelliteRegistry.from_tables({"A1": "1A", "B2": "2B"}, {"TYPE1": "DL-ON"}, {"TYPE1": "UL-ON"})
+        joiner = SatelliteRowJoiner(registry, max_pending=1)
+
+        joiner.feed(status_frame("A1", "B2"))
+        joiner.feed(aop_frame("A1"))
+        completed = joiner.feed(aop_frame("B2"))
+
+        assert joiner.dropped_statuses == 1
+        assert [row["satName"] for _, row in completed] == ["2B"]
+        assert [row["satName"] for _, row in joiner.finish()] == ["1A"]
+
+    def test_rows_of_unwanted_satellites_are_not_built(self, mocker: MockerFixture) -> None:
+        build_csv_row = mocker.spy(module, "build_csv_row")
+        multisat = {
+            "satelliteReference": aop_frame("A1")["satelliteData"],
+            "relativeSatellites": [{"satelliteAddressRelative": "B2", "deltaDateRelative": 8.0}, {"satelliteAddressRelative": "C3", "deltaDateRelative": 16.0}],
+        }
+
+        rows = build_satellite_rows([multisat, status_frame("A1", "B2", "C3")], ["2B"])
+
+        assert [row["satName"] for row in rows] == ["2B"]
+        assert build_csv_row.call_count == 1
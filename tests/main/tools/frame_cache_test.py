@@ -0,0 +1,123 @@
+import gzip
+import json
+import threading
+from typing import Any, Dict, List
+import pytest
+from pytest import MonkeyPatch
+
+import aopcs_lambda.src.tools.frame_cache as frame_cache
+from aopcs_lambda.src.tools import convert_binary_to_aop_configuration_file_for_previpass as decoder
+from aopcs_lambda.src.tools.frame_cache import CacheLookups, FrameCache, get_frame_cache, parse_binary_data_cached, persist_frame_cache
+from tests.fixtures.allcast_frames import frame, pack, use_test_layout
+
+
+@pytest.fixture
+def decoded_payloads(monkeypatch: MonkeyPatch) -> List[bytes]:
+    """Payloads given to `parse_binary_data`, which decodes single frames to their bytes."""
+    use_test_layout(monkeypatch)
+    payloads: List[bytes] = []
+
+    def parse_binary_data(binary_data: bytes) -> List[Dict[str, Any]]:
+        payloads.append(binary_data)
+        return [{"formatReference": "AOP_MONOSAT", "satelliteData": {"bits": binary_data.hex()}}]
+
+    monkeypatch.setattr(decoder, "parse_binary_data", parse_binary_data)
+    return payloads
+
+
+class TestFrameCache:
+    """Test of the cache of decoded frames"""
+
+    def test_least_recently_used_frame_is_evicted(self) -> None:
+        cache = FrameCache(max_entries=2)
+        cache.put("a", {"n": 1})
+        cache.put("b", {"n": 2})
+        cache.get("a")
+        cache.put("c", {"n": 3})
+
+        assert list(cache.frames) == ["a", "c"]
+
+    def test_hits_are_copies(self) -> None:
+        cache = FrameCache(max_entries=2)
+        cache.put("a", {"satelliteData": {"inclination": 98.7}})
+
+        hit = cache.get("a")
+        assert hit is not None
+        hit["satelliteData"]["inclination"] = 0.0
+
+        assert cache.get("a") == {"satelliteData": {"inclination": 98.7}}
+
+    def test_hit_rate(self) -> None:
+        cache = FrameCache(max_entries=2)
+        assert cache.hit_rate is None
+        cache.put("a", {})
+        cache.get("a")
+        cache.get("b")
+
+        assert cache.hit_rate == 0.5
+
+    def test_dumps_snapshots_the_frames_under_the_lock(self) -> None:
+        cache = FrameCache(max_entries=4)
+        cache.put("a", {"n": 1})
+        dumped: List[bytes] = []
+        dumper = threading.Thread(target=lambda: dumped.append(cache.dumps()))
+
+        with cache.lock:
+            dumper.start()
+            dumper.join(timeout=0.05)
+            assert dumped == []
+        dumper.join()
+
+        assert dumped and json.loads(gzip.decompress(dumped[0]))["frames"] == [["a", {"n": 1}]]
+
+    def test_dumps_and_loads(self) -> None:
+        cache = FrameCache(max_entries=4)
+        cache.put("a", {"n": 1})
+        cache.put("b", {"n": 2})
+
+        restored = FrameCache(max_entries=1)
+        restored.loads(cache.dumps())
+
+        assert list(restored.frames.items()) == [("b", {"n": 2})]
+
+
+class TestParseBinaryDataCached:
+    """Test of the frame-level cached decoding"""
+
+    def test_only_new_frames_are_decoded(self, decoded_payloads: List[bytes]) -> None:
+        cache = FrameCache(max_entries=16)
+        first = parse_binary_data_cached(pack(frame("AOP_MONOSAT", fill="0") + frame("AOP_MONOSAT")), cache)
+
+        lookups = CacheLookups()
+        second = parse_binary_data_cached(pack(frame("AOP_MONOSAT", fill="0") + frame("AOP_MONOSAT") + frame("AOP_MULTISAT")), cache, lookups)
+
+        assert len(decoded_payloads) == 3
+        assert second[:2] == first
+        assert (lookups.hits, lookups.misses) == (2, 1)
+        assert cache.hit_rate == 0.4
+
+    def test_payload_that_cannot_be_indexed_is_decoded_whole(self, decoded_payloads: List[bytes]) -> None:
+        data = pack(frame("AOP_MONOSAT") + frame("AOP_MONOSAT")[:10])
+
+        parse_binary_data_cached(data, FrameCache(max_entries=16))
+
+        assert decoded_payloads == [data]
+
+
+class TestFrameCachePersistence:
+    """Test of the frame cache persisted in S3"""
+
+    def test_cache_is_restored_on_cold_start(self, monkeypatch: MonkeyPatch, s3: Any, create_test_bucket: Any, set_env_vars: None) -> None:
+        from aopcs_lambda.src.global_config import get_global_config
+
+        monkeypatch.setenv("frame_cache_s3_key", "cache/frames.json.gz")
+        monkeypatch.setattr("boto3.client", lambda *args, **kwargs: s3)
+        monkeypatch.setattr(frame_cache, "_cache", None)
+        get_global_config.cache_clear()
+        cache = get_frame_cache()
+        cache.put("a", {"n": 1})
+        persist_frame_cache(cache)
+
+        monkeypatch.setattr(frame_cache, "_cache", None)
+
+        assert get_frame_cache().get("a") == {"n": 1}
@@ -0,0 +1,60 @@
+import pytest
+from pytest import MonkeyPatch
+from pytest_mock import MockerFixture
+
+from aopcs_lambda.src.tools import allcast_layout as layout
+from aopcs_lambda.src.tools import convert_binary_to_aop_configuration_file_for_previpass as decoder
+from aopcs_lambda.src.tools import frame_selection
+from aopcs_lambda.src.tools.frame_selection import select_frames
+from tests.fixtures.allcast_frames import frame, pack, use_test_layout
+
+
+@pytest.fixture
+def test_layout(monkeypatch: MonkeyPatch) -> None:
+    use_test_layout(monkeypatch)
+
+
+def header(format_name: str) -> str:
+    return "01" + format(decoder.FormatReference[format_name].value, "04b")
+
+
+def monosat(address: int) -> str:
+    return header("AOP_MONOSAT") + format(address, "02b") + "1" * 14 + "11"
+
+
+def multisat(reference: int, *relatives: int) -> str:
+    return header("AOP_MULTISAT") + format(reference, "02b") + "1" * 14 + "".join(format(address, "02b") + "10" for address in relatives) + "11"
+
+
+class TestSelectFrames:
+    """Test of the whitelist pushdown into the frame decoder"""
+
+    def test_unwanted_aop_frames_are_dropped(self, test_layout: None) -> None:
+        data = pack(monosat(1) + monosat(2) + frame("CS_2_SAT") + monosat(3))
+
+        assert select_frames(data, {2}) == pack(monosat(2) + frame("CS_2_SAT"))
+
+    def test_multisat_frame_is_kept_for_a_wanted_relative(self, test_layout: None) -> None:
+        data = pack(multisat(1, 0, 0, 0, 3) + multisat(1, 0, 0, 0, 2))
+
+        assert select_frames(data, {3}) == pack(multisat(1, 0, 0, 0, 3))
+
+    def test_payload_is_unchanged_when_every_frame_is_wanted(self, test_layout: None) -> None:
+        data = pack(monosat(1) + monosat(2))
+
+        assert select_frames(data, {1, 2}) is data
+
+    def test_payload_that_cannot_be_indexed_is_unchanged(self, test_layout: None, mocker: MockerFixture) -> None:
+        warning = mocker.patch.object(frame_selection.logger, "warning")
+        data = pack(monosat(1) + monosat(2)[:10])
+
+        assert select_frames(data, {2}) is data
+        assert "frame indexing issues" in warning.call_args.args[0]
+
+    def test_payload_without_the_layout_is_unchanged(self, monkeypatch: MonkeyPatch, mocker: MockerFixture) -> None:
+        warning = mocker.patch.object(frame_selection.logger, "warning")
+        monkeypatch.setattr(layout, "is_layout_available", lambda: False)
+        data = b"\x01\x02"
+
+        assert select_frames(data, {2}) is data
+        assert "frame layout unavailable" in warning.call_args.args[0]
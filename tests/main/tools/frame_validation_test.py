@@ -0,0 +1,68 @@
+import numpy as np
+import pytest
+from pytest import MonkeyPatch
+
+from aopcs_lambda.src.tools import convert_binary_to_aop_configuration_file_for_previpass as decoder
+from aopcs_lambda.src.tools.frame_validation import FrameValidationError, salvage_frames, validate_frames
+from tests.fixtures.allcast_frames import frame, pack, use_test_layout
+
+
+@pytest.fixture
+def test_layout(monkeypatch: MonkeyPatch) -> None:
+    use_test_layout(monkeypatch)
+
+
+class TestValidateFrames:
+    """Test of the integrity pre-pass of the Allcast payloads"""
+
+    def test_valid_payload(self, test_layout: None) -> None:
+        report = validate_frames(pack(frame("AOP_MONOSAT") + frame("AOP_MULTISAT") + frame("CS_2_SAT")))
+
+        assert report.ok
+        assert [(span.offset, span.size, span.format_reference) for span in report.frames] == [
+            (0, 24, "AOP_MONOSAT"),
+            (24, 40, "AOP_MULTISAT"),
+            (64, 30, "CS_2_SAT"),
+        ]
+
+    def test_truncated_frame(self, test_layout: None) -> None:
+        report = validate_frames(pack(frame("AOP_MONOSAT") + frame("AOP_MONOSAT")[:16]))
+
+        assert [(issue.frame_index, issue.offset, issue.code) for issue in report.issues] == [(1, 24, "truncated")]
+        assert [span.offset for span in report.valid_frames] == [0]
+
+    def test_unknown_format_stops_the_index(self, test_layout: None) -> None:
+        report = validate_frames(pack(frame("AOP_MONOSAT") + "01" + "1111" + "1" * 18 + frame("AOP_MONOSAT")))
+
+        assert [(issue.offset, issue.code) for issue in report.issues] == [(24, "unknown_format")]
+        assert len(report.frames) == 1
+        with pytest.raises(FrameValidationError, match="Unknown format reference: 15 at bit 24"):
+            raise FrameValidationError(report)
+
+    def test_non_zero_reserved_bits(self, test_layout: None, monkeypatch: MonkeyPatch) -> None:
+        monosat = decoder.FormatReference.AOP_MONOSAT.value
+        monkeypatch.setattr(decoder, "get_format_size_in_bits", lambda format_reference: 32 if format_reference == monosat else 0)
+
+        report = validate_frames(pack(frame("AOP_MONOSAT", reserved="0" * 8) + frame("AOP_MONOSAT", reserved="00010000") + frame("CS_2_SAT")))
+
+        assert [span.size for span in report.frames] == [32, 32, 30]
+        assert [(issue.frame_index, issue.code) for issue in report.issues] == [(1, "reserved_bits")]
+
+    def test_check_sequence_function(self, test_layout: None) -> None:
+        def check_sequence(bits: np.ndarray, value: int) -> bool:
+            return value == 0b11 and len(bits) == 22
+
+        report = validate_frames(pack(frame("AOP_MONOSAT") + frame("AOP_MONOSAT", check_sequence="10")), check_sequence=check_sequence)
+
+        assert [(issue.frame_index, issue.code) for issue in report.issues] == [(1, "check_sequence")]
+
+    def test_salvage_keeps_the_valid_frames(self, test_layout: None) -> None:
+        data = pack(frame("AOP_MONOSAT", fill="0") + frame("AOP_MONOSAT", fill="1", reserved="") + frame("AOP_MONOSAT")[:10])
+        report = validate_frames(data)
+
+        assert report.to_dict()["valid_frame_count"] == 2
+        assert salvage_frames(data, report) == pack(frame("AOP_MONOSAT", fill="0") + frame("AOP_MONOSAT", fill="1"))
+
+    def test_layout_not_available(self) -> None:
+        with pytest.raises(Exception, match="layout is not available"):
+            validate_frames(b"\x00")
@@ -0,0 +1,147 @@
+import json
+from pathlib import Path
+from typing import Any
+import pytest
+from pytest import MonkeyPatch
+
+import aopcs_lambda.src.tools.convert_binary_to_aop_configuration_file_for_previpass as module
+import aopcs_lambda.src.tools.satellite_registry as satellite_registry
+from aopcs_lambda.src.tools.convert_binary_to_aop_configuration_file_for_previpass import build_satellite_rows
+from aopcs_lambda.src.tools.satellite_registry import RegistryLoader, SatelliteRecord, SatelliteRegistry, parse_registry
+
+DOCUMENT = {
+    "version": "2025-05-01",
+    "satellites": [{"address": "F1", "mnemonic": "1A", "dcs_id": "3"}, {"address": "1F2", "mnemonic": "9Z"}],
+    "downlink_status": {"TYPE1": "DL-ON", "OFF": "DL-OFF"},
+    "uplink_status": {"TYPE1": "UL-ON", "OFF": "UL-OFF"},
+}
+
+TOML_DOCUMENT = """
+version = "2025-06-01"
+address_bits = 4
+
+[[satellites]]
+address = "A"
+mnemonic = "2B"
+
+[downlink_status]
+OFF = "DL-OFF"
+"""
+
+
+def write_registry(path: Path, document: Any) -> None:
+    path.write_text(json.dumps(document), encoding="utf-8")
+
+
+class TestSatelliteRegistry:
+    """Test of the satellite registry"""
+
+    def test_lookup(self) -> None:
+        registry = SatelliteRegistry.from_document(DOCUMENT)
+
+        assert registry.version == "2025-05-01"
+        assert registry.index[0xF1] == SatelliteRecord("1A", "3")
+        assert registry.lookup_hex("F1") == SatelliteRecord("1A", "3")
+        assert registry.lookup(0x1F2) == SatelliteRecord("9Z", "0")
+        assert registry.lookup(0xF2) is None
+        assert registry.lookup_hex("XX") is None
+        assert len(registry) == 2
+
+    def test_toml_document(self) -> None:
+        registry = parse_registry(TOML_DOCUMENT.encode("utf-8"), "registry.toml")
+
+        assert len(registry.index) == 16
+        assert registry.lookup_hex("A") == SatelliteRecord("2B")
+        assert registry.payload_status("TYPE1", False, True) == ("DL-OFF", None)
+
+    def test_payload_status(self) -> None:
+        registry = SatelliteRegistry.from_document(DOCUMENT)
+
+        assert registry.payload_status("TYPE1", True, False) == ("DL-ON", "UL-OFF")
+
+    def test_resolve_addresses(self) -> None:
+        registry = SatelliteRegistry.from_document(DOCUMENT)
+
+        assert registry.resolve_addresses(["9Z", "1A", "XX"]) == {0xF1, 0x1F2}
+
+    def test_legacy_tables(self) -> None:
+        registry = SatelliteRegistry.from_tables({"XX": "XX", "F1": "1A"}, {}, {})
+
+        assert registry.lookup_hex("F1") == SatelliteRecord("1A")
+        assert len(registry) == 1
+
+    def test_invalid_document(self) -> None:
+        with pytest.raises(ValueError, match="Invalid satellite registry"):
+            SatelliteRegistry.from_document({"satellites": []})
+
+
+class TestRegistryLoader:
+    """Test of the cached, hot-reloaded registry"""
+
+    def test_local_document_is_reloaded_when_it_changes(self, tmp_path: Path) -> None:
+        path = tmp_path / "registry.json"
+        write_registry(path, DOCUMENT)
+        loader = RegistryLoader(str(path), revalidate_seconds=0)
+        first = loader.get()
+
+        assert loader.get() is first
+        write_registry(path, DOCUMENT | {"version": "2025-05-02-rev"})
+        registry = loader.get()
+        assert registry is not None and registry.version == "2025-05-02-rev"
+
+    def test_revalidation_is_throttled(self, tmp_path: Path) -> None:
+        path = tmp_path / "registry.json"
+        write_registry(path, DOCUMENT)
+        loader = RegistryLoader(str(path), revalidate_seconds=3600)
+        loader.get()
+
+        path.unlink()
+
+        assert loader.get() is not None
+
+    def test_invalid_update_keeps_the_previous_registry(self, tmp_path: Path) -> None:
+        path = tmp_path / "registry.json"
+        write_registry(path, DOCUMENT)
+        loader = RegistryLoader(str(path), revalidate_seconds=0)
+        loader.get()
+
+        path.write_text("{", encoding="utf-8")
+        registry = loader.get()
+
+        assert registry is not None and registry.version == "2025-05-01"
+
+    def test_s3_document_is_reloaded_on_etag_change(self, monkeypatch: MonkeyPatch, s3: Any, create_test_bucket: Any) -> None:
+        monkeypatch.setattr("boto3.client", lambda *args, **kwargs: s3)
+        s3.put_object(Bucket="test-bucket", Key="registry.json", Body=json.dumps(DOCUMENT))
+        loader = RegistryLoader("s3://test-bucket/registry.json", revalidate_seconds=0)
+        assert loader.get() is not None
+
+        s3.put_object(Bucket="test-bucket", Key="registry.json", Body=json.dumps(DOCUMENT | {"version": "2"}))
+        registry = loader.get()
+
+        assert registry is not None and registry.version == "2"
+
+    def test_build_satellite_rows_uses_the_configured_registry(self, monkeypatch: MonkeyPatch, tmp_path: Path, set_env_vars: None) -> None:
+        from aopcs_lambda.src.global_config import get_global_config
+
+        path = tmp_path / "registry.json"
+        write_registry(path, DOCUMENT)
+        monkeypatch.setenv("satellite_registry_uri", str(path))
+        monkeypatch.setattr(satellite_registry, "_loader", None)
+        monkeypatch.setitem(module.convert_to_csv.__globals__, "satellite_identification", {})
+        get_global_config.cache_clear()
+        satellite_data = {
+            "satelliteAddress": "F1",
+            "date": "2025-05-15T12:00:00",
+            "semiMajorAxis": 6789000.0,
+            "inclination": 98.7,
+            "anLongitude": 123.4,
+            "anLongitudeDrift": -24.972,
+            "nodalPeriod": 96.5,
+            "semiMajorAxisDecay": 0.5,
+        }
+        status = {"satelliteAddress": "F1", "payloadType": "TYPE1", "payloadUplinkMissionStatus": True, "payloadDownlinkMissionStatus": True}
+
+        [row] = build_satellite_rows([{"satelliteData": satellite_data}, {"satellitesStatus": [status]}])
+
+        assert (row["satName"], row["satDcsId"], row["downlinkStatus"], row["uplinkStatus"]) == ("1A", "3", "DL-ON", "UL-ON")